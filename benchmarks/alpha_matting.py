@@ -0,0 +1,83 @@
+"""
+Runtime and peak memory of full-image alpha matting (bg.alpha_matting_cutout) against the ROI-restricted
+mode (bg.alpha_matting_cutout_roi) at full and reduced solve scale, on a synthetic coin with a soft edge.
+
+Each variant runs in its own spawned process (a forked one keeps the benchmark from exiting once pymatting is
+loaded) and peak memory is the growth of the resident set size (ru_maxrss), since pymatting reserves large
+buffers it never touches, which would distort allocation tracing. The distinct alpha values inside the soft edge
+(where the full-image alpha is neither 0 nor 255) are counted as well; a matted variant with a single value
+there lost its solved alpha, and the benchmark fails.
+
+    python -m benchmarks.alpha_matting --width 1280 --height 720
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from core.utilities.bg import alpha_matting_cutout, alpha_matting_cutout_roi
+
+THRESHOLDS = (240, 10, 10)
+
+VARIANTS = {
+    "full image": lambda img, mask: alpha_matting_cutout(img, mask, *THRESHOLDS),
+    "ROI": lambda img, mask: alpha_matting_cutout_roi(img, mask, *THRESHOLDS),
+    "ROI, scale 0.5": lambda img, mask: alpha_matting_cutout_roi(img, mask, *THRESHOLDS, scale=0.5),
+    "ROI, 50 ms budget": lambda img, mask: alpha_matting_cutout_roi(img, mask, *THRESHOLDS, time_budget=0.05),
+}
+
+
+def synthetic_coin(width: int, height: int) -> tuple[Image.Image, Image.Image]:
+    rng = np.random.default_rng(0)
+    image = rng.integers(20, 70, size=(height, width, 3), dtype=np.uint8)
+    center, radius = (width // 2, height // 2), min(width, height) // 6
+    cv2.circle(image, center, radius, (200, 170, 90), -1)
+
+    mask = np.zeros((height, width), dtype=np.uint8)
+    cv2.circle(mask, center, radius, 255, -1)
+    mask = cv2.GaussianBlur(mask, (0, 0), sigmaX=radius / 12)
+    return Image.fromarray(image), Image.fromarray(mask)
+
+
+def run_variant(name: str, width: int, height: int) -> tuple[float, float, np.ndarray]:
+    # The first call pays for numba compilation inside pymatting, keep it out of the numbers.
+    alpha_matting_cutout_roi(*synthetic_coin(64, 64), *THRESHOLDS)
+    alpha_matting_cutout(*synthetic_coin(64, 64), *THRESHOLDS)
+
+    img, mask = synthetic_coin(width, height)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    result = np.asarray(VARIANTS[name](img, mask))
+    elapsed = time.perf_counter() - start
+    rss_growth_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+    return elapsed, rss_growth_kib / 1024, result[:, :, 3]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+
+    reference = None
+    print(f"{'variant':>18} | {'seconds':>8} | {'peak MiB':>8} | {'mean |alpha diff|':>17} | {'edge levels':>11}")
+    for name in VARIANTS:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            elapsed, peak_mib, alpha = executor.submit(run_variant, name, args.width, args.height).result()
+        if reference is None:
+            reference = alpha
+        alpha_diff = np.abs(reference.astype(np.int16) - alpha).mean()
+        edge_levels = len(np.unique(alpha[(reference > 0) & (reference < 255)]))
+        print(f"{name:>18} | {elapsed:>8.2f} | {peak_mib:>8.1f} | {alpha_diff:>17.3f} | {edge_levels:>11}")
+        # Under the time budget the naive cutout may be returned, which has no soft edge.
+        if "budget" not in name and edge_levels <= 1:
+            raise SystemExit(f"{name}: the alpha of the soft edge is constant, the solved alpha was not used")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+catalog_dir = Path("coin_catalog")
+
+
+def load_sample_images(count: int, size: tuple[int, int] = (1280, 720), catalog_path: Path = catalog_dir):
+    """
+    Loads up to `count` RGB sample images from the `uncropped` folders of the coin catalog.
+
+    When the catalog is missing or holds fewer pictures, the list is topped up with synthetic frames
+    (a bright disc on a noisy background) of the given (width, height), so benchmarks can run anywhere.
+    """
+    images = []
+    if catalog_path.is_dir():
+        for photo_path in sorted(catalog_path.glob("*/*/*/uncropped/*.png")):
+            image = cv2.imread(str(photo_path), cv2.IMREAD_COLOR)
+            if image is None:
+                continue
+            images.append(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+            if len(images) >= count:
+                return images
+
+    rng = np.random.default_rng(0)
+    width, height = size
+    while len(images) < count:
+        image = rng.integers(0, 80, size=(height, width, 3), dtype=np.uint8)
+        center = (int(rng.integers(width // 4, 3 * width // 4)), int(rng.integers(height // 4, 3 * height // 4)))
+        cv2.circle(image, center, int(min(width, height) * rng.uniform(0.1, 0.3)), (200, 170, 90), -1)
+        images.append(image)
+    return images
+
+
+def measure(func, repeats: int, warmup: int = 1) -> list[float]:
+    """Runs `func` `warmup` times untimed, then `repeats` times, returning the per-call durations in seconds."""
+    for _ in range(warmup):
+        func()
+
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def percentile_ms(durations: list[float], percentile: float) -> float:
+    return float(np.percentile(durations, percentile) * 1000) if durations else 0.0
@@ -0,0 +1,76 @@
+"""
+GUI-thread time of a camera list refresh: probing the indices one after another on the calling thread (the
+previous VideoModule) against the CameraEnumerator, for a first refresh and for repeated refreshes with the
+cache filled.
+
+Probing is simulated: each probe takes `--probe-ms`, the first `--cameras` indices exist.
+
+    python -m benchmarks.camera_enumeration --cameras 2 --probe-ms 300 --refreshes 5
+"""
+import argparse
+import time
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from core.modules.video_module.camera_enumerator import CameraEnumerator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cameras", type=int, default=2)
+    parser.add_argument("--probe-ms", type=float, default=300.0)
+    parser.add_argument("--refreshes", type=int, default=5)
+    args = parser.parse_args()
+
+    app = QCoreApplication([])
+    probes = 0
+
+    def probe(index: int) -> bool:
+        nonlocal probes
+        probes += 1
+        time.sleep(args.probe_ms / 1000)
+        return index < args.cameras
+
+    print(f"{'enumeration':>16} | {'refresh':>7} | {'GUI thread ms':>13} | {'probes':>6} | {'done after ms':>13}")
+
+    for refresh in range(args.refreshes):
+        probes = 0
+        start = time.perf_counter()
+        index = 0
+        while probe(index):
+            index += 1
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"{'blocking probe':>16} | {refresh:>7} | {elapsed_ms:>13.2f} | {probes:>6} | {elapsed_ms:>13.2f}")
+
+    enumerator = CameraEnumerator(probe=probe)
+    gui_time = 0.0
+
+    def timed(func):
+        def wrapper(*args):
+            nonlocal gui_time
+            start = time.perf_counter()
+            func(*args)
+            gui_time += time.perf_counter() - start
+        return wrapper
+
+    # Every slot of the enumerator that runs on the GUI thread is timed, the probe thread is not.
+    enumerator._probed.disconnect(enumerator._on_probed)
+    enumerator._probed.connect(timed(enumerator._on_probed))
+
+    for refresh in range(args.refreshes):
+        probes = 0
+        gui_time = 0.0
+        loop = QEventLoop()
+        enumerator._probed.connect(loop.quit)
+        start = time.perf_counter()
+        timed(enumerator.refresh)()
+        QTimer.singleShot(10_000, loop.quit)
+        loop.exec()
+        enumerator._probed.disconnect(loop.quit)
+        app.processEvents()
+        done_ms = (time.perf_counter() - start) * 1000
+        print(f"{'CameraEnumerator':>16} | {refresh:>7} | {gui_time * 1000:>13.2f} | {probes:>6} | {done_ms:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
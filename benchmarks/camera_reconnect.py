@@ -0,0 +1,150 @@
+"""
+GUI thread stalls and reopen attempts while a camera is unplugged and plugged back, when the GUI timer reopens
+the device right after a failed read (the previous VideoModule) against the CaptureEngine reconnecting with a
+backoff on its own thread.
+
+A simulated camera delivers `--camera-fps` frames, disappears after `--up` seconds for `--down` seconds and
+comes back; opening it takes `--open-ms` whether it is there or not, like a driver probing the device, and a
+read on a missing device fails after `--read-fail-ms`. A handle opened before the unplug stays dead.
+
+    python -m benchmarks.camera_reconnect --up 2 --down 6 --after 4 --open-ms 300
+"""
+import argparse
+import time
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication, QTimer, Qt
+
+from benchmarks.bench_utils import percentile_ms
+from core.modules.video_module.capture_engine import CaptureEngine
+
+
+class SimulatedDevice:
+    def __init__(self, up_s: float, down_s: float, open_ms: float, read_fail_ms: float, fps: float):
+        self.down_from = up_s
+        self.down_until = up_s + down_s
+        self.open_ms = open_ms
+        self.read_fail_ms = read_fail_ms
+        self.period = 1 / fps
+        self.start = time.perf_counter()
+        self.opens = 0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def present(self) -> bool:
+        return not self.down_from <= self.elapsed() < self.down_until
+
+    def open(self, device_id: int = 0) -> "SimulatedCapture":
+        return SimulatedCapture(self)
+
+
+class SimulatedCapture:
+    def __init__(self, device: SimulatedDevice):
+        time.sleep(device.open_ms / 1000)
+        device.opens += 1
+        self.device = device
+        self.opened_at = device.elapsed()
+        self.opened = device.present()
+        self.frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    def alive(self) -> bool:
+        now = self.device.elapsed()
+        unplugged_since_open = self.opened_at < self.device.down_until and now >= self.device.down_from
+        return self.opened and not unplugged_since_open
+
+    def isOpened(self) -> bool:
+        return self.opened
+
+    def grab(self) -> bool:
+        if not self.alive():
+            time.sleep(self.device.read_fail_ms / 1000)
+            return False
+        time.sleep(self.device.period)
+        return True
+
+    def retrieve(self, image=None):
+        return True, self.frame if image is None else image
+
+    def read(self):
+        return self.retrieve() if self.grab() else (False, None)
+
+    def release(self):
+        pass
+
+
+def run_timer(app: QCoreApplication, seconds: float, tick) -> list[float]:
+    intervals = []
+    last = time.perf_counter()
+
+    def on_timeout():
+        nonlocal last
+        now = time.perf_counter()
+        intervals.append(now - last)
+        last = now
+        tick()
+
+    timer = QTimer()
+    timer.setTimerType(Qt.TimerType.PreciseTimer)
+    timer.timeout.connect(on_timeout)
+    timer.start(16)
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec()
+    timer.stop()
+    return intervals[1:]
+
+
+def report(name: str, intervals: list[float], device: SimulatedDevice, first_frame_back: float | None):
+    stalls = sum(interval > 0.05 for interval in intervals)
+    recovered = f"{first_frame_back - device.down_until:.2f}" if first_frame_back is not None else "never"
+    print(f"{name:>14} | {percentile_ms(intervals, 99):>7.1f} | {max(intervals) * 1000:>7.1f} | {stalls:>11} | "
+          f"{device.opens:>5} | {recovered:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--up", type=float, default=2.0)
+    parser.add_argument("--down", type=float, default=6.0)
+    parser.add_argument("--after", type=float, default=4.0)
+    parser.add_argument("--open-ms", type=float, default=300.0)
+    parser.add_argument("--read-fail-ms", type=float, default=5.0)
+    parser.add_argument("--camera-fps", type=float, default=30.0)
+    args = parser.parse_args()
+
+    app = QCoreApplication([])
+    seconds = args.up + args.down + args.after
+    print(f"{'reconnect':>14} | {'p99 ms':>7} | {'max ms':>7} | {'ticks >50ms':>11} | {'opens':>5} | "
+          f"{'recovered s':>12}")
+
+    device = SimulatedDevice(args.up, args.down, args.open_ms, args.read_fail_ms, args.camera_fps)
+    capture = device.open()
+    first_frame_back = None
+
+    def poll():
+        nonlocal capture, first_frame_back
+        grabbed, _ = capture.read()
+        if not grabbed:
+            capture.release()
+            capture = device.open()
+        elif first_frame_back is None and device.elapsed() >= device.down_until:
+            first_frame_back = device.elapsed()
+
+    report("GUI timer", run_timer(app, seconds, poll), device, first_frame_back)
+
+    device = SimulatedDevice(args.up, args.down, args.open_ms, args.read_fail_ms, args.camera_fps)
+    engine = CaptureEngine(open_capture=device.open)
+    engine.start()
+    first_frame_back = None
+
+    def take():
+        nonlocal first_frame_back
+        if engine.take() is not None and first_frame_back is None and device.elapsed() >= device.down_until:
+            first_frame_back = device.elapsed()
+
+    intervals = run_timer(app, seconds, take)
+    engine.stop(wait=False)
+    report("CaptureEngine", intervals, device, first_frame_back)
+
+
+if __name__ == "__main__":
+    main()
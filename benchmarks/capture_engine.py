@@ -0,0 +1,135 @@
+"""
+GUI tick pacing and delivered frames when the camera is read from a QTimer on the GUI thread (the previous
+VideoModule), against the CaptureEngine thread with the timer only taking the newest frame.
+
+A synthetic camera produces `--camera-fps` frames and blocks in read()/grab() until the next one is due, like
+a driver does; `--slow-read-ratio` of the reads stall for another `--slow-read-ms`. Every tick spends
+`--handler-ms` on the frame, standing in for the ring publish and the frame handlers.
+
+    python -m benchmarks.capture_engine --seconds 10 --camera-fps 60 --interval-ms 16 --handler-ms 8
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication, QTimer, Qt
+
+from benchmarks.bench_utils import percentile_ms
+from core.modules.video_module.capture_engine import CaptureEngine
+
+
+class SyntheticCamera:
+    def __init__(self, fps: float, slow_read_ratio: float, slow_read_ms: float, shape=(720, 1280, 3)):
+        self.period = 1 / fps
+        self.slow_read_ratio = slow_read_ratio
+        self.slow_read_ms = slow_read_ms
+        self.frame = np.zeros(shape, dtype=np.uint8)
+        self.start = time.perf_counter()
+        self.last_index = -1
+
+    def produced(self) -> int:
+        return int((time.perf_counter() - self.start) / self.period)
+
+    def isOpened(self) -> bool:
+        return True
+
+    def grab(self) -> bool:
+        # Wait for the next frame, a frame the driver produced while nobody grabbed it is lost.
+        next_index = max(self.produced(), self.last_index + 1)
+        time.sleep(max(self.start + next_index * self.period - time.perf_counter(), 0))
+        if random.random() < self.slow_read_ratio:
+            time.sleep(self.slow_read_ms / 1000)
+        self.last_index = next_index
+        return True
+
+    def retrieve(self, image=None):
+        if image is None:
+            image = np.empty_like(self.frame)
+        image[0, 0, 0] = self.last_index % 256
+        return True, image
+
+    def read(self):
+        self.grab()
+        return self.retrieve()
+
+    def release(self):
+        pass
+
+
+def busy_wait(ms: float):
+    deadline = time.perf_counter() + ms / 1000
+    while time.perf_counter() < deadline:
+        pass
+
+
+def run_timer(app: QCoreApplication, interval_ms: int, seconds: float, tick) -> list[float]:
+    intervals = []
+    last = time.perf_counter()
+
+    def on_timeout():
+        nonlocal last
+        now = time.perf_counter()
+        intervals.append(now - last)
+        last = now
+        tick()
+
+    timer = QTimer()
+    timer.setTimerType(Qt.TimerType.PreciseTimer)
+    timer.timeout.connect(on_timeout)
+    timer.start(interval_ms)
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec()
+    timer.stop()
+    return intervals[1:]
+
+
+def report(name: str, intervals: list[float], delivered: int, captured: int, dropped: int, produced: int,
+           seconds: float):
+    print(f"{name:>14} | {percentile_ms(intervals, 50):>7.2f} | {percentile_ms(intervals, 99):>7.2f} | "
+          f"{max(intervals) * 1000:>7.2f} | {captured / seconds:>11.2f} | {delivered / seconds:>13.2f} | "
+          f"{dropped:>7} | {produced - captured:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--camera-fps", type=float, default=60.0)
+    parser.add_argument("--interval-ms", type=int, default=16)
+    parser.add_argument("--handler-ms", type=float, default=8.0)
+    parser.add_argument("--slow-read-ratio", type=float, default=0.05)
+    parser.add_argument("--slow-read-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    app = QCoreApplication([])
+    print(f"{'capture':>14} | {'p50 ms':>7} | {'p99 ms':>7} | {'max ms':>7} | {'capture fps':>11} | "
+          f"{'delivered fps':>13} | {'dropped':>7} | {'lost in driver':>13}")
+
+    camera = SyntheticCamera(args.camera_fps, args.slow_read_ratio, args.slow_read_ms)
+    delivered = 0
+
+    def poll():
+        nonlocal delivered
+        camera.read()
+        busy_wait(args.handler_ms)
+        delivered += 1
+
+    intervals = run_timer(app, args.interval_ms, args.seconds, poll)
+    report("timer read()", intervals, delivered, delivered, 0, camera.produced(), args.seconds)
+
+    camera = SyntheticCamera(args.camera_fps, args.slow_read_ratio, args.slow_read_ms)
+    engine = CaptureEngine(open_capture=lambda device_id: camera)
+    engine.start()
+
+    def take():
+        if engine.take() is not None:
+            busy_wait(args.handler_ms)
+
+    intervals = run_timer(app, args.interval_ms, args.seconds, take)
+    engine.stop()
+    report("CaptureEngine", intervals, engine.delivered, engine.captured, engine.dropped, camera.produced(),
+           args.seconds)
+
+
+if __name__ == "__main__":
+    main()
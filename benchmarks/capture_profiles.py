@@ -0,0 +1,70 @@
+"""
+Sustained frame rate of a real camera for each candidate capture profile.
+
+Every profile is negotiated on a freshly opened device, the effective mode is read back, and after
+`--warmup` seconds (auto exposure and the driver's buffers settle) frames are grabbed and decoded for
+`--seconds`. Profiles default to MJPG and YUYV at 1080p, 720p and 480p, at 60 and 30 FPS.
+
+    python -m benchmarks.capture_profiles --device 0 --seconds 5
+    python -m benchmarks.capture_profiles --profiles MJPG:1920x1080@60 YUYV:1920x1080@5
+"""
+import argparse
+import time
+
+import cv2
+
+from core.modules.video_module.capture_engine import open_camera
+from core.modules.video_module.capture_profile import CaptureProfile, apply_profile, matches
+
+DEFAULT_PROFILES = [f"{fourcc}:{size}@{fps}"
+                    for fourcc in ("MJPG", "YUYV")
+                    for size in ("1920x1080", "1280x720", "640x480")
+                    for fps in (60, 30)]
+
+
+def sustained_fps(capture: cv2.VideoCapture, warmup: float, seconds: float) -> tuple[float, int]:
+    """Returns the frames per second over `seconds` after `warmup`, and the failed reads."""
+    frame = None
+    failures = 0
+    deadline = time.perf_counter() + warmup
+    while time.perf_counter() < deadline:
+        capture.read()
+
+    frames = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        if capture.grab():
+            grabbed, frame = capture.retrieve(frame)
+            if grabbed:
+                frames += 1
+                continue
+        failures += 1
+    return frames / (time.perf_counter() - start), failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--device", type=int, default=0)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--profiles", nargs="+", default=DEFAULT_PROFILES)
+    args = parser.parse_args()
+
+    profiles = [CaptureProfile.parse(text) for text in args.profiles]
+
+    print(f"{'requested':>18} | {'effective':>18} | {'match':>5} | {'sustained fps':>13} | {'failed':>6}")
+    for profile in profiles:
+        capture = open_camera(args.device)
+        if not capture.isOpened():
+            raise SystemExit(f"Camera {args.device} cannot be opened")
+        try:
+            mode = apply_profile(capture, profile)
+            fps, failures = sustained_fps(capture, args.warmup, args.seconds)
+        finally:
+            capture.release()
+        print(f"{str(profile):>18} | {str(mode):>18} | {'yes' if matches(mode, profile) else 'no':>5} | "
+              f"{fps:>13.2f} | {failures:>6}")
+
+
+if __name__ == "__main__":
+    main()
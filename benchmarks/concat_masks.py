@@ -0,0 +1,52 @@
+"""
+Vertical concatenation of per-mask cutouts (bg.get_concat_v_multi) for 1, 4 and 16 masks: the previous
+pairwise implementation, which re-pastes everything accumulated so far for every mask, against the
+single-allocation one with PIL and with ndarray inputs.
+
+    python -m benchmarks.concat_masks --masks 1 4 16 --repeats 20
+"""
+import argparse
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.bench_utils import measure, percentile_ms
+from core.utilities.bg import get_concat_v, get_concat_v_multi
+
+
+def legacy_concat_v_multi(imgs):
+    imgs = list(imgs)  # the previous implementation popped from the caller's list
+    pivot = imgs.pop(0)
+    for im in imgs:
+        pivot = get_concat_v(pivot, im)
+    return pivot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--masks", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    print(f"{'masks':>5} | {'implementation':>17} | {'p50 ms':>8} | {'p95 ms':>8}")
+    for count in args.masks:
+        arrays = [rng.integers(0, 256, size=(args.height, args.width, 4), dtype=np.uint8) for _ in range(count)]
+        images = [Image.fromarray(array, mode="RGBA") for array in arrays]
+        assert np.array_equal(np.asarray(legacy_concat_v_multi(images)), np.asarray(get_concat_v_multi(arrays)))
+
+        candidates = {
+            "legacy (PIL)": lambda: legacy_concat_v_multi(images),
+            "current (PIL)": lambda: get_concat_v_multi(images),
+            "current (ndarray)": lambda: get_concat_v_multi(arrays),
+        }
+        for name, func in candidates.items():
+            durations = measure(func, args.repeats)
+            print(f"{count:>5} | {name:>17} | {percentile_ms(durations, 50):>8.2f} | {percentile_ms(durations, 95):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
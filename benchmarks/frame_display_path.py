@@ -0,0 +1,99 @@
+"""
+Per-frame copies and CPU time of the camera frame path at 1080p, from the captured BGR frame to the displayed
+QPixmap and the array handed to background removal:
+
+    before  cvtColor(BGR2RGB) into the ring slot, cv2_to_qimage(view).copy(), QPixmap(image),
+            qimage_to_cv2 (RGB888 -> BGR) in the ProcessingModule
+    after   copy into the ring slot, bgr_to_qimage(view) (an owned BGR888 QImage), qimage_to_pixmap(image)
+            (one cvtColor into an RGB32 image the QPixmap shares), qimage_to_cv2 (a view of the BGR888 image)
+
+A step counts as a frame copy when its result does not share memory with its input.
+
+    python -m benchmarks.frame_display_path --frames 300
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+from PySide6.QtGui import QGuiApplication, QPixmap
+
+from core.utilities.frame_ring import FrameRingBuffer
+from core.utilities.helper import bgr_to_qimage, cv2_to_qimage, qimage_to_cv2, qimage_to_pixmap, qimage_view
+
+
+def before(ring: FrameRingBuffer, frame: np.ndarray) -> list[tuple[str, float, bool]]:
+    steps = []
+    start = time.process_time()
+    slot, view = ring.acquire(frame.shape)
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=view)
+    ring.commit(slot, frame.shape)
+    steps.append(("ring publish", time.process_time() - start, True))
+
+    start = time.process_time()
+    view, _, _ = ring.read(slot)
+    image = cv2_to_qimage(view).copy()
+    steps.append(("QImage", time.process_time() - start, True))
+
+    start = time.process_time()
+    QPixmap(image)
+    steps.append(("QPixmap", time.process_time() - start, True))
+
+    start = time.process_time()
+    array = qimage_to_cv2(image)
+    steps.append(("processing input", time.process_time() - start, not np.shares_memory(array, qimage_view(image))))
+    return steps
+
+
+def after(ring: FrameRingBuffer, frame: np.ndarray) -> list[tuple[str, float, bool]]:
+    steps = []
+    start = time.process_time()
+    slot, view = ring.acquire(frame.shape)
+    np.copyto(view, frame)
+    ring.commit(slot, frame.shape)
+    steps.append(("ring publish", time.process_time() - start, True))
+
+    start = time.process_time()
+    view, _, _ = ring.read(slot)
+    image = bgr_to_qimage(view)
+    steps.append(("QImage", time.process_time() - start, True))
+
+    start = time.process_time()
+    qimage_to_pixmap(image)
+    steps.append(("QPixmap", time.process_time() - start, True))
+
+    start = time.process_time()
+    array = qimage_to_cv2(image)
+    steps.append(("processing input", time.process_time() - start,
+                  not np.shares_memory(array, qimage_view(image, writable=False))))
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    app = QGuiApplication([])
+    frame = np.random.default_rng(0).integers(0, 255, size=(1080, 1920, 3), dtype=np.uint8)
+    ring = FrameRingBuffer(slots=4, frame_shape=frame.shape)
+
+    print(f"{'path':>6} | {'step':>16} | {'copies':>6} | {'CPU ms/frame':>12}")
+    for name, run in (("before", before), ("after", after)):
+        totals: dict[str, float] = {}
+        copies: dict[str, bool] = {}
+        for _ in range(args.frames):
+            for step, cpu, copied in run(ring, frame):
+                totals[step] = totals.get(step, 0.0) + cpu
+                copies[step] = copied
+        for step, total in totals.items():
+            print(f"{name:>6} | {step:>16} | {int(copies[step]):>6} | {total / args.frames * 1000:>12.3f}")
+        print(f"{name:>6} | {'total':>16} | {sum(copies.values()):>6} | "
+              f"{sum(totals.values()) / args.frames * 1000:>12.3f}")
+
+    ring.close()
+    del app
+
+
+if __name__ == "__main__":
+    main()
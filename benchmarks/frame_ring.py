@@ -0,0 +1,128 @@
+"""
+Throughput of the shared-memory FrameRingBuffer with one producer and two reader processes, against sending
+every frame pickled through a multiprocessing queue per reader, at 1080p and 4K.
+
+The producer publishes frames as fast as it can; into the queues it blocks until both readers have room.
+Each reader follows the newest frame and reduces it to a checksum. Ring readers do that on the zero-copy
+view and count the frames overwritten while they read them (torn).
+
+    python -m benchmarks.frame_ring --seconds 5
+"""
+import argparse
+import multiprocessing
+import queue
+import time
+
+import numpy as np
+
+from core.utilities.frame_ring import FrameRingBuffer
+
+RESOLUTIONS = {"1080p": (1080, 1920, 3), "4K": (2160, 3840, 3)}
+
+
+def ring_reader(ring_name: str, seconds: float, results):
+    ring = FrameRingBuffer(ring_name)
+    frames = torn = 0
+    last_sequence = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        slot = ring.latest()
+        if slot < 0:
+            continue
+        frame, sequence, _ = ring.read(slot)
+        if sequence == 0 or sequence == last_sequence:
+            time.sleep(0.0002)
+            continue
+        int(frame[::8, ::8].sum())
+        del frame
+        if ring.is_current(slot, sequence):
+            frames += 1
+        else:
+            torn += 1
+        last_sequence = sequence
+    ring.close()
+    results.put((frames, torn))
+
+
+def queue_reader(frames_queue, seconds: float, results):
+    frames = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            frame = frames_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        int(frame[::8, ::8].sum())
+        frames += 1
+    results.put((frames, 0))
+    # Leftover frames would keep the queue's feeder thread, and this process, from exiting.
+    frames_queue.cancel_join_thread()
+
+
+def run(context, mode: str, shape: tuple, seconds: float, readers: int) -> tuple[float, list]:
+    source = [np.full(shape, value, dtype=np.uint8) for value in (40, 200)]
+    results = context.Queue()
+
+    if mode == "ring":
+        ring = FrameRingBuffer(slots=4, frame_shape=shape)
+        processes = [context.Process(target=ring_reader, args=(ring.name, seconds, results)) for _ in range(readers)]
+        send = lambda frame: ring.write(frame)
+    else:
+        queues = [context.Queue(maxsize=2) for _ in range(readers)]
+        processes = [context.Process(target=queue_reader, args=(frames_queue, seconds, results))
+                     for frames_queue in queues]
+
+        def send(frame):
+            # Blocking, so the producer rate is what actually reaches the readers after pickling.
+            for frames_queue in queues:
+                frames_queue.put(frame, timeout=1.0)
+
+    for process in processes:
+        process.start()
+    time.sleep(1.0)  # let the readers start up before the clock runs
+
+    produced = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds - 1.0:
+        try:
+            send(source[produced % 2])
+        except queue.Full:
+            break
+        produced += 1
+    elapsed = time.perf_counter() - start
+
+    reader_results = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    if mode == "ring":
+        ring.close()
+    else:
+        for frames_queue in queues:
+            frames_queue.cancel_join_thread()
+    return produced / elapsed, reader_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--resolutions", nargs="+", default=list(RESOLUTIONS), choices=list(RESOLUTIONS))
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    reader_seconds = args.seconds + 1.0
+
+    print(f"{'resolution':>10} | {'transport':>9} | {'produced fps':>12} | {'producer GB/s':>13} | "
+          f"{'reader fps':>16} | {'torn':>5}")
+    for resolution in args.resolutions:
+        shape = RESOLUTIONS[resolution]
+        for mode in ("ring", "queue"):
+            produced_fps, reader_results = run(context, mode, shape, reader_seconds, args.readers)
+            reader_fps = " / ".join(f"{frames / args.seconds:.1f}" for frames, _ in reader_results)
+            torn = sum(torn for _, torn in reader_results)
+            print(f"{resolution:>10} | {mode:>9} | {produced_fps:>12.1f} | "
+                  f"{produced_fps * np.prod(shape) / 1e9:>13.2f} | {reader_fps:>16} | {torn:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+End-to-end throughput of the live background removal path without a camera: a frame source feeds the
+VideoModule, and a consumer does what the ImageCollector does with auto background deletion on. It reads each
+FrameAvailable from the ring into a QImage, converts it for display and sends a RemoveBackgroundRequest
+(temporal and ROI on) to the ProcessingModule whenever none is in flight.
+
+Reported are the captured, published (FrameAvailable, read and converted for display) and processed frame
+rates, and p50/p95 of the latency from capture to the cutout arriving back on the GUI thread with its stages
+(see FrameTiming; paint is the display conversion of the camera frame). Runs headless (offscreen Qt platform by
+default).
+
+    python -m benchmarks.live_pipeline --source synthetic:1280x720@30 --seconds 20
+    python -m benchmarks.live_pipeline --source images:coin_catalog --fast
+"""
+import argparse
+import os
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="synthetic:1280x720@30", help="spec for open_frame_source")
+    parser.add_argument("--fast", action="store_true", help="play the source as fast as possible")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+
+    from core.modules.processing_module.ProcessingModule import ProcessingModule
+    from core.modules.video_module.video_module import VideoModule
+    from core.qt_communication.base import CommonSignals, Modules, ResponseFuture, async_request
+    from core.qt_communication.frame_latency import FrameLatencyTracker, FrameTiming
+    from core.qt_communication.messages.processing_module.Requests import RemoveBackgroundRequest
+    from core.qt_communication.messages.processing_module.Responses import ProcessedImageResponse
+    from core.qt_communication.messages.video_module.Responses import FrameAvailable
+    from core.utilities.frame_ring import FrameRingBuffer
+    from core.utilities.helper import bgr_to_qimage, qimage_to_pixmap
+
+    app = QApplication([])
+    signals = CommonSignals()
+
+    processing_module = ProcessingModule()
+    processing_module.start_process()
+    video_module = VideoModule(frame_source=args.source, realtime=not args.fast)
+
+    ring: FrameRingBuffer | None = None
+    in_flight: ResponseFuture | None = None
+    counts = {"published": 0, "processed": 0}
+    tracker = FrameLatencyTracker(window=100_000)
+    measuring = False
+
+    def on_response(future: ResponseFuture):
+        response = future.result()
+        if measuring and response is not None:
+            counts["processed"] += 1
+            tracker.record(response.frame_timing)
+
+    def on_frame(message):
+        nonlocal ring, in_flight
+        if not isinstance(message, FrameAvailable):
+            return
+        received_at = time.perf_counter()
+        if ring is None or ring.name != message.ring_name:
+            ring = FrameRingBuffer(message.ring_name)
+        frame, sequence, _ = ring.read(message.slot)
+        if sequence != message.sequence:
+            return
+        image = bgr_to_qimage(frame)
+        del frame
+        timing = FrameTiming(message.sequence, message.timestamp)
+        timing.add("capture", message.timestamp, message.published_at)
+        start = timing.add("convert", received_at)
+        qimage_to_pixmap(image)
+        timing.add("paint", start)
+        if measuring:
+            counts["published"] += 1
+
+        if in_flight is None or in_flight.done():
+            request = RemoveBackgroundRequest(picture=image, use_cache=False, temporal=True, roi=True,
+                                              frame_timing=timing, source=Modules.CATALOG_HANDLER,
+                                              destination=Modules.PROCESSING_MODULE)
+            timing.requested_at = time.perf_counter()
+            in_flight = async_request(signals.processing_module_request, request, signals.processing_module_request,
+                                      ProcessedImageResponse,
+                                      callback=on_response)
+
+    signals.frame_received.connect(on_frame)
+    video_module.start_process()
+
+    def start_measuring():
+        nonlocal measuring
+        measuring = True
+        video_module.capture_engine.stats()
+
+    capture_stats = {}
+
+    def stop():
+        capture_stats.update(video_module.capture_engine.stats())
+        app.quit()
+
+    QTimer.singleShot(int(args.warmup * 1000), start_measuring)
+    QTimer.singleShot(int((args.warmup + args.seconds) * 1000), stop)
+    app.exec()
+
+    video_module.stop_process()
+    processing_module.stop_process()
+    if ring is not None:
+        ring.close()
+
+    print(f"source            {video_module.camera_list[0]} ({'as fast as possible' if args.fast else 'real time'})")
+    print(f"captured fps      {capture_stats['capture_fps']:.2f}")
+    for name, count in counts.items():
+        print(f"{name + ' fps':<17} {count / args.seconds:.2f}")
+    print(f"dropped frames    {capture_stats['dropped']}")
+    summary = tracker.summary()
+    for stage in ("total",) + FrameTiming.STAGES:
+        if stage in summary:
+            print(f"{stage + ' ms':<17} p50 {summary[stage]['p50']:.1f} | p95 {summary[stage]['p95']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
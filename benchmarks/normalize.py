@@ -0,0 +1,83 @@
+"""
+Micro-benchmark for BaseSession.normalize: per-call latency and allocated bytes of the previous
+float64 PIL implementation against the current float32 OpenCV one.
+
+    python -m benchmarks.normalize --repeats 200
+"""
+import argparse
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.bench_utils import load_sample_images, measure, percentile_ms
+from core.utilities.u2net.session.base import BaseSession
+
+MEAN = (0.485, 0.456, 0.406)
+STD = (0.229, 0.224, 0.225)
+SIZE = (320, 320)
+
+
+def legacy_normalize(img, mean, std, size):
+    im = img.convert("RGB").resize(size, Image.Resampling.LANCZOS)
+
+    im_ary = np.array(im)
+    im_ary = im_ary / np.max(im_ary)
+
+    tmpImg = np.zeros((im_ary.shape[0], im_ary.shape[1], 3))
+    tmpImg[:, :, 0] = (im_ary[:, :, 0] - mean[0]) / std[0]
+    tmpImg[:, :, 1] = (im_ary[:, :, 1] - mean[1]) / std[1]
+    tmpImg[:, :, 2] = (im_ary[:, :, 2] - mean[2]) / std[2]
+
+    tmpImg = tmpImg.transpose((2, 0, 1))
+
+    return {"input.1": np.expand_dims(tmpImg, 0).astype(np.float32)}
+
+
+def make_session() -> BaseSession:
+    # normalize() only needs the input name, so no model has to be loaded.
+    session = BaseSession.__new__(BaseSession)
+    session._normalize_buffer = None
+    session.input_name = "input.1"
+    return session
+
+
+def allocated_bytes(func) -> int:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args()
+
+    frame = load_sample_images(1, size=(args.width, args.height))[0]
+    pil_frame = Image.fromarray(frame)
+    session = make_session()
+
+    candidates = {
+        "legacy (PIL, float64)": lambda: legacy_normalize(pil_frame, MEAN, STD, SIZE),
+        "current (PIL input)": lambda: session.normalize(pil_frame, MEAN, STD, SIZE),
+        "current (ndarray input)": lambda: session.normalize(frame, MEAN, STD, SIZE),
+    }
+
+    legacy = legacy_normalize(pil_frame, MEAN, STD, SIZE)["input.1"]
+    current = session.normalize(frame, MEAN, STD, SIZE)["input.1"]
+    print(f"max abs difference to legacy output: {np.abs(legacy - current).max():.4f}")
+
+    print(f"{'implementation':>24} | {'p50 ms':>8} | {'p95 ms':>8} | {'peak alloc KiB':>14}")
+    for name, func in candidates.items():
+        durations = measure(func, args.repeats)
+        peak = allocated_bytes(func)
+        print(f"{name:>24} | {percentile_ms(durations, 50):>8.2f} | {percentile_ms(durations, 95):>8.2f} | "
+              f"{peak / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+GUI frame pacing while background removal runs continuously, with removal on a thread of the GUI process
+(the default ProcessingModule backend) against the RemoveBackgroundPool worker processes.
+
+A QTimer on the main thread stands in for the GUI: it ticks every `--interval-ms` and converts a frame to a
+QImage like the video view does. The spread of the measured tick intervals shows how much the removal work
+delays the GUI thread (GIL contention and CPU load).
+
+    python -m benchmarks.processing_pool_pacing --seconds 10 --pool-sizes 1 2 --threads 1
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication, QTimer
+
+from benchmarks.bench_utils import load_sample_images, percentile_ms
+from core.modules.processing_module.process_pool import RemoveBackgroundPool
+from core.utilities.helper import cv2_to_qimage, remove, warmup
+
+
+def run_gui_loop(app: QCoreApplication, frame: np.ndarray, interval_ms: int, seconds: float) -> list[float]:
+    intervals = []
+    last = time.perf_counter()
+
+    def tick():
+        nonlocal last
+        now = time.perf_counter()
+        intervals.append(now - last)
+        last = now
+        cv2_to_qimage(frame)
+
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    timer.start(interval_ms)
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec()
+    timer.stop()
+    return intervals[1:]
+
+
+def run_with_load(app, frame, interval_ms, seconds, remove_frame) -> tuple[list[float], int]:
+    stop = threading.Event()
+    processed = 0
+
+    def load():
+        nonlocal processed
+        while not stop.is_set():
+            remove_frame()
+            processed += 1
+
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    intervals = run_gui_loop(app, frame, interval_ms, seconds)
+    stop.set()
+    thread.join()
+    return intervals, processed
+
+
+def report(name: str, intervals: list[float], processed: int, seconds: float, interval_ms: int):
+    late = sum(interval > 1.5 * interval_ms / 1000 for interval in intervals)
+    print(f"{name:>18} | {percentile_ms(intervals, 50):>8.2f} | {percentile_ms(intervals, 95):>8.2f} | "
+          f"{percentile_ms(intervals, 99):>8.2f} | {max(intervals) * 1000:>8.2f} | {late:>5} | "
+          f"{processed / seconds:>11.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--interval-ms", type=int, default=16)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--threads", type=int, default=1, help="ONNX Runtime threads per pool worker")
+    args = parser.parse_args()
+
+    app = QCoreApplication([])
+    frame = load_sample_images(1)[0]
+
+    print(f"{'backend':>18} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'max ms':>8} | {'late':>5} | "
+          f"{'removals/s':>11}")
+    report("idle", run_gui_loop(app, frame, args.interval_ms, args.seconds), 0, args.seconds, args.interval_ms)
+
+    warmup()
+    intervals, processed = run_with_load(app, frame, args.interval_ms, args.seconds,
+                                         lambda: remove(frame, use_cache=False))
+    report("thread", intervals, processed, args.seconds, args.interval_ms)
+
+    for pool_size in args.pool_sizes:
+        pool = RemoveBackgroundPool(pool_size, args.threads)
+        # One submitter per worker keeps every process busy, like a full job queue does.
+        stop = threading.Event()
+        counts = [0] * pool_size
+
+        def feed(idx):
+            while not stop.is_set():
+                pool.remove(frame, use_cache=False)
+                counts[idx] += 1
+
+        feeders = [threading.Thread(target=feed, args=(idx,), daemon=True) for idx in range(pool_size)]
+        for feeder in feeders:
+            feeder.start()
+        intervals = run_gui_loop(app, frame, args.interval_ms, args.seconds)
+        stop.set()
+        for feeder in feeders:
+            feeder.join()
+        pool.close()
+        report(f"pool x{pool_size}", intervals, sum(counts), args.seconds, args.interval_ms)
+
+
+if __name__ == "__main__":
+    main()
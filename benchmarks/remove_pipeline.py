@@ -0,0 +1,60 @@
+"""
+Latency of background removal for one camera-sized frame: the previous PIL pipeline (ndarray -> PIL,
+PIL mask with LANCZOS resize, Image.composite, np.asarray) against the NumPy-only one (uint8 mask,
+OpenCV upsampling, alpha written into a reused RGBA buffer). Inference is timed separately so the
+pipeline overhead is visible on its own.
+
+    python -m benchmarks.remove_pipeline --width 1920 --height 1080
+"""
+import argparse
+
+import numpy as np
+import onnxruntime as ort
+from PIL import Image
+
+from benchmarks.bench_utils import load_sample_images, measure, percentile_ms
+from core.utilities.bg import naive_cutout, naive_cutout_array
+from core.utilities.u2net.session.u2net import U2netSession
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=30)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args()
+
+    session = U2netSession("u2net", ort.SessionOptions(), ["CPUExecutionProvider"], (), ())
+    frame = load_sample_images(1, size=(args.width, args.height))[0]
+    mask = session.predict_array(frame)[0]
+    pil_mask = Image.fromarray(mask, mode="L")
+    buffer = np.empty((frame.shape[0], frame.shape[1], 4), dtype=np.uint8)
+
+    def legacy_full():
+        img = Image.fromarray(frame)
+        pred = session.inner_session.run(
+            None, session.normalize(img, (0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320))
+        )[0][:, 0, :, :]
+        pred = np.squeeze((pred - np.min(pred)) / (np.max(pred) - np.min(pred)))
+        legacy_mask = Image.fromarray((pred * 255).astype("uint8"), mode="L").resize(img.size, Image.Resampling.LANCZOS)
+        return np.asarray(naive_cutout(img, legacy_mask))
+
+    def numpy_full():
+        return naive_cutout_array(frame, session.predict_array(frame)[0], buffer)
+
+    candidates = {
+        "PIL pipeline": legacy_full,
+        "NumPy pipeline": numpy_full,
+        "PIL cutout only": lambda: np.asarray(naive_cutout(Image.fromarray(frame), pil_mask)),
+        "NumPy cutout only": lambda: naive_cutout_array(frame, mask, buffer),
+    }
+
+    print(f"frame {frame.shape[1]}x{frame.shape[0]}")
+    print(f"{'variant':>18} | {'p50 ms':>8} | {'p95 ms':>8}")
+    for name, func in candidates.items():
+        durations = measure(func, args.repeats)
+        print(f"{name:>18} | {percentile_ms(durations, 50):>8.2f} | {percentile_ms(durations, 95):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
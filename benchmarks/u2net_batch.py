@@ -0,0 +1,39 @@
+"""
+Compares u2net throughput (images/sec) for different inference batch sizes on CPU.
+
+Run from the repository root so the model is found at core/utilities/u2net/u2net.onnx:
+
+    python -m benchmarks.u2net_batch --images 32
+"""
+import argparse
+import time
+
+import onnxruntime as ort
+from PIL import Image
+
+from benchmarks.bench_utils import load_sample_images
+from core.utilities.u2net.session.u2net import U2netSession
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=32, help="number of images processed per batch size")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    session = U2netSession("u2net", ort.SessionOptions(), ["CPUExecutionProvider"], (), ())
+    images = [Image.fromarray(image) for image in load_sample_images(args.images)]
+
+    # Warm up the session so the first measured batch size does not pay for lazy initialization.
+    session.predict(images[0])
+
+    print(f"{'batch size':>10} | {'seconds':>8} | {'images/sec':>10}")
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        session.predict_batch(images, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"{batch_size:>10} | {elapsed:>8.2f} | {len(images) / elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
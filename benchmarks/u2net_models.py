@@ -0,0 +1,85 @@
+"""
+Latency, memory and mask quality of the registered segmentation models (see
+core/utilities/u2net/session/registry.py) on a sample set from the coin catalog.
+
+Each model runs in a fresh interpreter; memory is the resident set growth caused by loading the model and
+running it. Mask IoU is measured against full u2net on the same pictures, with masks thresholded at 127:
+
+    python -m benchmarks.u2net_models --models u2net u2netp u2net_int8_dynamic u2net_int8_static
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+PROBE = """
+import resource
+import sys
+import numpy as np
+from benchmarks.bench_utils import load_sample_images, measure, percentile_ms
+from core.utilities.u2net.session.config import SessionConfig
+from core.utilities.u2net.session.u2net import U2netSession
+
+images = load_sample_images({count})
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+session = U2netSession("{model}", SessionConfig.from_env(), ["CPUExecutionProvider"], (), ())
+masks = [session.predict_array(image)[0] for image in images]
+durations = []
+for image in images:
+    durations.extend(measure(lambda: session.predict_array(image), {repeats}, warmup=0))
+rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+np.savez(sys.argv[1], *masks)
+print(percentile_ms(durations, 50), percentile_ms(durations, 95), rss_growth / 1024)
+"""
+
+
+def run_probe(model: str, count: int, repeats: int, masks_path: str) -> tuple[float, float, float]:
+    output = subprocess.run([sys.executable, "-c", PROBE.format(model=model, count=count, repeats=repeats),
+                             masks_path], capture_output=True, text=True, check=True).stdout
+    p50, p95, rss_mb = (float(value) for value in output.split()[-3:])
+    return p50, p95, rss_mb
+
+
+def mean_iou(masks: list[np.ndarray], reference: list[np.ndarray], threshold: int = 127) -> float:
+    ious = []
+    for mask, reference_mask in zip(masks, reference):
+        foreground, reference_foreground = mask > threshold, reference_mask > threshold
+        union = np.logical_or(foreground, reference_foreground).sum()
+        ious.append(np.logical_and(foreground, reference_foreground).sum() / union if union else 1.0)
+    return float(np.mean(ious))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="+",
+                        default=["u2net", "u2netp", "u2net_int8_dynamic", "u2net_int8_static"])
+    parser.add_argument("--images", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    models = ["u2net"] + [model for model in args.models if model != "u2net"]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = {}
+        for model in models:
+            masks_path = os.path.join(tmp_dir, f"{model}.npz")
+            try:
+                results[model] = run_probe(model, args.images, args.repeats, masks_path) + (list(np.load(masks_path).values()),)
+            except subprocess.CalledProcessError as e:
+                print(f"{model}: failed\n{e.stderr.strip().splitlines()[-1] if e.stderr else ''}")
+
+    if "u2net" not in results:
+        print("The reference model u2net could not be run")
+        return
+
+    reference = results["u2net"][3]
+    print(f"{'model':>20} | {'p50 ms':>8} | {'p95 ms':>8} | {'RSS MB':>8} | {'IoU vs u2net':>12}")
+    for model, (p50, p95, rss_mb, masks) in results.items():
+        print(f"{model:>20} | {p50:>8.2f} | {p95:>8.2f} | {rss_mb:>8.1f} | {mean_iou(masks, reference):>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Cold-start time and steady-state latency of the u2net session for several ONNX Runtime thread settings,
+each with the optimized-model cache cold (first start) and warm (later starts).
+
+Every measurement runs in a fresh interpreter so the settings are applied from the environment exactly
+as the application reads them:
+
+    python -m benchmarks.u2net_session_options --threads 1 2 4 0
+"""
+import argparse
+import glob
+import os
+import subprocess
+import sys
+
+PROBE = """
+import time
+start = time.perf_counter()
+from PIL import Image
+from core.utilities.u2net.session.config import SessionConfig
+from core.utilities.u2net.session.u2net import U2netSession
+session = U2netSession("u2net", SessionConfig.from_env(), ["CPUExecutionProvider"], (), ())
+image = Image.new("RGB", (1280, 720), (90, 90, 90))
+session.predict(image)
+cold = time.perf_counter() - start
+
+durations = []
+for _ in range({repeats}):
+    start = time.perf_counter()
+    session.predict(image)
+    durations.append(time.perf_counter() - start)
+durations.sort()
+print(cold, durations[len(durations) // 2], durations[int(len(durations) * 0.95) - 1])
+"""
+
+
+def run_probe(env: dict, repeats: int) -> tuple[float, float, float]:
+    output = subprocess.run([sys.executable, "-c", PROBE.format(repeats=repeats)], env=env,
+                            capture_output=True, text=True, check=True).stdout
+    cold, p50, p95 = (float(value) for value in output.split()[-3:])
+    return cold, p50, p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 0],
+                        help="intra-op thread counts to compare (0 lets ONNX Runtime decide)")
+    parser.add_argument("--modes", nargs="+", default=["sequential", "parallel"])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    cache_pattern = os.path.join("core", "utilities", "u2net", "*.opt.onnx")
+
+    print(f"{'mode':>10} | {'threads':>7} | {'cache':>5} | {'cold start ms':>13} | {'p50 ms':>8} | {'p95 ms':>8}")
+    for mode in args.modes:
+        for threads in args.threads:
+            for cache_state in ("cold", "warm"):
+                if cache_state == "cold":
+                    for cached_model in glob.glob(cache_pattern):
+                        os.remove(cached_model)
+
+                env = dict(os.environ,
+                           U2NET_INTRA_OP_THREADS=str(threads),
+                           U2NET_INTER_OP_THREADS=str(threads),
+                           U2NET_EXECUTION_MODE=mode)
+                cold, p50, p95 = run_probe(env, args.repeats)
+                print(f"{mode:>10} | {threads:>7} | {cache_state:>5} | {cold * 1000:>13.1f} | "
+                      f"{p50 * 1000:>8.2f} | {p95 * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Reports what importing core.utilities.helper costs now that the u2net session is created lazily,
+and what the deferred session creation and warm-up cost when background removal is first used.
+Before the session was lazy, the session creation time was paid on every import.
+
+    python -m benchmarks.u2net_startup
+"""
+import subprocess
+import sys
+
+PROBE = """
+import time
+start = time.perf_counter()
+import core.utilities.helper as helper
+imported = time.perf_counter()
+helper.get_u2net_session()
+created = time.perf_counter()
+helper.warmup()
+warmed = time.perf_counter()
+print(imported - start, created - imported, warmed - created)
+"""
+
+
+def main():
+    # A fresh interpreter per run, so nothing is cached in sys.modules.
+    output = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True).stdout
+    import_time, session_time, warmup_time = (float(value) for value in output.split()[-3:])
+
+    print(f"import core.utilities.helper: {import_time * 1000:8.1f} ms")
+    print(f"first get_u2net_session():    {session_time * 1000:8.1f} ms  (saved at startup by lazy creation)")
+    print(f"warmup() dummy inference:     {warmup_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
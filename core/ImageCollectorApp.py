@@ -1,11 +1,15 @@
+import os
 import sys
 
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QApplication
 
-from core.gui.ImageCollector import ImageCollector
+from core.gui.ImageCollector import ImageCollector, catalog_dir
 from core.modules.processing_module.ProcessingModule import ProcessingModule
 from core.modules.video_module.video_module import VideoModule
+from core.qt_communication.frame_latency import enable_from_env as enable_frame_latency_log
+from core.qt_communication.instrumentation import enable_from_env
+from core.qt_communication.messages.common_signals import CommonSignals
 from core.utilities.helper import resource_path, show_popup
 
 
@@ -13,10 +17,18 @@ class ImageCollectorApp:
     def __init__(self) -> None:
         app = QApplication(sys.argv)
 
+        # SIGNAL_BUS_TRACE=<dir> records message timings, enabled before any module connects to the bus.
+        enable_from_env(CommonSignals())
+        # FRAME_LATENCY_LOG=<file.csv> logs the capture to screen timing of every displayed camera frame.
+        enable_frame_latency_log()
+
         video_stream = VideoModule()
         video_stream.start_process()
 
-        processing_module = ProcessingModule()
+        # PROCESSING_POOL_SIZE > 0 moves background removal into that many worker processes.
+        processing_module = ProcessingModule(mask_cache_dir=catalog_dir / ".mask_cache",
+                                             process_pool_size=int(os.getenv("PROCESSING_POOL_SIZE", 0)),
+                                             process_pool_threads=int(os.getenv("PROCESSING_POOL_THREADS", 1)))
         processing_module.start_process()
 
         self.image_collector = ImageCollector()
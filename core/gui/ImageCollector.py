@@ -1,8 +1,9 @@
 import os
+import time
 from pathlib import Path
 
 from PySide6.QtCore import QPoint, Slot
-from PySide6.QtGui import QImage, QIcon
+from PySide6.QtGui import QImage, QIcon, QKeySequence, QShortcut
 from PySide6.QtWidgets import QMainWindow, QLabel
 
 from core.gui.modules.DraggableCrossesOverlay import DraggableCrossesOverlay
@@ -10,11 +11,15 @@ from core.gui.modules.ImageFrame import ImageFrame
 from core.gui.modules.NewCoinDialog import NewCoinDialog
 from core.gui.pyqt6_designer.d_ImageCollector import Ui_ImageCollector
 from core.qt_communication.base import *
+from core.qt_communication.frame_latency import FrameTiming, frame_latency, overlay_from_env
+from core.qt_communication.instrumentation import bus_instrumentation, dump as dump_bus_instrumentation
 from core.qt_communication.messages.processing_module.Requests import RemoveBackgroundRequest
 from core.qt_communication.messages.processing_module.Responses import ProcessedImageResponse
 from core.qt_communication.messages.video_module.Requests import CameraListRequest, ChangeVideoInput
-from core.qt_communication.messages.video_module.Responses import CameraListResponse, FrameAvailable
-from core.utilities.helper import parse_directory_into_dictionary, create_coin_directory, get_files, resource_path, get_tab_index_by_label, crop_vertices_mask_from_image
+from core.qt_communication.messages.video_module.Responses import CameraConnectionState, CameraListResponse, \
+    FrameAvailable
+from core.utilities.frame_ring import FrameRingBuffer
+from core.utilities.helper import bgr_to_qimage, parse_directory_into_dictionary, create_coin_directory, get_files, resource_path, get_tab_index_by_label, crop_vertices_mask_from_image
 
 catalog_dir = Path("coin_catalog")
 
@@ -36,10 +41,22 @@ class ImageCollector(QMainWindow, Ui_ImageCollector):
         self.setWindowIcon(QIcon(resource_path("core/gui/images/camera.png")))
         self.coin_catalog = None
         self.image_idx: int = 0
+        self.live_frame_future: ResponseFuture | None = None
+        self.frame_ring: FrameRingBuffer | None = None
 
         self.overlay = DraggableCrossesOverlay(self.video_frame)
         self.overlay.setGeometry(self.video_frame.rect())
 
+        # Display FPS and p95 capture to screen latency of the Camera tab, toggled with Ctrl+Shift+L.
+        self.latency_overlay = QLabel(self.video_frame)
+        self.latency_overlay.setStyleSheet("background-color: rgba(0, 0, 0, 160); color: white; padding: 2px 6px;")
+        self.latency_overlay.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.latency_overlay.move(8, 8)
+        self.latency_overlay_timer = QTimer(self)
+        self.latency_overlay_timer.setInterval(500)
+        self.latency_overlay_timer.timeout.connect(self._update_latency_overlay)
+        self._set_latency_overlay_visible(overlay_from_env())
+
         self._init()  # Connect timeout signal
 
         QTimer.singleShot(0, self._request_camera_ids)
@@ -61,6 +78,13 @@ class ImageCollector(QMainWindow, Ui_ImageCollector):
         self.crop_with_vertices_button.clicked.connect(self.crop_image_wit_vertices)
         self.gallery_save_button.clicked.connect(self.gallery_save_button_routine)
 
+        # Writes the signal bus statistics and trace while running (only when SIGNAL_BUS_TRACE is set).
+        self.dump_instrumentation_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        self.dump_instrumentation_shortcut.activated.connect(lambda: dump_bus_instrumentation())
+        self.latency_overlay_shortcut = QShortcut(QKeySequence("Ctrl+Shift+L"), self)
+        self.latency_overlay_shortcut.activated.connect(
+            lambda: self._set_latency_overlay_visible(not self.latency_overlay.isVisible()))
+
         # Outer module incoming requests
         # self.qt_signals.catalog_handler_response.connect(self.handle_request)
         self.qt_signals.video_module_request.connect(self.handle_request)
@@ -76,44 +100,114 @@ class ImageCollector(QMainWindow, Ui_ImageCollector):
         request_handlers = {
             # CatalogDictResponse: self.handle_catalog_dict_response,
             CameraListResponse: self._handle_camera_list_response,
+            CameraConnectionState: self._handle_camera_connection_state,
             # PictureResponse: self.handle_picture_response,
             FrameAvailable: self._handle_frame_available_request
         }
 
         handler = request_handlers.get(type(request), None)
         if handler:
-            handler(request)
+            with bus_instrumentation.handling(request, "ImageCollector"):
+                handler(request)
 
     def _handle_camera_list_response(self, request: CameraListResponse):
         self.camera_swich_combo_box.clear()
         self.camera_swich_combo_box.addItems(request.cameras)
 
+    def _handle_camera_connection_state(self, request: CameraConnectionState):
+        if request.state == "connected":
+            self.statusbar.clearMessage()
+        elif request.state == "reconnecting":
+            self.statusbar.showMessage(f"Camera {request.device_id} not responding, reconnect attempt "
+                                       f"{request.attempt} in {request.retry_in_s:.1f} s")
+        elif request.state == "lost":
+            self.statusbar.showMessage(f"Camera {request.device_id} lost, looking for cameras")
+        else:
+            self.statusbar.showMessage(f"Connecting to camera {request.device_id}")
+
+    def _frame_from_ring(self, request: FrameAvailable) -> QImage | None:
+        """Copies the announced frame out of the shared ring, None if it was overwritten in the meantime."""
+        if self.frame_ring is None or self.frame_ring.name != request.ring_name:
+            if self.frame_ring is not None:
+                self.frame_ring.close()
+            self.frame_ring = FrameRingBuffer(request.ring_name)
+
+        frame, sequence, _ = self.frame_ring.read(request.slot)
+        if sequence != request.sequence:
+            return None
+        # The only copy of the frame before the display conversion, the QImage owns it.
+        image = bgr_to_qimage(frame)
+        del frame
+        return image if self.frame_ring.is_current(request.slot, request.sequence) else None
+
     def _handle_frame_available_request(self, request: FrameAvailable):
         current_tab_index = self.tabWidget.currentIndex()
         if self.tabWidget.tabText(current_tab_index) == "Camera":
+            received_at = time.perf_counter()
+            frame = self._frame_from_ring(request)
+            if frame is None:
+                return
+
+            timing = FrameTiming(request.sequence, request.timestamp)
+            if request.published_at is not None:
+                timing.add("capture", request.timestamp, request.published_at)
+            timing.add("convert", received_at)
+
             if self.auto_background_deletion_checkbox.isChecked():
+                # Frames arriving while the previous one is still being processed are skipped.
+                if self.live_frame_future is not None and not self.live_frame_future.done():
+                    return
 
-                self.qt_signals.frame_received.disconnect(self.handle_request)
                 message = RemoveBackgroundRequest(
                     source=Modules.CATALOG_HANDLER,
                     destination=Modules.PROCESSING_MODULE,
-                    picture=request.frame)
-
-                response: ProcessedImageResponse = blocking_response_message_await(
+                    picture=frame,
+                    use_cache=False,
+                    temporal=True,
+                    roi=True,
+                    frame_timing=timing)
+
+                timing.requested_at = time.perf_counter()
+                self.live_frame_future = async_request(
                     request_signal=self.qt_signals.processing_module_request,
                     request_message=message,
                     response_signal=self.qt_signals.processing_module_request,
-                    response_message_type=ProcessedImageResponse)
-                self.qt_signals.frame_received.connect(self.handle_request)
-
-                if response is None:
-                    # response wasn't received in time
-                    uncropped_image = QImage("core/gui/pictures/default_image.jpg")
-                    self.video_frame.set_image(cropped_image=None, uncropped_image=uncropped_image)
-                else:
-                    self.video_frame.set_image(cropped_image=response.image, uncropped_image=request.frame)
+                    response_message_type=ProcessedImageResponse,
+                    callback=lambda future: self._handle_live_frame_response(future, frame))
             else:
-                self.video_frame.set_image(cropped_image=None, uncropped_image=request.frame)
+                start = time.perf_counter()
+                self.video_frame.set_image(cropped_image=None, uncropped_image=frame)
+                timing.add("paint", start)
+                frame_latency.record(timing)
+
+    def _handle_live_frame_response(self, future: ResponseFuture, frame: QImage):
+        response: ProcessedImageResponse | None = future.result()
+        if future.state == ResponseFuture.CANCELLED:
+            return
+
+        if response is None:
+            # response wasn't received in time
+            uncropped_image = QImage("core/gui/pictures/default_image.jpg")
+            self.video_frame.set_image(cropped_image=None, uncropped_image=uncropped_image)
+        else:
+            start = time.perf_counter()
+            self.video_frame.set_image(cropped_image=response.image, uncropped_image=frame)
+            if response.frame_timing is not None:
+                response.frame_timing.add("paint", start)
+                frame_latency.record(response.frame_timing)
+
+    def _set_latency_overlay_visible(self, visible: bool):
+        self.latency_overlay.setVisible(visible)
+        if visible:
+            self.latency_overlay.raise_()
+            self._update_latency_overlay()
+            self.latency_overlay_timer.start()
+        else:
+            self.latency_overlay_timer.stop()
+
+    def _update_latency_overlay(self):
+        self.latency_overlay.setText(f"{frame_latency.fps():.1f} FPS | p95 {frame_latency.latency_ms(95):.0f} ms")
+        self.latency_overlay.adjustSize()
 
     @Slot()
     def _request_camera_ids(self):
@@ -339,18 +433,23 @@ class ImageCollector(QMainWindow, Ui_ImageCollector):
         else:
             cropped_image = uncropped_image
         message = RemoveBackgroundRequest(
-            source=Modules.CATALOG_HANDLER,
+            source=Modules.IMAGE_COLLECTOR_WINDOW,
             destination=Modules.PROCESSING_MODULE,
             picture=cropped_image)
 
-        response: ProcessedImageResponse = blocking_response_message_await(
+        def _set_cutout(future: ResponseFuture):
+            response: ProcessedImageResponse | None = future.result()
+            if response is not None:
+                self.video_frame.set_image(uncropped_image=uncropped_image, cropped_image=response.image)
+
+        # Without the live frame deadline, a still picture with alpha matting may take a while.
+        async_request(
             request_signal=self.qt_signals.processing_module_request,
             request_message=message,
             response_signal=self.qt_signals.processing_module_request,
-            response_message_type=ProcessedImageResponse)
-
-        cropped_image = response.image
-        self.video_frame.set_image(uncropped_image=uncropped_image, cropped_image=cropped_image)
+            response_message_type=ProcessedImageResponse,
+            timeout_ms=None,
+            callback=_set_cutout)
 
     def reset_button_callback(self):
         uncropped_image: QImage = self.video_frame.uncropped_image
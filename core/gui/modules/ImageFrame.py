@@ -1,6 +1,8 @@
 from PySide6.QtGui import QPixmap, QImage
 from PySide6.QtWidgets import QFrame, QLabel, QVBoxLayout, QGraphicsOpacityEffect, QStackedLayout
 
+from core.utilities.helper import qimage_to_pixmap
+
 
 class ImageFrame(QFrame):
     def __init__(self, video_frame: QFrame):
@@ -44,10 +46,10 @@ class ImageFrame(QFrame):
         self.uncropped_image = uncropped_image
 
         if cropped_image is not None:
-            self.front_image_label.setPixmap(QPixmap(cropped_image))
-            self.background_image_label.setPixmap(QPixmap(uncropped_image))
+            self.front_image_label.setPixmap(qimage_to_pixmap(cropped_image))
+            self.background_image_label.setPixmap(qimage_to_pixmap(uncropped_image))
         else:
-            self.front_image_label.setPixmap(QPixmap(uncropped_image))
+            self.front_image_label.setPixmap(qimage_to_pixmap(uncropped_image))
 
     # def QPixmapToArray(self, pixmap):
     #     ## Get the size of the current pixmap
@@ -1,113 +1,224 @@
-import os
+import time
+from pathlib import Path
 
-from PySide6.QtCore import QObject, QThread
-from PySide6.QtWidgets import QApplication
+import numpy as np
+from PySide6.QtCore import QCoreApplication, QObject, QThread, Qt
 
 from core.qt_communication.base import *
+from core.qt_communication.instrumentation import bus_instrumentation
 from core.qt_communication.messages.processing_module.Requests import *
 from core.qt_communication.messages.processing_module.Responses import *
-from core.utilities.helper import qimage_to_cv2, remove_background_rembg, cv2_to_qimage, \
-    parse_directory_into_dictionary, transparent_to_hue, imgaug_transformation
+from core.modules.processing_module.catalog_augmentation import CatalogAugmentation, augmentation_parameters
+from core.modules.processing_module.job_queue import JobQueue
+from core.modules.processing_module.process_pool import RemoveBackgroundPool
+from core.utilities.helper import qimage_to_cv2, remove_background_rembg, cv2_to_qimage, warmup, mask_cache
+from core.utilities.roi_tracker import RoiMaskTracker
+from core.utilities.temporal_mask import TemporalMaskReuse
 
 
 class ProcessingModule(QObject):
-
-    def __init__(self):
+    """
+    Runs processing requests on a worker thread fed by a JobQueue.
+
+    Requests are queued from the emitting thread and the worker blocks on the queue while idle. When
+    requests arrive faster than they can be handled, `queue_policy` ("latest", "fifo" or "drop_oldest", see
+    JobQueue) decides which ones are kept; with "latest" only the newest request of each type and sender waits.
+    Requests that were cancelled or whose deadline passed while queued are skipped.
+
+    With `process_pool_size` > 0, background removal runs in that many worker processes (see
+    RemoveBackgroundPool) using `process_pool_threads` ONNX Runtime threads each, instead of on the worker
+    thread; up to `process_pool_size` pictures are then processed at the same time. If the pool cannot start or
+    all its workers died, background removal falls back to the worker thread.
+
+    Catalog augmentation runs in the background on `augmentation_processes` processes (see
+    CatalogAugmentation) and reports CatalogAugmentationProgressResponses; a
+    CancelCoinCatalogAugmentationRequest stops it right away, it is not queued behind other requests.
+    """
+
+    def __init__(self,
+                 mask_cache_dir: Path | str | None = None,
+                 queue_policy: str = "latest",
+                 queue_size: int = 8,
+                 process_pool_size: int = 0,
+                 process_pool_threads: int = 1,
+                 augmentation_processes: int | None = None):
         super().__init__()
 
         self.is_running = False
-        self.is_processing = False
+        self.mask_cache_dir = mask_cache_dir
+        self.process_pool_size = process_pool_size
+        self.process_pool_threads = process_pool_threads
+        self.process_pool: RemoveBackgroundPool | None = None
+        self.augmentation_processes = augmentation_processes
+        self.catalog_augmentation: CatalogAugmentation | None = None
+        self.job_queue = JobQueue(queue_policy, queue_size, on_discard=bus_instrumentation.count)
+        self.expired_requests = 0
+        self.cutout_buffer: np.ndarray | None = None
+        self.temporal_mask_reuse = TemporalMaskReuse()
+        self.roi_mask_tracker = RoiMaskTracker()
         self.main_thread = QThread()
         self.qt_signals = CommonSignals()
-        self.qt_signals.processing_module_request.connect(self.handle_request)
+        # A direct connection queues the request right away in the emitting thread; the worker thread has no
+        # event loop running, it waits on the job queue instead.
+        self.qt_signals.processing_module_request.connect(self.handle_request, Qt.ConnectionType.DirectConnection)
+
+        self.request_handlers = {
+            RemoveBackgroundRequest: self._handle_remove_background,
+            AugmentCoinCatalogRequest: self._handle_catalog_augmentation_request,
+            ProcessingStatsRequest: self._handle_stats_request
+        }
+
+        # Masks of already processed pictures are kept on disk too, so they survive restarts.
+        mask_cache.set_disk_dir(mask_cache_dir)
+
+        # The worker thread, the pool processes and their shared memory are released when the app quits. A direct
+        # connection, this object lives in the worker thread, which runs no event loop to deliver a queued call.
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop_process, Qt.ConnectionType.DirectConnection)
 
     def start_process(self):
         self.moveToThread(self.main_thread)
         self.main_thread.started.connect(self.worker)
-        self.main_thread.start()
         self.is_running = True
+        self.main_thread.start()
+
+    def stop_process(self):
+        self.is_running = False
+        self._cancel_catalog_augmentation()
+        self.job_queue.close()
+        self.main_thread.quit()
+        self.main_thread.wait()
+        if self.process_pool is not None:
+            self.process_pool.close()
+            self.process_pool = None
 
     def worker(self):
+        # Load the u2net model on this thread rather than at import time in the GUI thread.
+        if self.process_pool_size > 0:
+            try:
+                self.process_pool = RemoveBackgroundPool(self.process_pool_size, self.process_pool_threads,
+                                                         self.mask_cache_dir)
+            except RuntimeError as e:
+                self._fall_back_to_thread(e)
+        else:
+            warmup()
         while self.is_running:
-            QApplication.processEvents()
+            request = self.job_queue.get()
+            if request is None:
+                break
+            if request.expired():
+                self.expired_requests += 1
+                bus_instrumentation.count(request, "expired")
+                continue
+
+            try:
+                with bus_instrumentation.handling(request, "ProcessingModule"):
+                    self.request_handlers[type(request)](request)
+            except Exception as e:
+                print(f"Processing of {type(request).__name__} failed: {e}")
 
     def handle_request(self, request: MessageBase):
-        request_handlers = {
-            RemoveBackgroundRequest: self._handle_remove_background,
-            AugmentCoinCatalogRequest: self._handle_catalog_augmentation_request
-        }
-
-        handler = request_handlers.get(type(request), None)
-        if handler:
-            if self.is_processing:
-                return
+        if isinstance(request, CancelCoinCatalogAugmentationRequest):
+            self._cancel_catalog_augmentation()
+            return
+        if type(request) not in self.request_handlers:
+            return
 
-            self.is_processing = True
-            handler(request)
-            self.is_processing = False
+        if not self.job_queue.put(request, key=(type(request), request.source)):
+            print(f"Processing queue full, {type(request).__name__} dropped")
 
     def _handle_remove_background(self, request: RemoveBackgroundRequest):
+        timing = request.frame_timing
+        start = time.perf_counter()
+        if timing is not None and timing.requested_at is not None:
+            timing.add("queue", timing.requested_at, start)
+
         image = qimage_to_cv2(request.picture)
-        img_no_bg = remove_background_rembg(image)
+        if timing is not None:
+            start = timing.add("convert", start)
+        if self.process_pool is not None:
+            # Blocks only until a worker process is free, the response is sent once the cutout is back. The
+            # cutout is converted in the worker's callback, its time is part of the inference stage.
+            try:
+                future = self.process_pool.submit(image, convert=cv2_to_qimage, use_cache=request.use_cache,
+                                                  temporal=request.temporal, roi=request.roi)
+            except RuntimeError as e:
+                self._fall_back_to_thread(e)
+            else:
+                future.add_done_callback(lambda done: self._send_pool_result(request, done, start))
+                return
+
+        # cv2_to_qimage copies the cutout, so the same RGBA buffer can be reused for every frame.
+        temporal = self.temporal_mask_reuse if request.temporal else None
+        roi_tracker = self.roi_mask_tracker if request.roi else None
+        img_no_bg = remove_background_rembg(image, use_cache=request.use_cache, out=self.cutout_buffer,
+                                            temporal=temporal, roi_tracker=roi_tracker)
+        if timing is not None:
+            start = timing.add("inference", start)
+        if img_no_bg.ndim == 3 and img_no_bg.shape[2] == 4:
+            self.cutout_buffer = img_no_bg
         cv2_img_no_bg = cv2_to_qimage(img_no_bg)
+        if timing is not None:
+            timing.add("composite", start)
         self.qt_signals.processing_module_request.emit(
             ProcessedImageResponse(image=cv2_img_no_bg,
+                                   frame_timing=timing,
                                    source=Modules.PROCESSING_MODULE,
-                                   destination=request.source))
-
-    def _handle_catalog_augmentation_request(self, request: AugmentCoinCatalogRequest):
-        catalog_path = request.catalog_path
-        catalog_dict = parse_directory_into_dictionary(catalog_path)
-        os.makedirs(os.path.join(request.catalog_path, "augmented"), exist_ok=True)
-
-        for country in catalog_dict.keys():
-            for coin_name in catalog_dict[country].keys():
-                for year in catalog_dict[country][coin_name].keys():
-                    os.makedirs(os.path.join(request.catalog_path, country, coin_name, year), exist_ok=True)
-
-                    for coin_photo in catalog_dict[country][coin_name][year]["uncropped"]:
-
-                        if not coin_photo in catalog_dict[country][coin_name][year]["cropped"]:
-                            continue
-
-                        cropped_coin_photo_path = os.path.join(catalog_path, country, coin_name, year, "cropped")
-                        uncropped_coin_photo_path = os.path.join(catalog_path, country, coin_name, year, "uncropped")
-
-                        os.makedirs(os.path.join(catalog_path, "augmented", country, coin_name, year),
-                                    exist_ok=True)
-
-                        cropped_file_list = catalog_dict[country][coin_name][year]["cropped"]
-                        uncpped_file_list = catalog_dict[country][coin_name][year]["uncropped"]
-                        picture_filename_list = [picture for picture in uncpped_file_list if picture in cropped_file_list]
-
-                        uncropped_qimage_files = [QImage(os.path.join(uncropped_coin_photo_path, picture)) for picture in picture_filename_list]
-                        cropped_qimage_files = [QImage(os.path.join(cropped_coin_photo_path, picture)) for picture in picture_filename_list]
-
-                        # uncropped_image = QImage(uncropped_coin_photo_path)
-                        # cropped_image = QImage(cropped_coin_photo_path)
-
-                        uncropped_cv2_files = [qimage_to_cv2(uncropped_image) for uncropped_image in uncropped_qimage_files]
-                        cropped_cv2_files = [qimage_to_cv2(cropped_image) for cropped_image in cropped_qimage_files]
-                        cropped_cv2_hue_files = [transparent_to_hue(cv2_cropped_image) for cv2_cropped_image in cropped_cv2_files]
-
-                        # cv2_uncropped_image = qimage_to_cv2(uncropped_image)
-                        # cv2_cropped_image = qimage_to_cv2(cropped_image)
-
-                        # cv2_hue_image = transparent_to_hue(cv2_cropped_image)
-
-                        # Transformations
-                        for i in range(10):
-                            cv2_warped_uncropped_image, cv2_warped_hue_image = (
-                                imgaug_transformation(full_image_list=uncropped_cv2_files,
-                                                      hue_image_list=cropped_cv2_hue_files))
+                                   destination=request.source).reply_to(request))
+
+    def _fall_back_to_thread(self, error: Exception):
+        """Removes backgrounds on the worker thread from now on, the process pool failed."""
+        print(f"Background removal process pool failed ({error}), removing backgrounds in-thread")
+        if self.process_pool is not None:
+            self.process_pool.close()
+            self.process_pool = None
+        warmup()
+
+    def _send_pool_result(self, request: RemoveBackgroundRequest, future, submitted_at: float):
+        if future.exception() is not None:
+            print(f"Background removal in the process pool failed: {future.exception()}")
+            return
+        if request.frame_timing is not None:
+            request.frame_timing.add("inference", submitted_at)
+        self.qt_signals.processing_module_request.emit(
+            ProcessedImageResponse(image=future.result(),
+                                   frame_timing=request.frame_timing,
+                                   source=Modules.PROCESSING_MODULE,
+                                   destination=request.source).reply_to(request))
 
-                            augmented_qimage_list = [cv2_to_qimage(image) for image in cv2_warped_uncropped_image]
-                            augmented_hue_list = [cv2_to_qimage(image) for image in cv2_warped_hue_image]
+    def _handle_stats_request(self, request: ProcessingStatsRequest):
+        self.qt_signals.processing_module_request.emit(
+            ProcessingStatsResponse(mask_cache=mask_cache.stats(),
+                                    temporal=self.temporal_mask_reuse.stats(),
+                                    roi_tracker=self.roi_mask_tracker.stats(),
+                                    queue=dict(self.job_queue.stats(), expired=self.expired_requests),
+                                    source=Modules.PROCESSING_MODULE,
+                                    destination=request.source).reply_to(request))
 
-                            for image in augmented_qimage_list:
-                                image.save(os.path.join(catalog_path, "augmented", country, coin_name, year,
-                                                        f"{os.path.splitext(coin_photo)[0]}_{i}_full.png"))
+    def _handle_catalog_augmentation_request(self, request: AugmentCoinCatalogRequest):
+        # The job runs on its own thread and process pool, the worker goes on with the next request.
+        if self.catalog_augmentation is not None and self.catalog_augmentation.is_running():
+            print("Catalog augmentation restarted, the running one is cancelled")
+            self.catalog_augmentation.cancel()
+
+        parameters = augmentation_parameters(request.rotation, request.distortion, request.blur, request.noise)
+        job = CatalogAugmentation(request.catalog_path, request.picture_amount, parameters,
+                                  on_progress=lambda progress: self._send_augmentation_progress(job, request, progress),
+                                  processes=self.augmentation_processes)
+        self.catalog_augmentation = job
+        job.start()
+
+    def _send_augmentation_progress(self, job: CatalogAugmentation, request: AugmentCoinCatalogRequest,
+                                    progress: dict):
+        # A cancelled ResponseFuture marks the request, the job stops at its next progress report.
+        if request.cancelled:
+            job.cancel()
+        self.qt_signals.processing_module_request.emit(
+            CatalogAugmentationProgressResponse(**progress,
+                                                source=Modules.PROCESSING_MODULE,
+                                                destination=request.source).reply_to(request))
 
-                            for image in augmented_hue_list:
-                                image.save(os.path.join(catalog_path, "augmented", country, coin_name, year,
-                                             f"{os.path.splitext(coin_photo)[0]}_{i}_hue.png"))
+    def _cancel_catalog_augmentation(self):
+        if self.catalog_augmentation is not None:
+            self.catalog_augmentation.cancel()
@@ -0,0 +1,231 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable
+
+import cv2
+import numpy as np
+
+from core.utilities.helper import imgaug_transformation, parse_directory_into_dictionary, read_image, \
+    transparent_to_mask
+
+# Workers import TensorFlow and imgaug, forking the Qt process that runs them is unsafe.
+_context = multiprocessing.get_context("spawn")
+
+
+def augmentation_tasks(catalog_path: Path | str) -> list[tuple[Path, Path, Path]]:
+    """
+    Lists (uncropped photo, cropped photo, output directory) for every photo of the catalog that has a cropped
+    counterpart of the same name. Outputs go to catalog/augmented/country/coin/year.
+    """
+    catalog_path = Path(catalog_path)
+    catalog_dict = parse_directory_into_dictionary(catalog_path) or {}
+
+    tasks = []
+    for country in catalog_dict.keys():
+        for coin_name in catalog_dict[country].keys():
+            for year, photos in catalog_dict[country][coin_name].items():
+                cropped_photos = {path.name: path for path in photos["cropped"]}
+                output_dir = catalog_path / "augmented" / country / coin_name / year
+                for coin_photo in photos["uncropped"]:
+                    if coin_photo.name in cropped_photos:
+                        tasks.append((coin_photo, cropped_photos[coin_photo.name], output_dir))
+    return tasks
+
+
+def augmentation_parameters(rotation: float, distortion: float, blur: float, noise: float) -> dict:
+    """
+    Maps the request's strengths to `imgaug_transformation` ranges: rotation in degrees either way, distortion
+    as the relative scale change, blur as the largest Gaussian sigma (0 disables it) and noise relative to the
+    default ranges, which correspond to a noise of 0.1.
+    """
+    noise_factor = noise / 0.1
+    return {
+        "scale_range": (1 - distortion, 1 + distortion),
+        "rotation_range": (-rotation, rotation),
+        "gaussian_noise_range": (0, noise * 255),
+        "salt_and_pepper_noise_range": (0.01 * noise_factor, 0.05 * noise_factor),
+        "poisson_noise_range": (0, 8 * noise_factor),
+        "blur_range": (0, blur) if blur > 0 else None,
+    }
+
+
+def write_image(path: Path, image: np.ndarray) -> bool:
+    encoded, buffer = cv2.imencode(".png", image)
+    if encoded:
+        buffer.tofile(path)
+    return encoded
+
+
+class CatalogAugmentation:
+    """
+    Augments every photo of a coin catalog `picture_amount` times on a pool of `processes` worker processes.
+
+    The photos are streamed: each uncropped/cropped pair is read once, its variants are split into chunks of
+    `chunk_size` and fanned out to the pool, and the workers write the {name}_{i}_full/mask/crop.png files as
+    they go. At most two chunks per process are in flight, so memory stays flat however large the catalog is.
+
+    `on_progress` is called from the job's thread with a progress dict (see `progress()`) at most every
+    `progress_interval_s` and once more at the end. `cancel()` stops the job between chunks; chunks already
+    running in a worker still finish. If the job cannot go on, e.g. a worker process crashed and broke the
+    pool, it stops with `failed` set instead of `finished`.
+    """
+
+    def __init__(self,
+                 catalog_path: Path | str,
+                 picture_amount: int,
+                 parameters: dict,
+                 on_progress: Callable[[dict], None],
+                 processes: int | None = None,
+                 chunk_size: int = 4,
+                 progress_interval_s: float = 0.5):
+        self.catalog_path = Path(catalog_path)
+        self.picture_amount = picture_amount
+        self.parameters = parameters
+        self.on_progress = on_progress
+        self.processes = processes or max((os.cpu_count() or 2) - 1, 1)
+        self.chunk_size = chunk_size
+        self.progress_interval_s = progress_interval_s
+
+        self.photos_total = 0
+        self.photos_done = 0
+        self.variants_total = 0
+        self.variants_done = 0
+        self.errors = 0
+        self.finished = False
+        self.failed = False
+
+        self._cancelled = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._start_time = 0.0
+        self._last_progress = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="CatalogAugmentation", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def join(self, timeout: float | None = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def progress(self) -> dict:
+        elapsed = time.perf_counter() - self._start_time
+        return {
+            "photos_done": self.photos_done,
+            "photos_total": self.photos_total,
+            "variants_done": self.variants_done,
+            "variants_total": self.variants_total,
+            "variants_per_second": self.variants_done / elapsed if elapsed > 0 else 0.0,
+            "elapsed_s": elapsed,
+            "errors": self.errors,
+            "finished": self.finished,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+        }
+
+    def run(self):
+        self._start_time = time.perf_counter()
+        tasks = augmentation_tasks(self.catalog_path)
+        self.photos_total = len(tasks)
+        self.variants_total = len(tasks) * self.picture_amount
+        self._report(force=True)
+
+        executor = ProcessPoolExecutor(self.processes, mp_context=_context)
+        pending: dict[Future, int] = {}
+        chunks_left: dict[int, int] = {}
+        try:
+            for photo_index, (uncropped_path, cropped_path, output_dir) in enumerate(tasks):
+                if self.cancelled:
+                    break
+
+                image = read_image(uncropped_path, cv2.IMREAD_COLOR)
+                cropped = read_image(cropped_path, cv2.IMREAD_UNCHANGED)
+                if image is None or cropped is None or cropped.ndim != 3 or cropped.shape[2] != 4:
+                    print(f"Skipping {uncropped_path.name}: the photo or its transparent crop cannot be read")
+                    self._photo_failed()
+                    continue
+
+                output_dir.mkdir(parents=True, exist_ok=True)
+                chunks = [range(start, min(start + self.chunk_size, self.picture_amount))
+                          for start in range(0, self.picture_amount, self.chunk_size)]
+                if not chunks:
+                    self.photos_done += 1
+                    continue
+                chunks_left[photo_index] = len(chunks)
+                for indices in chunks:
+                    while len(pending) >= 2 * self.processes and not self.cancelled:
+                        self._collect(pending, chunks_left)
+                    if self.cancelled:
+                        break
+                    future = executor.submit(_augment_chunk, image, cropped, output_dir, uncropped_path.stem,
+                                             indices, self.parameters)
+                    pending[future] = photo_index
+
+            while pending and not self.cancelled:
+                self._collect(pending, chunks_left)
+        except Exception as e:
+            print(f"Catalog augmentation failed: {e}")
+            self.errors += 1
+            self.failed = True
+        finally:
+            # Queued chunks are dropped on cancel, the running ones finish in the background.
+            stop_early = self.cancelled or self.failed
+            executor.shutdown(wait=not stop_early, cancel_futures=stop_early)
+            self.finished = not stop_early
+            self._report(force=True)
+
+    def _collect(self, pending: dict[Future, int], chunks_left: dict[int, int]):
+        done, _ = wait(pending, timeout=self.progress_interval_s, return_when=FIRST_COMPLETED)
+        for future in done:
+            photo_index = pending.pop(future)
+            try:
+                self.variants_done += future.result()
+            except BrokenProcessPool:
+                # A worker process died, no other chunk will complete either.
+                raise
+            except Exception as e:
+                print(f"Catalog augmentation chunk failed: {e}")
+                self.errors += 1
+            chunks_left[photo_index] -= 1
+            if chunks_left[photo_index] == 0:
+                del chunks_left[photo_index]
+                self.photos_done += 1
+        self._report()
+
+    def _photo_failed(self):
+        self.errors += 1
+        self.photos_done += 1
+        self._report()
+
+    def _report(self, force: bool = False):
+        now = time.perf_counter()
+        if force or now - self._last_progress >= self.progress_interval_s:
+            self._last_progress = now
+            self.on_progress(self.progress())
+
+
+def _augment_chunk(image: np.ndarray, cropped: np.ndarray, output_dir: Path, stem: str, indices: range,
+                   parameters: dict) -> int:
+    mask = transparent_to_mask(cropped)
+    for i in indices:
+        image_aug, mask_aug, crop_aug = imgaug_transformation(image=image, mask=mask, transparent=cropped,
+                                                              **parameters)
+        for suffix, result in (("full", image_aug), ("mask", mask_aug), ("crop", crop_aug)):
+            path = output_dir / f"{stem}_{i}_{suffix}.png"
+            if not write_image(path, np.asarray(result, dtype=np.uint8)):
+                raise OSError(f"Could not write {path}")
+    return len(indices)
@@ -0,0 +1,104 @@
+import threading
+from collections import deque
+from typing import Any, Callable, Hashable
+
+POLICIES = ("latest", "fifo", "drop_oldest")
+
+
+class JobQueue:
+    """
+    Thread-safe queue of pending jobs whose consumer blocks while it is empty.
+
+    What happens when jobs arrive faster than they are processed depends on `policy`:
+        latest       a new job replaces the pending job with the same key (counted as coalesced), so only
+                     the most recent frame of a stream waits; jobs with other keys keep their place
+        fifo         jobs are kept in arrival order, a new job is rejected once `max_size` are pending
+        drop_oldest  jobs are kept in arrival order, the oldest pending job is discarded once `max_size`
+                     are pending
+    Under "latest", `max_size` still bounds the number of distinct keys, the oldest being discarded.
+    `on_discard(job, reason)` is called for every job that will not be processed, reason being "dropped" or
+    "coalesced".
+    """
+
+    def __init__(self, policy: str = "latest", max_size: int = 8,
+                 on_discard: Callable[[Any, str], None] | None = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}', expected one of {list(POLICIES)}")
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.policy = policy
+        self.max_size = max_size
+        self.on_discard = on_discard
+
+        self.submitted = 0
+        self.processed = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+        self._jobs: deque[tuple[Hashable, Any]] = deque()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def put(self, job: Any, key: Hashable = None) -> bool:
+        """Queues `job`, returns False when it was rejected (fifo policy with a full queue, or closed)."""
+        discarded = []
+        with self._condition:
+            if self._closed:
+                return False
+            self.submitted += 1
+
+            if self.policy == "latest":
+                for idx, (pending_key, pending_job) in enumerate(self._jobs):
+                    if pending_key == key:
+                        del self._jobs[idx]
+                        self.coalesced += 1
+                        discarded.append((pending_job, "coalesced"))
+                        break
+
+            accepted = True
+            if len(self._jobs) >= self.max_size:
+                self.dropped += 1
+                if self.policy == "fifo":
+                    accepted = False
+                    discarded.append((job, "dropped"))
+                else:
+                    discarded.append((self._jobs.popleft()[1], "dropped"))
+
+            if accepted:
+                self._jobs.append((key, job))
+                self._condition.notify()
+
+        # Called outside the lock, the callback may take its own locks.
+        if self.on_discard is not None:
+            for discarded_job, reason in discarded:
+                self.on_discard(discarded_job, reason)
+        return accepted
+
+    def get(self, timeout: float | None = None) -> Any | None:
+        """Blocks until a job is available and returns it, or returns None once closed or after `timeout` seconds."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._jobs or self._closed, timeout):
+                return None
+            if not self._jobs:
+                return None
+            self.processed += 1
+            return self._jobs.popleft()[1]
+
+    def close(self):
+        """Wakes up the consumer and discards the pending jobs, later `put` calls are rejected."""
+        with self._condition:
+            self._closed = True
+            self._jobs.clear()
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "policy": self.policy,
+                "pending": len(self._jobs),
+                "submitted": self.submitted,
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+            }
@@ -0,0 +1,269 @@
+import itertools
+import os
+import threading
+from concurrent.futures import Future
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+_pool_ids = itertools.count()
+# Forking a process that runs Qt and ONNX Runtime threads is unsafe, workers always start from scratch.
+_context = multiprocessing.get_context("spawn")
+
+
+class _SharedBuffer:
+    """A shared memory block owned by the parent, recreated larger whenever a frame does not fit."""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.shm: SharedMemory | None = None
+        self._generation = itertools.count()
+
+    def ensure(self, nbytes: int) -> SharedMemory:
+        if self.shm is None or self.shm.size < nbytes:
+            self.release()
+            self.shm = SharedMemory(name=f"{self.prefix}_{next(self._generation)}", create=True, size=max(nbytes, 1))
+        return self.shm
+
+    def view(self, shape: tuple, dtype=np.uint8) -> np.ndarray:
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+
+    def release(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+class _WorkerHandle:
+    def __init__(self, index: int, process: multiprocessing.Process, conn, prefix: str):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.input = _SharedBuffer(f"{prefix}i{index}")
+        self.output = _SharedBuffer(f"{prefix}o{index}")
+        self.future: Future | None = None
+        self.convert: Callable[[np.ndarray], Any] | None = None
+        self.reader: threading.Thread | None = None
+        self.dead = False
+
+
+class RemoveBackgroundPool:
+    """
+    Pool of persistent worker processes running `helper.remove`, each with its own warmed u2net session.
+
+    Frames and cutouts move through one input and one output shared memory block per worker; only the block
+    names, shapes and options go through the pipe. `threads` is the ONNX Runtime intra-op thread count of
+    every worker, so `processes * threads` should not exceed the available cores.
+
+    Requests with temporal mask reuse or ROI tracking carry per-stream state and always go to the first live
+    worker. A worker that dies is not replaced; `submit` raises a RuntimeError once no worker is left, and the
+    constructor raises one if a worker fails to start.
+    """
+
+    def __init__(self, processes: int = 2, threads: int = 1, mask_cache_dir: Path | str | None = None):
+        if processes < 1:
+            raise ValueError("The pool needs at least one process")
+
+        self.processes = processes
+        self.threads = threads
+        # Short names, some platforms limit shared memory names to about 30 characters.
+        self._prefix = f"rbp{os.getpid()}_{next(_pool_ids)}"
+        self._workers: list[_WorkerHandle] = []
+        self._idle = threading.Condition()
+        self._idle_workers: list[int] = []
+        self._round_robin = itertools.count()
+
+        for index in range(processes):
+            parent_conn, child_conn = _context.Pipe()
+            process = _context.Process(target=_worker_main, args=(child_conn, threads, mask_cache_dir),
+                              name=f"RemoveBackgroundWorker-{index}", daemon=True)
+            process.start()
+            child_conn.close()
+            self._workers.append(_WorkerHandle(index, process, parent_conn, self._prefix))
+
+        # Every worker reports once its session is loaded and warmed up.
+        for worker in self._workers:
+            try:
+                worker.conn.recv()
+            except (EOFError, OSError) as e:
+                self.close()
+                raise RuntimeError(f"Worker {worker.index} failed to start: {e}") from e
+            worker.reader = threading.Thread(target=self._read_results, args=(worker,), daemon=True)
+            worker.reader.start()
+            self._idle_workers.append(worker.index)
+
+    def remove(self, image: np.ndarray, **options) -> np.ndarray:
+        """Removes the background of `image` in a worker process and returns the cutout."""
+        return self.submit(image, **options).result()
+
+    def submit(self, image: np.ndarray, convert: Callable[[np.ndarray], Any] = np.copy, **options) -> Future:
+        """
+        Sends `image` to an idle worker, blocking until one is free, and returns a Future of the cutout.
+
+        The cutout is read straight from shared memory by `convert` (a copy by default) before the worker is
+        handed the next frame, e.g. `cv2_to_qimage` copies it into a QImage without an intermediate array.
+        `options` are `helper.remove` keyword arguments; `temporal` and `roi` are flags here, the worker
+        owns the TemporalMaskReuse and RoiMaskTracker.
+        """
+        stateful = options.get("temporal", False) or options.get("roi", False)
+        worker = self._acquire(stateful)
+
+        try:
+            image = np.ascontiguousarray(image)
+            input_shm = worker.input.ensure(image.nbytes)
+            np.copyto(worker.input.view(image.shape), image)
+            # Room for a single-mask RGBA cutout; larger results (several masks) come back through the pipe.
+            output_shm = worker.output.ensure(image.shape[0] * image.shape[1] * 4)
+
+            future = Future()
+            future.set_running_or_notify_cancel()
+            worker.future, worker.convert = future, convert
+            worker.conn.send((input_shm.name, image.shape, output_shm.name, options))
+        except BaseException:
+            worker.future = worker.convert = None
+            self._release(worker)
+            raise
+        return future
+
+    def close(self):
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.conn.close()
+            worker.input.release()
+            worker.output.release()
+        self._workers = []
+
+    def _acquire(self, stateful: bool) -> _WorkerHandle:
+        with self._idle:
+            while True:
+                live = [worker.index for worker in self._workers if not worker.dead]
+                if not live:
+                    raise RuntimeError("All background removal workers died")
+                if stateful:
+                    # The stream state lives in the first live worker.
+                    if live[0] in self._idle_workers:
+                        index = live[0]
+                        break
+                elif self._idle_workers:
+                    # Rotate over the idle workers so the load spreads evenly.
+                    index = self._idle_workers[next(self._round_robin) % len(self._idle_workers)]
+                    break
+                # Woken by a released or a dead worker.
+                self._idle.wait()
+            self._idle_workers.remove(index)
+            return self._workers[index]
+
+    def _release(self, worker: _WorkerHandle):
+        with self._idle:
+            if not worker.dead:
+                self._idle_workers.append(worker.index)
+            self._idle.notify_all()
+
+    def _mark_dead(self, worker: _WorkerHandle):
+        with self._idle:
+            worker.dead = True
+            if worker.index in self._idle_workers:
+                self._idle_workers.remove(worker.index)
+            self._idle.notify_all()
+
+    def _read_results(self, worker: _WorkerHandle):
+        while True:
+            try:
+                status, payload = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                # Waiters must not block on a worker that will never be released again.
+                self._mark_dead(worker)
+                future, worker.future = worker.future, None
+                if future is not None and not future.done():
+                    future.set_exception(RuntimeError(f"Worker {worker.index} died: {e}"))
+                return
+
+            future, convert = worker.future, worker.convert
+            worker.future = worker.convert = None
+            try:
+                if status == "error":
+                    future.set_exception(RuntimeError(payload))
+                elif status == "shm":
+                    shape, dtype = payload
+                    future.set_result(convert(worker.output.view(shape, dtype)))
+                else:
+                    future.set_result(convert(payload))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self._release(worker)
+
+
+def _worker_main(conn, threads: int, mask_cache_dir: Path | str | None):
+    # The session reads its thread count from the environment, so it is set before helper is imported.
+    os.environ["U2NET_INTRA_OP_THREADS"] = str(threads)
+    os.environ["U2NET_INTER_OP_THREADS"] = str(threads)
+
+    from core.utilities.helper import mask_cache, remove, warmup
+    from core.utilities.roi_tracker import RoiMaskTracker
+    from core.utilities.temporal_mask import TemporalMaskReuse
+
+    mask_cache.set_disk_dir(mask_cache_dir)
+    temporal_mask_reuse = TemporalMaskReuse()
+    roi_mask_tracker = RoiMaskTracker()
+    attached: dict[str, SharedMemory] = {}
+
+    def attach(name: str) -> SharedMemory:
+        if name not in attached:
+            # Blocks of an older generation have been replaced by the parent, drop them.
+            prefix = name.rsplit("_", 1)[0]
+            for old_name in [old for old in attached if old.rsplit("_", 1)[0] == prefix]:
+                attached.pop(old_name).close()
+            attached[name] = SharedMemory(name=name)
+        return attached[name]
+
+    warmup()
+    conn.send(("ready", None))
+
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        try:
+            conn.send(_run_job(job, attach, remove, temporal_mask_reuse, roi_mask_tracker))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+    for shm in attached.values():
+        shm.close()
+
+
+def _run_job(job: tuple, attach: Callable[[str], SharedMemory], remove: Callable, temporal_mask_reuse,
+             roi_mask_tracker) -> tuple:
+    # Kept in its own function so the shared memory views are released on return, a block with live views
+    # cannot be closed when the parent replaces it.
+    input_name, shape, output_name, options = job
+    image = np.ndarray(shape, dtype=np.uint8, buffer=attach(input_name).buf)
+    output_shm = attach(output_name)
+    out = None
+    if output_shm.size >= shape[0] * shape[1] * 4:
+        out = np.ndarray((shape[0], shape[1], 4), dtype=np.uint8, buffer=output_shm.buf)
+
+    cutout = remove(image,
+                    out=out,
+                    temporal=temporal_mask_reuse if options.pop("temporal", False) else None,
+                    roi_tracker=roi_mask_tracker if options.pop("roi", False) else None,
+                    **options)
+
+    if cutout is out:
+        return "shm", (cutout.shape, cutout.dtype.str)
+    if cutout.nbytes <= output_shm.size:
+        np.copyto(np.ndarray(cutout.shape, dtype=cutout.dtype, buffer=output_shm.buf), cutout)
+        return "shm", (cutout.shape, cutout.dtype.str)
+    return "array", cutout
@@ -0,0 +1,133 @@
+import threading
+from typing import Callable
+
+import cv2
+from PySide6.QtCore import QObject, QTimer, Signal, Slot
+
+from core.utilities.core_utils import suppress_stderr
+
+
+def probe_camera(index: int) -> bool:
+    with suppress_stderr():
+        capture = cv2.VideoCapture(index)
+    try:
+        return capture.isOpened()
+    finally:
+        capture.release()
+
+
+class CameraEnumerator(QObject):
+    """
+    Finds the OpenCV camera indices on a background thread and caches them.
+
+    Opening a device to see whether it exists can take hundreds of milliseconds, so `refresh()` only starts
+    a probe thread and returns; `cameras_changed` is emitted in the owner's thread once the list differs from
+    the last one emitted, and always after `invalidate()`, so an empty list is announced when the cameras are
+    gone and the owner hears back when the same camera is still there. Known indices are not probed again, the
+    probe walks the unknown ones upwards and stops at the first that does not open.
+
+    With `media_devices` (a QMediaDevices), `videoInputsChanged` triggers the refresh and a drop of the input
+    count invalidates the cache. While no camera is found, the refresh repeats after each delay of
+    `backoff_s` in turn, staying at the last one.
+    """
+
+    cameras_changed = Signal(list)
+    _probed = Signal(int, list)
+
+    def __init__(self,
+                 media_devices=None,
+                 probe: Callable[[int], bool] = probe_camera,
+                 backoff_s: tuple[float, ...] = (1, 2, 4, 8, 15, 30),
+                 max_devices: int = 10):
+        super().__init__()
+        self.media_devices = media_devices
+        self.probe = probe
+        self.backoff_s = backoff_s
+        self.max_devices = max_devices
+
+        self.probes = 0
+        self._known: list[int] = []
+        # Compared against rather than `_known`, which `invalidate()` clears before the probe runs; None makes
+        # the next probe result be emitted whatever it is.
+        self._emitted: list[int] | None = None
+        # Results of a probe started before the cache was invalidated are stale.
+        self._generation = 0
+        self._input_count = 0
+        self._probing = False
+        self._refresh_pending = False
+        self._backoff_step = 0
+
+        self._retry_timer = QTimer(self)
+        self._retry_timer.setSingleShot(True)
+        self._retry_timer.timeout.connect(self.refresh)
+        self._probed.connect(self._on_probed)
+
+        if media_devices is not None:
+            self._input_count = len(media_devices.videoInputs())
+            media_devices.videoInputsChanged.connect(self._on_video_inputs_changed)
+
+    def cameras(self) -> list[int]:
+        return list(self._known)
+
+    def refresh(self):
+        """Probes for new cameras in the background; a refresh asked for while one runs follows it."""
+        self._retry_timer.stop()
+        if self._probing:
+            self._refresh_pending = True
+            return
+
+        self._probing = True
+        self._refresh_pending = False
+        threading.Thread(target=self._probe_new, args=(self._generation, list(self._known)),
+                         name="CameraEnumerator", daemon=True).start()
+
+    def invalidate(self):
+        """Forgets the cached cameras, e.g. after one disappeared, and probes all of them again."""
+        self._known = []
+        self._emitted = None
+        self._generation += 1
+        self._backoff_step = 0
+        self.refresh()
+
+    def _on_video_inputs_changed(self):
+        input_count = len(self.media_devices.videoInputs())
+        removed = input_count < self._input_count
+        self._input_count = input_count
+        if removed:
+            self.invalidate()
+        else:
+            self._backoff_step = 0
+            self.refresh()
+
+    def _probe_new(self, generation: int, known: list[int]):
+        found = list(known)
+        for index in range(self.max_devices):
+            if index in known:
+                continue
+            self.probes += 1
+            if not self.probe(index):
+                break
+            found.append(index)
+        self._probed.emit(generation, sorted(found))
+
+    @Slot(int, list)
+    def _on_probed(self, generation: int, found: list[int]):
+        self._probing = False
+        if generation != self._generation:
+            self.refresh()
+            return
+
+        changed = found != self._emitted
+        self._known = found
+
+        if self._refresh_pending:
+            self.refresh()
+        elif not found:
+            self._retry_timer.start(int(self.backoff_s[self._backoff_step] * 1000))
+            self._backoff_step = min(self._backoff_step + 1, len(self.backoff_s) - 1)
+        else:
+            self._backoff_step = 0
+
+        if changed:
+            self._emitted = list(found)
+            self.cameras_changed.emit(list(found))
@@ -0,0 +1,259 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+import cv2
+import numpy as np
+
+from core.modules.video_module.capture_profile import CaptureProfile, negotiate
+from core.utilities.core_utils import suppress_stderr
+
+
+def open_camera(device_id: int) -> cv2.VideoCapture:
+    with suppress_stderr():
+        return cv2.VideoCapture(device_id)
+
+
+class CaptureEngine:
+    """
+    Reads a camera on a dedicated thread and keeps only the newest frame.
+
+    The thread loops on `grab()`/`retrieve()` as fast as the camera delivers, stamps every frame with
+    `time.perf_counter()` right after `grab()` returns, and publishes it into a triple buffer: the capture thread
+    fills the back buffer, swaps it with the ready one, and `take()` swaps the ready one to the front. Neither
+    side ever waits for the other and no frame is copied; a frame returned by `take()` stays valid until the
+    next call.
+
+    With a `profile`, the camera mode is negotiated (see `negotiate`) every time the device is opened and the
+    effective one is kept in `mode`.
+
+    Failures are handled on the capture thread as well, so the owner never waits for the camera driver:
+        - a failed read on an open device is transient (a dropped frame, a driver hiccup) and is retried on
+          the same device, up to `max_transient_failures` reads in a row
+        - beyond that, or when the device cannot be opened, it is considered lost and reopened after an
+          exponential backoff from `backoff_s` up to `max_backoff_s`, shortened by a random `jitter` fraction
+          so that several cameras coming back at once are not hammered in lockstep
+        - after `max_reconnects` reopen attempts without a frame, the thread gives up and `state` is LOST.
+    `state` is CONNECTING, CONNECTED, RECONNECTING (with `reconnect_attempt` and `retry_in_s`) or LOST; the
+    owner polls it. `stats()` reports the capture FPS, the delivered FPS (frames taken) and the frames that were
+    replaced before anyone took them (dropped), over the last `stats_window_s`.
+    """
+
+    CONNECTING = "connecting"
+    CONNECTED = "connected"
+    RECONNECTING = "reconnecting"
+    LOST = "lost"
+
+    def __init__(self,
+                 device_id: int = 0,
+                 profile: CaptureProfile | None = None,
+                 stats_window_s: float = 5.0,
+                 open_capture: Callable[[int], cv2.VideoCapture] = open_camera,
+                 max_transient_failures: int = 5,
+                 backoff_s: float = 0.25,
+                 max_backoff_s: float = 8.0,
+                 jitter: float = 0.5,
+                 max_reconnects: int = 10,
+                 previous: "CaptureEngine | None" = None):
+        self.device_id = device_id
+        self.profile = profile
+        self.mode: CaptureProfile | None = None
+        self.stats_window_s = stats_window_s
+        self.open_capture = open_capture
+        self.max_transient_failures = max_transient_failures
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.jitter = jitter
+        self.max_reconnects = max_reconnects
+        # An engine stopped without waiting may still hold the device, it is waited for before opening.
+        self.previous = previous
+
+        self.state = CaptureEngine.CONNECTING
+        self.reconnect_attempt = 0
+        self.retry_in_s = 0.0
+        self.captured = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.failures = 0
+        self.reconnects = 0
+        self.consecutive_failures = 0
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        # Cuts a backoff wait short, on stop or when the device is switched.
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._device_changed = False
+        self._back: np.ndarray | None = None
+        self._ready: np.ndarray | None = None
+        self._front: np.ndarray | None = None
+        self._ready_sequence = 0
+        self._ready_timestamp = 0.0
+        self._fresh = False
+        self._capture_times: deque[float] = deque()
+        self._deliver_times: deque[float] = deque()
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._wakeup.clear()
+        self.state = CaptureEngine.CONNECTING
+        self._thread = threading.Thread(target=self._run, name="CaptureEngine", daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = True):
+        """
+        Stops the capture thread. Without `wait` it is left to finish on its own, it may still be inside the
+        driver opening the device; it releases the device when it is done, see `join()`.
+        """
+        self._stop.set()
+        self._wakeup.set()
+        if wait:
+            self.join()
+
+    def join(self, timeout: float | None = None):
+        """Waits until the capture thread finished and released its device."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def switch_device(self, device_id: int):
+        """Makes the capture thread reopen on `device_id`, without blocking the caller on the camera driver."""
+        self.device_id = device_id
+        self._device_changed = True
+        self._wakeup.set()
+
+    def take(self) -> tuple[np.ndarray, int, float] | None:
+        """Returns (frame, sequence, timestamp) of the newest frame not taken yet, or None if there is none."""
+        with self._lock:
+            if not self._fresh:
+                return None
+            self._front, self._ready = self._ready, self._front
+            self._fresh = False
+            sequence, timestamp = self._ready_sequence, self._ready_timestamp
+            self.delivered += 1
+            self._record(self._deliver_times, time.perf_counter())
+        return self._front, sequence, timestamp
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "device_id": self.device_id,
+                "state": self.state,
+                "mode": str(self.mode) if self.mode is not None else None,
+                "captured": self.captured,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "failures": self.failures,
+                "reconnects": self.reconnects,
+                "capture_fps": self._rate(self._capture_times),
+                "delivered_fps": self._rate(self._deliver_times),
+            }
+
+    def _run(self):
+        if self.previous is not None:
+            self.previous.join()
+            self.previous = None
+
+        capture = None
+        while not self._stop.is_set():
+            if self._device_changed:
+                self._device_changed = False
+                self.reconnect_attempt = 0
+                self.state = CaptureEngine.CONNECTING
+                if capture is not None:
+                    capture.release()
+                    capture = None
+
+            if capture is None:
+                capture = self._open()
+                if capture is None:
+                    if not self._back_off():
+                        break
+                    continue
+
+            # grab() only takes the frame off the driver, it is stamped before the slower decode in retrieve().
+            grabbed = capture.grab()
+            timestamp = time.perf_counter()
+            frame = None
+            if grabbed:
+                grabbed, frame = capture.retrieve(self._back)
+
+            if not grabbed or frame is None:
+                self.failures += 1
+                self.consecutive_failures += 1
+                if self.consecutive_failures < self.max_transient_failures:
+                    # Do not spin on a driver that has no frame right now.
+                    self._stop.wait(0.01)
+                    continue
+
+                print(f"Camera {self.device_id} lost after {self.consecutive_failures} failed reads")
+                self.consecutive_failures = 0
+                capture.release()
+                capture = None
+                if not self._back_off():
+                    break
+                continue
+
+            self.consecutive_failures = 0
+            self.reconnect_attempt = 0
+            self.state = CaptureEngine.CONNECTED
+            with self._lock:
+                if self._fresh:
+                    self.dropped += 1
+                self._ready, self._back = frame, self._ready
+                self.captured += 1
+                self._ready_sequence = self.captured
+                self._ready_timestamp = timestamp
+                self._fresh = True
+                self._record(self._capture_times, timestamp)
+
+        if capture is not None:
+            capture.release()
+
+    def _open(self) -> cv2.VideoCapture | None:
+        capture = self.open_capture(self.device_id)
+        if not capture.isOpened():
+            capture.release()
+            return None
+        if self.profile is not None:
+            mode = negotiate(capture, self.profile)
+            if mode != self.mode:
+                print(f"Camera {self.device_id} runs at {mode} (asked for {self.profile})")
+            self.mode = mode
+        return capture
+
+    def _back_off(self) -> bool:
+        """Waits before the next reopen attempt, False once `max_reconnects` attempts failed."""
+        self.reconnect_attempt += 1
+        if self.reconnect_attempt > self.max_reconnects:
+            print(f"Camera {self.device_id} given up after {self.max_reconnects} reconnect attempts")
+            self.state = CaptureEngine.LOST
+            return False
+
+        delay = min(self.backoff_s * 2 ** (self.reconnect_attempt - 1), self.max_backoff_s)
+        self.retry_in_s = delay * (1 - self.jitter * random.random())
+        self.reconnects += 1
+        self.state = CaptureEngine.RECONNECTING
+        self._wakeup.wait(self.retry_in_s)
+        self._wakeup.clear()
+        return True
+
+    def _record(self, timestamps: deque, now: float):
+        timestamps.append(now)
+        while timestamps and now - timestamps[0] > self.stats_window_s:
+            timestamps.popleft()
+
+    def _rate(self, timestamps: deque) -> float:
+        now = time.perf_counter()
+        while timestamps and now - timestamps[0] > self.stats_window_s:
+            timestamps.popleft()
+        if len(timestamps) < 2:
+            return 0.0
+        span = timestamps[-1] - timestamps[0]
+        return (len(timestamps) - 1) / span if span > 0 else 0.0
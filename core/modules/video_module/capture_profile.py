@@ -0,0 +1,112 @@
+import os
+import re
+
+import cv2
+
+CAPTURE_PROFILE_ENV = "CAPTURE_PROFILE"
+
+_PROFILE_PATTERN = re.compile(r"^(?:(?P<fourcc>[A-Za-z0-9 ]{4}):)?(?P<width>\d+)x(?P<height>\d+)(?:@(?P<fps>\d+(?:\.\d+)?))?$")
+
+
+def fourcc_to_str(value: float) -> str:
+    code = int(value)
+    return "".join(chr((code >> (8 * shift)) & 0xFF) for shift in range(4)) if code > 0 else ""
+
+
+class CaptureProfile:
+    """
+    A camera mode to ask the driver for: pixel format (FOURCC), resolution and frame rate.
+
+    Uncompressed formats such as YUYV need far more USB bandwidth than MJPG, many cameras only reach 5-10 FPS
+    at 1080p without compression, hence MJPG by default. `fourcc=None` leaves the format to the driver.
+    Profiles parse from and print as "MJPG:1920x1080@60"; CAPTURE_PROFILE sets the one the app asks for.
+    """
+
+    def __init__(self, fourcc: str | None = "MJPG", width: int = 1920, height: int = 1080, fps: float = 60):
+        if fourcc is not None and len(fourcc) != 4:
+            raise ValueError(f"A FOURCC has 4 characters, got '{fourcc}'")
+        self.fourcc = fourcc
+        self.width = width
+        self.height = height
+        self.fps = fps
+
+    @classmethod
+    def parse(cls, text: str) -> "CaptureProfile":
+        match = _PROFILE_PATTERN.match(text.strip())
+        if match is None:
+            raise ValueError(f"Invalid capture profile '{text}', expected e.g. MJPG:1920x1080@60")
+        return cls(fourcc=match["fourcc"].upper() if match["fourcc"] else None,
+                   width=int(match["width"]),
+                   height=int(match["height"]),
+                   fps=float(match["fps"]) if match["fps"] else 30)
+
+    @classmethod
+    def from_env(cls) -> "CaptureProfile":
+        """The CAPTURE_PROFILE profile, the default one if it is not set or cannot be parsed."""
+        text = os.getenv(CAPTURE_PROFILE_ENV)
+        if not text:
+            return cls()
+        try:
+            return cls.parse(text)
+        except ValueError as e:
+            print(f"{e}, using the default capture profile {cls()}")
+            return cls()
+
+    def fallbacks(self) -> list["CaptureProfile"]:
+        """This profile followed by cheaper ones to try when the camera does not support it."""
+        candidates = [self]
+        if self.fps > 30:
+            candidates.append(CaptureProfile(self.fourcc, self.width, self.height, 30))
+        for width, height in ((1280, 720), (640, 480)):
+            if width * height < self.width * self.height:
+                candidates.append(CaptureProfile(self.fourcc, width, height, self.fps))
+                if self.fps > 30:
+                    candidates.append(CaptureProfile(self.fourcc, width, height, 30))
+        return candidates
+
+    def __eq__(self, other):
+        return isinstance(other, CaptureProfile) and str(self) == str(other)
+
+    def __repr__(self):
+        fps = f"{self.fps:g}"
+        return f"{self.fourcc}:{self.width}x{self.height}@{fps}" if self.fourcc else f"{self.width}x{self.height}@{fps}"
+
+
+def read_mode(capture: cv2.VideoCapture) -> CaptureProfile:
+    """The mode the driver actually runs with, read back from the capture properties."""
+    return CaptureProfile(fourcc=fourcc_to_str(capture.get(cv2.CAP_PROP_FOURCC)) or None,
+                          width=int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                          height=int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                          fps=capture.get(cv2.CAP_PROP_FPS))
+
+
+def apply_profile(capture: cv2.VideoCapture, profile: CaptureProfile) -> CaptureProfile:
+    """Asks the driver for `profile` and returns the mode it settled on."""
+    # The format goes first, some backends (DirectShow among them) only offer the large MJPG sizes once it is set.
+    if profile.fourcc is not None:
+        capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*profile.fourcc))
+    capture.set(cv2.CAP_PROP_FRAME_WIDTH, profile.width)
+    capture.set(cv2.CAP_PROP_FRAME_HEIGHT, profile.height)
+    capture.set(cv2.CAP_PROP_FPS, profile.fps)
+    return read_mode(capture)
+
+
+def matches(mode: CaptureProfile, profile: CaptureProfile) -> bool:
+    # Many backends report 0 FPS or a rounded value, only a clearly lower rate counts as a mismatch.
+    return ((profile.fourcc is None or mode.fourcc == profile.fourcc)
+            and (mode.width, mode.height) == (profile.width, profile.height)
+            and (mode.fps <= 0 or mode.fps >= 0.9 * profile.fps))
+
+
+def negotiate(capture: cv2.VideoCapture, profile: CaptureProfile) -> CaptureProfile:
+    """
+    Applies the first of `profile.fallbacks()` the driver accepts, verified by reading the properties back,
+    and returns the effective mode. If none is accepted, `profile` is requested again and the mode the driver
+    picked instead is returned.
+    """
+    candidates = profile.fallbacks()
+    for candidate in candidates:
+        mode = apply_profile(capture, candidate)
+        if matches(mode, candidate):
+            return mode
+    return apply_profile(capture, profile) if len(candidates) > 1 else mode
@@ -0,0 +1,228 @@
+import math
+import os
+import re
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from core.utilities.helper import read_image
+
+VIDEO_SOURCE_ENV = "VIDEO_SOURCE"
+VIDEO_SOURCE_PACING_ENV = "VIDEO_SOURCE_PACING"
+
+_SIZE_PATTERN = re.compile(r"^(?P<width>\d+)x(?P<height>\d+)(?:@(?P<fps>\d+(?:\.\d+)?))?$")
+
+
+class FrameSource:
+    """
+    Base of the frame sources that stand in for a camera, with the part of the cv2.VideoCapture interface the
+    CaptureEngine and the capture profile negotiation use.
+
+    With `realtime`, `grab()` paces the frames at `fps`; a source that falls behind by more than one frame
+    continues from the current time instead of catching up in a burst. Otherwise frames come as fast as they
+    can be produced. Subclasses implement `_next_frame()`, returning None at the end of the stream.
+    """
+
+    def __init__(self, fps: float, realtime: bool = True):
+        self.fps = fps
+        self.realtime = realtime
+        self.frames = 0
+        self._frame: np.ndarray | None = None
+        self._next_due: float | None = None
+
+    def isOpened(self) -> bool:
+        return True
+
+    def grab(self) -> bool:
+        self._pace()
+        self._frame = self._next_frame()
+        if self._frame is None:
+            return False
+        self.frames += 1
+        return True
+
+    def retrieve(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        if self._frame is None:
+            return False, None
+        if image is not None and image.shape == self._frame.shape:
+            np.copyto(image, self._frame)
+            return True, image
+        return True, self._frame.copy()
+
+    def read(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def get(self, prop_id: int) -> float:
+        height, width = self._frame_shape()[:2]
+        return {cv2.CAP_PROP_FRAME_WIDTH: width,
+                cv2.CAP_PROP_FRAME_HEIGHT: height,
+                cv2.CAP_PROP_FPS: self.fps}.get(prop_id, 0.0)
+
+    def set(self, prop_id: int, value: float) -> bool:
+        # Files and generated frames have a fixed mode, like a camera that refuses every change.
+        return False
+
+    def release(self):
+        pass
+
+    def _pace(self):
+        if not self.realtime or self.fps <= 0:
+            return
+        now = time.perf_counter()
+        if self._next_due is None or now - self._next_due > 1 / self.fps:
+            self._next_due = now
+        elif self._next_due > now:
+            time.sleep(self._next_due - now)
+        self._next_due += 1 / self.fps
+
+    def _next_frame(self) -> np.ndarray | None:
+        raise NotImplementedError
+
+    def _frame_shape(self) -> tuple:
+        raise NotImplementedError
+
+
+class VideoFileSource(FrameSource):
+    """Frames of a video file, at the file's frame rate (or `fps`) when paced, restarting at the end with `loop`."""
+
+    def __init__(self, path: Path | str, realtime: bool = True, loop: bool = True, fps: float | None = None):
+        self.path = str(path)
+        self.loop = loop
+        self.capture = cv2.VideoCapture(self.path)
+        if not self.capture.isOpened():
+            raise FileNotFoundError(f"Cannot open video file {self.path}")
+        super().__init__(fps or self.capture.get(cv2.CAP_PROP_FPS) or 30, realtime)
+
+    def _next_frame(self) -> np.ndarray | None:
+        ok, frame = self.capture.read()
+        if not ok and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.capture.read()
+        return frame if ok else None
+
+    def _frame_shape(self) -> tuple:
+        return int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+
+    def release(self):
+        self.capture.release()
+
+    def __repr__(self):
+        return f"file:{self.path}"
+
+
+class ImageSequenceSource(FrameSource):
+    """
+    Pictures played back as a video, by default every PNG of the catalog's `uncropped` folders in path order.
+
+    Pictures are decoded as they are played, or all up front with `preload`, which leaves the decoding out of
+    throughput measurements at the cost of memory.
+    """
+
+    def __init__(self, paths: list[Path], fps: float = 30, realtime: bool = True, loop: bool = True,
+                 preload: bool = False):
+        if not paths:
+            raise FileNotFoundError("The image sequence is empty")
+        super().__init__(fps, realtime)
+        self.paths = paths
+        self.loop = loop
+        self.index = 0
+        self._preloaded = [self._load(path) for path in paths] if preload else None
+
+    @classmethod
+    def from_directory(cls, directory: Path | str, **kwargs) -> "ImageSequenceSource":
+        """The `uncropped` PNGs of a coin catalog, or the PNGs directly in `directory` if it is not one."""
+        directory = Path(directory)
+        paths = sorted(directory.glob("*/*/*/uncropped/*.png")) or sorted(directory.glob("*.png"))
+        return cls(paths, **kwargs)
+
+    def _next_frame(self) -> np.ndarray | None:
+        if self.index >= len(self.paths):
+            if not self.loop:
+                return None
+            self.index = 0
+        frame = self._preloaded[self.index] if self._preloaded is not None else self._load(self.paths[self.index])
+        self.index += 1
+        return frame
+
+    def _frame_shape(self) -> tuple:
+        return self._frame.shape if self._frame is not None else self._load(self.paths[0]).shape
+
+    @staticmethod
+    def _load(path: Path) -> np.ndarray:
+        frame = read_image(path)
+        if frame is None:
+            raise ValueError(f"Cannot decode {path}")
+        return frame
+
+    def __repr__(self):
+        return f"images:{self.paths[0].parent if len(self.paths) == 1 else os.path.commonpath(self.paths)}"
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generated frames: a coin-like disc circling slowly over a fixed noisy background, the same sequence on
+    every run, so the temporal mask reuse and the ROI tracker see realistic motion.
+    """
+
+    def __init__(self, width: int = 1280, height: int = 720, fps: float = 30, realtime: bool = True,
+                 seed: int = 0):
+        super().__init__(fps, realtime)
+        self.width = width
+        self.height = height
+        rng = np.random.default_rng(seed)
+        self.background = rng.integers(0, 80, size=(height, width, 3), dtype=np.uint8)
+        self.radius = int(min(width, height) * 0.2)
+        self.index = 0
+
+    def _next_frame(self) -> np.ndarray:
+        frame = self.background.copy()
+        angle = 2 * math.pi * self.index / 300
+        center = (int(self.width / 2 + self.width / 6 * math.cos(angle)),
+                  int(self.height / 2 + self.height / 6 * math.sin(angle)))
+        cv2.circle(frame, center, self.radius, (90, 170, 200), -1)
+        self.index += 1
+        return frame
+
+    def _frame_shape(self) -> tuple:
+        return self.height, self.width, 3
+
+    def __repr__(self):
+        return f"synthetic:{self.width}x{self.height}@{self.fps:g}"
+
+
+def open_frame_source(spec: str, realtime: bool = True) -> FrameSource:
+    """
+    Opens a frame source from a spec:
+        file:<path>                   a video file
+        images:<directory>            the uncropped catalog pictures, or the PNGs, in a directory
+        synthetic[:WxH[@FPS]]         generated frames, 1280x720@30 by default
+    """
+    kind, _, argument = spec.partition(":")
+    if kind == "file":
+        return VideoFileSource(argument, realtime=realtime)
+    if kind == "images":
+        return ImageSequenceSource.from_directory(argument or "coin_catalog", realtime=realtime)
+    if kind == "synthetic":
+        if not argument:
+            return SyntheticSource(realtime=realtime)
+        match = _SIZE_PATTERN.match(argument)
+        if match is None:
+            raise ValueError(f"Invalid synthetic source '{spec}', expected e.g. synthetic:1280x720@30")
+        return SyntheticSource(int(match["width"]), int(match["height"]),
+                               float(match["fps"]) if match["fps"] else 30, realtime=realtime)
+    raise ValueError(f"Unknown frame source '{spec}', expected file:, images: or synthetic")
+
+
+def frame_source_from_env() -> tuple[str | None, bool]:
+    """
+    The VIDEO_SOURCE spec (None or "camera" for the cameras) and whether it is paced in real time, which
+    VIDEO_SOURCE_PACING=fast turns off.
+    """
+    spec = os.getenv(VIDEO_SOURCE_ENV) or None
+    if spec == "camera":
+        spec = None
+    return spec, os.getenv(VIDEO_SOURCE_PACING_ENV, "realtime").lower() != "fast"
@@ -3,65 +3,118 @@ import ctypes
 from ctypes import wintypes
 
 import cv2
-from PySide6.QtCore import (QObject, QThread, QProcess, QTimer,
+import numpy as np
+from PySide6.QtCore import (QObject, QThread, QProcess, QTimer, Qt,
                             QAbstractNativeEventFilter, QCoreApplication)
-from PySide6.QtMultimedia import QMediaDevices
+try:
+    from PySide6.QtMultimedia import QMediaDevices
+except ImportError:  # Headless machines may lack the multimedia system libraries, frame sources work without
+    QMediaDevices = None
 from PySide6.QtWidgets import QApplication
 
 from core.qt_communication.base import *
-from core.qt_communication.messages.video_module.Requests import CameraListRequest, ChangeVideoInput
+from core.qt_communication.instrumentation import bus_instrumentation
+from core.modules.video_module.camera_enumerator import CameraEnumerator, probe_camera
+from core.modules.video_module.capture_engine import CaptureEngine
+from core.modules.video_module.capture_profile import CaptureProfile
+from core.modules.video_module.frame_sources import frame_source_from_env, open_frame_source
+from core.qt_communication.messages.video_module.Requests import CameraListRequest, ChangeVideoInput, \
+    CaptureStatsRequest
 from core.qt_communication.messages.video_module.Responses import *
 from core.utilities.core_utils import suppress_stderr
-from core.utilities.helper import cv2_to_qimage
+from core.utilities.frame_ring import FrameRingBuffer
 
 
 class VideoModule(QObject):
-
-    def __init__(self, device_id=0):
+    """
+    Publishes camera frames to the frame ring and announces them with FrameAvailable.
+
+    The camera is read by a CaptureEngine on its own thread; a `display_fps` timer on the GUI thread only
+    takes the newest captured frame, if there is one, so a slow camera read never blocks the UI and a slow
+    frame handler only drops frames (see CaptureStatsRequest) instead of delaying them.
+
+    Cameras are found by a CameraEnumerator in the background as well; the stream starts once one shows up.
+    Read failures and reconnects are handled by the CaptureEngine with a backoff; its connection state is
+    published with CameraConnectionState, and once it gives up on the camera they are enumerated again.
+    The camera mode is negotiated from `capture_profile` (CAPTURE_PROFILE by default, see CaptureProfile),
+    the effective one is part of the capture stats.
+
+    Instead of the cameras, `frame_source` (a spec for `open_frame_source`, VIDEO_SOURCE by default) plays a
+    video file, catalog pictures or generated frames through the same FrameAvailable flow, paced in real
+    time or, without `realtime` (VIDEO_SOURCE_PACING=fast), as fast as they can be read.
+    """
+
+    def __init__(self,
+                 device_id=0,
+                 display_fps: int = 60,
+                 capture_profile: CaptureProfile | None = None,
+                 frame_source: str | None = None,
+                 realtime: bool | None = None):
         super().__init__()
         self.device_id = device_id
+        self.display_fps = display_fps
+        self.capture_profile = capture_profile or CaptureProfile.from_env()
+        env_source, env_realtime = frame_source_from_env()
+        self.frame_source = frame_source or env_source
+        self.realtime = env_realtime if realtime is None else realtime
         self.qt_signals = CommonSignals()
         self.is_running = False
 
-        self.cv2_stream = None
+        self.capture_engine: CaptureEngine | None = None
+        # Stopped without waiting for it, its thread may still hold the device.
+        self.released_engine: CaptureEngine | None = None
         self.process = None
-        self.max_frame_retry_allowed = 300
-        self.failed_frames_cnt = 0
+        self.connection_state: tuple | None = None
         self.camera_list: list = []
+        # Frames are published here and only the slot index is sent with FrameAvailable.
+        self.frame_ring: FrameRingBuffer | None = None
+        self.frame_ring_slots = 4
 
         self.video_stream_timer = QTimer()
-        self.camera_refresh_timer = QTimer()
+        self.video_stream_timer.setTimerType(Qt.TimerType.PreciseTimer)
 
         self.qt_signals.video_module_request.connect(self.handle_request)
 
-        self.media_devices = QMediaDevices()
-        self.media_devices.videoInputsChanged.connect(self._camera_list_refresh)
+        self.media_devices = QMediaDevices() if QMediaDevices is not None else None
+        self.camera_enumerator = CameraEnumerator(self.media_devices, probe=self._probe_camera)
+        self.camera_enumerator.cameras_changed.connect(self._handle_cameras_changed)
+
+        # The frame ring is shared memory, on POSIX it outlives the process unless it is unlinked.
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop_process)
 
     def start_process(self):
         """Starts the video capture process in a separate thread."""
         self.is_running = True
 
-        self.camera_refresh_timer.timeout.connect(self._check_camera_presence)
-        self.camera_refresh_timer.setInterval(1000)
-
         self.video_stream_timer.timeout.connect(self._read_video_stream_frame)
-        self.video_stream_timer.setInterval(int(1000/30))
-
-        if self._camera_list_refresh():
+        self.video_stream_timer.setInterval(int(1000 / self.display_fps))
+
+        if self.frame_source is not None:
+            # Opened once here so that a wrong spec fails right away rather than in the capture thread.
+            source = open_frame_source(self.frame_source, self.realtime)
+            source.release()
+            self.camera_list = [str(source)]
+            self.qt_signals.video_module_request.emit(
+                CameraListResponse(camera_list=self.camera_list, source=Modules.VIDEO_STREAM))
             self.start_video_stream_thread()
-        else:
-            self.camera_refresh_timer.start()
+            return
+
+        self.camera_enumerator.refresh()
 
     def handle_request(self, request: MessageBase):
         """Handles incoming messages."""
         request_handlers = {
             CameraListRequest: self._handle_camera_list_message,
-            ChangeVideoInput: self._handle_video_input_change
+            ChangeVideoInput: self._handle_video_input_change,
+            CaptureStatsRequest: self._handle_capture_stats_request
             # Additional request handlers...
         }
         handler = request_handlers.get(type(request), None)
         if handler:
-            handler(request)
+            with bus_instrumentation.handling(request, "VideoModule"):
+                handler(request)
 
     def _handle_camera_list_message(self, _: CameraListRequest = None):
         request = CameraListResponse(camera_list=self.camera_list, source=Modules.VIDEO_STREAM)
@@ -70,71 +123,79 @@ class VideoModule(QObject):
     def _handle_video_input_change(self, request: ChangeVideoInput):
         self.reinit_stream(device_id=request.device_id)
 
-    def _read_video_stream_frame(self):
-        with suppress_stderr():
-            ret, frame = self.cv2_stream.read()
+    def _handle_capture_stats_request(self, request: CaptureStatsRequest):
+        stats = self.capture_engine.stats() if self.capture_engine is not None else {}
+        self.qt_signals.video_module_request.emit(
+            CaptureStatsResponse(stats=stats, source=Modules.VIDEO_STREAM, destination=request.source).reply_to(request))
 
-        if not ret:
-            self.failed_frames_cnt += 1
-            print(f"Failed frames: {self.failed_frames_cnt} / {self.max_frame_retry_allowed}")
-
-            if self.failed_frames_cnt > self.max_frame_retry_allowed:
-                self._switch_to_camera_refresh()
-                return
-
-            self.reinit_stream(self.device_id)
-            response: MessageBase = FrameNotAvailable(source=Modules.VIDEO_STREAM)
+    def _read_video_stream_frame(self):
+        self._publish_connection_state()
+        if self.capture_engine.state == CaptureEngine.LOST:
+            self._switch_to_camera_refresh()
+            return
 
-        else:
-            self.failed_frames_cnt = 0
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame = cv2_to_qimage(frame)
-            response: MessageBase = FrameAvailable(frame, source=Modules.VIDEO_STREAM)
+        captured = self.capture_engine.take()
+        if captured is None:
+            # Nothing new since the last tick.
+            return
 
-        self.qt_signals.frame_received.emit(response)
-        QApplication.processEvents()
+        frame, _, timestamp = captured
+        slot, sequence = self._publish_frame(frame, timestamp)
+        self.qt_signals.frame_received.emit(
+            FrameAvailable(slot, sequence, timestamp, self.frame_ring.name, published_at=time.perf_counter(),
+                           source=Modules.VIDEO_STREAM))
+
+    def _publish_connection_state(self):
+        """Announces the capture engine's connection state when it changed since the last tick."""
+        engine = self.capture_engine
+        state = (engine.state, engine.device_id, engine.reconnect_attempt)
+        if state == self.connection_state:
+            return
+        previous, self.connection_state = self.connection_state, state
+
+        if engine.state == CaptureEngine.RECONNECTING:
+            print(f"Camera {engine.device_id}: reconnect attempt {engine.reconnect_attempt} "
+                  f"in {engine.retry_in_s:.1f} s")
+        if previous is not None and previous[0] == CaptureEngine.CONNECTED:
+            self.qt_signals.frame_received.emit(FrameNotAvailable(source=Modules.VIDEO_STREAM))
+        self.qt_signals.video_module_request.emit(
+            CameraConnectionState(engine.state, engine.device_id, engine.reconnect_attempt, engine.retry_in_s,
+                                  source=Modules.VIDEO_STREAM))
+
+    def _publish_frame(self, frame, timestamp: float):
+        """Copies the BGR camera frame as it is into the next ring slot, consumers display it as BGR888."""
+        if self.frame_ring is None or not self.frame_ring.fits(frame.shape):
+            # The resolution grew, consumers attach to the new ring by the name in FrameAvailable.
+            if self.frame_ring is not None:
+                self.frame_ring.close()
+            self.frame_ring = FrameRingBuffer(slots=self.frame_ring_slots, frame_shape=frame.shape)
+
+        slot, view = self.frame_ring.acquire(frame.shape)
+        np.copyto(view, frame)
+        return slot, self.frame_ring.commit(slot, frame.shape, timestamp)
 
     def _switch_to_camera_refresh(self):
-        """Stops the video stream and switches to refreshing camera list."""
-        print("Switching to camera refresh mode.")
+        """Stops the video stream and looks for cameras again, the current one is probably gone."""
         self.stop_video_stream_thread()
-        self.camera_refresh_timer.start()
-
-    def _camera_list_refresh(self) -> bool:
-        """Refreshes the list of available cameras and returns True if at least one is found."""
-        index = 0
-        id_arr = []
-
-        while True:
-            self.qt_signals.video_module_request.emit(CameraListResponse(camera_list=[], source=Modules.VIDEO_STREAM))
-            with suppress_stderr():
-                cap = cv2.VideoCapture(index)
-            if not cap.isOpened():
-                break
-            else:
-                id_arr.append(index)
-            cap.release()
-            index += 1
-
-        self.camera_list = [f"Camera {idx}" for idx in id_arr]
-        request = CameraListResponse(camera_list=self.camera_list, source=Modules.VIDEO_STREAM)
-        self.qt_signals.video_module_request.emit(request)
+        if self.frame_source is not None:
+            print(f"Frame source {self.frame_source} stopped delivering frames.")
+            return
+        print("Switching to camera refresh mode.")
+        self.camera_enumerator.invalidate()
+
+    def _handle_cameras_changed(self, camera_ids: list):
+        self.camera_list = [f"Camera {idx}" for idx in camera_ids]
+        self.qt_signals.video_module_request.emit(
+            CameraListResponse(camera_list=self.camera_list, source=Modules.VIDEO_STREAM))
 
-        return bool(self.camera_list)
+        if self.is_running and self.camera_list and self.capture_engine is None:
+            self.start_video_stream_thread()
 
     def reinit_stream(self, device_id: int):
         """Reinitializes the camera stream."""
-        self.cv2_stream.release()
         self.device_id = device_id
-        with suppress_stderr():
-            self.cv2_stream = cv2.VideoCapture(self.device_id)
-
-    def _check_camera_presence(self):
-        if not self._camera_list_refresh():
-            return
-
-        self.camera_refresh_timer.stop()
-        self.start_video_stream_thread()
+        if self.capture_engine is not None:
+            self.capture_engine.switch_device(device_id)
 
     def start_video_stream_thread(self, device_id: int = None):
         if device_id:
@@ -143,16 +204,38 @@ class VideoModule(QObject):
         if self.device_id >= len(self.camera_list):
             self.device_id = 0
 
-        with suppress_stderr():
-            self.cv2_stream = cv2.VideoCapture(self.device_id)
-        self.cv2_stream.set(cv2.CAP_PROP_FPS, 60)
-
+        self.connection_state = None
+        if self.frame_source is not None:
+            self.capture_engine = CaptureEngine(
+                self.device_id, open_capture=lambda _: open_frame_source(self.frame_source, self.realtime),
+                previous=self.released_engine)
+        else:
+            self.capture_engine = CaptureEngine(self.device_id, profile=self.capture_profile,
+                                                previous=self.released_engine)
+        self.capture_engine.start()
         self.video_stream_timer.start()
 
     def stop_video_stream_thread(self):
-        if self.cv2_stream:
-            self.cv2_stream.release()
-        if self.video_stream_thread.isRunning():
-            self.video_stream_thread.quit()
-            self.video_stream_thread.wait()
-            self.video_stream_thread = None
+        self.video_stream_timer.stop()
+        if self.capture_engine is not None:
+            # The capture thread may be stuck opening the device, it finishes on its own. The next engine and
+            # the camera probes wait for it off the GUI thread, exclusive backends cannot open a device twice.
+            self.capture_engine.stop(wait=False)
+            self.released_engine = self.capture_engine
+            self.capture_engine = None
+
+    def stop_process(self):
+        """Stops the stream and frees the frame ring; called when the application quits."""
+        self.is_running = False
+        self.stop_video_stream_thread()
+        if self.frame_ring is not None:
+            # Consumers copy a frame out of the ring in their FrameAvailable handler, no view outlives it.
+            self.frame_ring.close()
+            self.frame_ring = None
+
+    def _probe_camera(self, index: int) -> bool:
+        """Runs on the enumerator's thread."""
+        released_engine = self.released_engine
+        if released_engine is not None:
+            released_engine.join()
+        return probe_camera(index)
@@ -1,9 +1,12 @@
+import itertools
+import time
 from enum import Enum
-from typing import Type
+from typing import Callable, Type
 
-from PySide6.QtCore import QTimer, QEventLoop, Signal
+from PySide6.QtCore import QObject, QTimer, QEventLoop, Qt, Signal, Slot
 
-from core.qt_communication.messages.common_signals import CommonSignals
+from core.qt_communication.instrumentation import bus_instrumentation
+from core.qt_communication.messages.common_signals import CommonSignals, singleton
 
 qt_signals = CommonSignals()
 
@@ -22,6 +25,143 @@ class MessageBase:
     def __init__(self):
         self.source: Modules | None = None
         self.destination: Modules | None = None
+        # Set by async_request: the ID a response carries back, and when the requester stops waiting.
+        self.correlation_id: int | None = None
+        self.deadline: float | None = None
+        self.cancelled = False
+
+    def reply_to(self, request: "MessageBase") -> "MessageBase":
+        """Marks this message as the response to `request`, so it reaches that request's future."""
+        self.correlation_id = request.correlation_id
+        return self
+
+    def expired(self) -> bool:
+        """True when nobody waits for the answer anymore, the request was cancelled or its deadline passed."""
+        return self.cancelled or (self.deadline is not None and time.monotonic() > self.deadline)
+
+
+class ResponseFuture:
+    """
+    Handle of a request sent with `async_request`.
+
+    Callbacks run in the GUI thread once the matching response arrives, the deadline passes or the request
+    is cancelled; check `state` or `result()` to tell which.
+    """
+
+    PENDING = "pending"
+    DONE = "done"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
+
+    def __init__(self, request: MessageBase):
+        self.request = request
+        self.state = ResponseFuture.PENDING
+        self.response: MessageBase | None = None
+        self._callbacks: list[Callable[["ResponseFuture"], None]] = []
+        self._timer: QTimer | None = None
+
+    def done(self) -> bool:
+        return self.state != ResponseFuture.PENDING
+
+    def result(self) -> MessageBase | None:
+        """The response, None while pending or if the request was cancelled or timed out."""
+        return self.response
+
+    def add_done_callback(self, callback: Callable[["ResponseFuture"], None]):
+        if self.done():
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def cancel(self) -> bool:
+        """Stops waiting for the response; the receiver skips the request if it has not started on it yet."""
+        self.request.cancelled = True
+        return RequestDispatcher().finish(self, ResponseFuture.CANCELLED)
+
+    def _finish(self, state: str, response: MessageBase | None = None):
+        self.state = state
+        self.response = response
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer.deleteLater()
+            self._timer = None
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+
+@singleton
+class RequestDispatcher(QObject):
+    """
+    Matches responses to pending requests by correlation ID. It has to be created in the GUI thread (the first
+    `async_request` does it) so that responses emitted by worker threads are delivered there.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._ids = itertools.count(1)
+        self._pending: dict[int, tuple[ResponseFuture, Type[MessageBase]]] = {}
+
+    def send(self,
+             request_signal: Signal,
+             request_message: MessageBase,
+             response_signal: Signal,
+             response_message_type: Type[MessageBase],
+             timeout_ms: int | None = 1000) -> ResponseFuture:
+        request_message.correlation_id = next(self._ids)
+        future = ResponseFuture(request_message)
+        self._pending[request_message.correlation_id] = (future, response_message_type)
+
+        if timeout_ms is not None:
+            request_message.deadline = time.monotonic() + timeout_ms / 1000
+            future._timer = QTimer(self)
+            future._timer.setSingleShot(True)
+            future._timer.timeout.connect(lambda: self.finish(future, ResponseFuture.TIMED_OUT))
+            future._timer.start(timeout_ms)
+
+        response_signal.connect(self._on_response, Qt.ConnectionType.UniqueConnection)
+        request_signal.emit(request_message)
+        return future
+
+    def finish(self, future: ResponseFuture, state: str, response: MessageBase | None = None) -> bool:
+        if self._pending.pop(future.request.correlation_id, None) is None:
+            return False
+        if state == ResponseFuture.TIMED_OUT:
+            bus_instrumentation.count(future.request, "timeout")
+        elif state == ResponseFuture.DONE:
+            bus_instrumentation.responded(future.request, response)
+        future._finish(state, response)
+        return True
+
+    @Slot(object)
+    def _on_response(self, message: MessageBase):
+        pending = self._pending.get(message.correlation_id) if message.correlation_id is not None else None
+        if pending is None:
+            return
+
+        future, response_message_type = pending
+        if isinstance(message, response_message_type) and message is not future.request:
+            self.finish(future, ResponseFuture.DONE, message)
+
+
+def async_request(request_signal: Signal,
+                  request_message: MessageBase,
+                  response_signal: Signal,
+                  response_message_type: Type[MessageBase],
+                  timeout_ms: int | None = 1000,
+                  callback: Callable[[ResponseFuture], None] | None = None) -> ResponseFuture:
+    """
+    Emits `request_message` and returns right away with a ResponseFuture for its response.
+
+    Unlike `blocking_response_message_await` this never runs a nested event loop, and responses are matched by
+    correlation ID rather than by type only, so several requests can be in flight at once. `timeout_ms` is the
+    per-request deadline (None waits forever); the receiver also skips requests whose deadline has passed.
+    """
+    future = RequestDispatcher().send(request_signal, request_message, response_signal, response_message_type,
+                                      timeout_ms)
+    if callback is not None:
+        future.add_done_callback(callback)
+    return future
 
 
 def blocking_response_message_await(request_signal: Signal,
@@ -55,4 +195,7 @@ def blocking_response_message_await(request_signal: Signal,
     if timer.isActive():
         timer.stop()  # Stop the timer if the response was received before timeout
 
+    if ret_val is None:
+        bus_instrumentation.count(request_message, "timeout")
+
     return ret_val
@@ -0,0 +1,150 @@
+import atexit
+import csv
+import os
+import platform
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+LATENCY_LOG_ENV = "FRAME_LATENCY_LOG"
+LATENCY_OVERLAY_ENV = "FRAME_LATENCY_OVERLAY"
+
+
+class FrameTiming:
+    """
+    The way of one camera frame from capture to the screen: its `sequence` and capture timestamp (both from
+    FrameAvailable, `time.perf_counter()` right after the grab) and the milliseconds spent in each stage
+        capture     grab to published in the frame ring
+        convert     ring to QImage in the GUI, and QImage to array in the ProcessingModule
+        queue       waiting for the ProcessingModule (request emitted to handler start)
+        inference   background removal
+        composite   cutout to QImage
+        paint       QImage to the labels of the ImageFrame
+    Stages the frame did not go through (no background removal) are missing. It travels in the
+    RemoveBackgroundRequest and back in the ProcessedImageResponse; one stage is only ever written by one thread.
+    """
+
+    STAGES = ("capture", "convert", "queue", "inference", "composite", "paint")
+
+    def __init__(self, sequence: int, captured_at: float):
+        self.sequence = sequence
+        self.captured_at = captured_at
+        self.stages: dict[str, float] = {}
+        self.requested_at: float | None = None
+        self.displayed_at: float | None = None
+
+    def add(self, stage: str, start: float, end: float | None = None) -> float:
+        """Adds the time from `start` to `end` (now by default) to `stage`, returns `end`."""
+        end = time.perf_counter() if end is None else end
+        self.stages[stage] = self.stages.get(stage, 0.0) + (end - start) * 1000
+        return end
+
+    def total_ms(self) -> float | None:
+        return (self.displayed_at - self.captured_at) * 1000 if self.displayed_at is not None else None
+
+
+class FrameLatencyTracker:
+    """
+    Rolling statistics of the displayed camera frames: the display FPS and the capture to screen latency over
+    the last `window` frames, for the Camera tab overlay.
+
+    With a log file (FRAME_LATENCY_LOG=<path.csv> at startup), every displayed frame is also appended as a row
+    with the host name, so logs of different machines can be compared. The log rolls over to `<path>.1` after
+    `max_rows` rows, keeping its size bounded in long sessions.
+    """
+
+    COLUMNS = ("time", "host", "sequence", "total_ms") + tuple(f"{stage}_ms" for stage in FrameTiming.STAGES)
+
+    def __init__(self, window: int = 300, max_rows: int = 100_000):
+        self.window = window
+        self.max_rows = max_rows
+        self._displayed: deque[float] = deque(maxlen=window)
+        self._totals: deque[float] = deque(maxlen=window)
+        self._stages: dict[str, deque] = {stage: deque(maxlen=window) for stage in FrameTiming.STAGES}
+        self._log_path: Path | None = None
+        self._log_file = None
+        self._log_writer = None
+        self._log_rows = 0
+        self._host = platform.node()
+
+    def record(self, timing: FrameTiming):
+        """Records a frame that was just shown."""
+        if timing.displayed_at is None:
+            timing.displayed_at = time.perf_counter()
+        self._displayed.append(timing.displayed_at)
+        self._totals.append(timing.total_ms())
+        for stage, value in timing.stages.items():
+            self._stages[stage].append(value)
+        if self._log_writer is not None:
+            self._log(timing)
+
+    def fps(self) -> float:
+        if len(self._displayed) < 2:
+            return 0.0
+        span = self._displayed[-1] - self._displayed[0]
+        return (len(self._displayed) - 1) / span if span > 0 else 0.0
+
+    def latency_ms(self, percentile: float = 95) -> float:
+        return float(np.percentile(self._totals, percentile)) if self._totals else 0.0
+
+    def summary(self) -> dict:
+        """p50/p95 of the total latency and of every stage, and the display FPS."""
+        summary = {"fps": round(self.fps(), 2)}
+        for name, values in (("total", self._totals), *self._stages.items()):
+            if values:
+                p50, p95 = np.percentile(values, (50, 95))
+                summary[name] = {"p50": round(float(p50), 2), "p95": round(float(p95), 2)}
+        return summary
+
+    def open_log(self, path: Path | str):
+        self.close_log()
+        self._log_path = Path(path)
+        self._log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._log_file = open(self._log_path, "w", newline="")
+        self._log_writer = csv.writer(self._log_file)
+        self._log_writer.writerow(self.COLUMNS)
+        self._log_rows = 0
+
+    def close_log(self):
+        if self._log_file is not None:
+            self._log_file.close()
+        self._log_file = None
+        self._log_writer = None
+
+    def reset(self):
+        self._displayed.clear()
+        self._totals.clear()
+        for values in self._stages.values():
+            values.clear()
+
+    def _log(self, timing: FrameTiming):
+        if self._log_rows >= self.max_rows:
+            self.close_log()
+            os.replace(self._log_path, self._log_path.with_name(self._log_path.name + ".1"))
+            self.open_log(self._log_path)
+
+        stages = [f"{timing.stages[stage]:.3f}" if stage in timing.stages else "" for stage in FrameTiming.STAGES]
+        self._log_writer.writerow([f"{time.time():.3f}", self._host, timing.sequence, f"{timing.total_ms():.3f}",
+                                   *stages])
+        self._log_rows += 1
+
+
+frame_latency = FrameLatencyTracker()
+
+
+def enable_from_env() -> bool:
+    """Starts the CSV log of `frame_latency` if FRAME_LATENCY_LOG names a file, it is closed at exit."""
+    log_path = os.getenv(LATENCY_LOG_ENV)
+    if not log_path:
+        return False
+
+    frame_latency.open_log(log_path)
+    atexit.register(frame_latency.close_log)
+    return True
+
+
+def overlay_from_env() -> bool:
+    """Whether the Camera tab shows the FPS/latency overlay from the start (FRAME_LATENCY_OVERLAY=1)."""
+    return os.getenv(LATENCY_OVERLAY_ENV, "0").lower() not in ("", "0", "false", "no")
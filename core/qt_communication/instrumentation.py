@@ -0,0 +1,177 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+import numpy as np
+
+TRACE_ENV = "SIGNAL_BUS_TRACE"
+
+_no_op = nullcontext()
+
+
+class SignalBusInstrumentation:
+    """
+    Optional timing of the messages on the CommonSignals bus, per message type.
+
+    When enabled, every message emitted on a bus signal gets an emit timestamp, and the module handlers record
+    when they start and finish on one. From that it keeps rolling windows of the last `window` samples of
+        queue_ms     emit to handler start (time spent waiting in Qt event queues or a job queue)
+        handler_ms   handler start to end
+        response_ms  request emit to its response arriving at an `async_request` future
+    and counts of dropped, coalesced, expired and timed out messages. `summary()` reports p50/p95/p99 of every
+    window; `dump_json` writes the summary and `export_chrome_trace` the recorded events, for chrome://tracing
+    or Perfetto.
+
+    Set SIGNAL_BUS_TRACE to a directory to enable it at startup and write both files there when the app exits.
+    Disabled, every hook returns immediately.
+    """
+
+    def __init__(self, window: int = 1000, max_events: int = 100_000):
+        self.enabled = False
+        self.window = window
+        self._samples: dict[tuple[str, str], deque] = defaultdict(lambda: deque(maxlen=self.window))
+        self._counts: dict[tuple[str, str], int] = defaultdict(int)
+        self._events: deque[dict] = deque(maxlen=max_events)
+        self._thread_names: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def enable(self, signals=None):
+        """Starts recording; `signals` is the CommonSignals instance whose emits are timestamped."""
+        if self.enabled:
+            return
+        self.enabled = True
+        self._origin = time.perf_counter()
+        if signals is not None:
+            # Direct connections run in the emitting thread while emit() is in progress.
+            from PySide6.QtCore import Qt
+
+            for name in ("processing_module_request", "video_module_request", "frame_received"):
+                getattr(signals, name).connect(lambda message, name=name: self.emitted(message, name),
+                                               Qt.ConnectionType.DirectConnection)
+
+    def emitted(self, message, signal_name: str):
+        if not self.enabled or getattr(message, "emitted_at", None) is not None:
+            return
+        message.emitted_at = time.perf_counter()
+        self._event({"name": type(message).__name__, "cat": signal_name, "ph": "i", "s": "t",
+                     "ts": self._us(message.emitted_at)})
+
+    def handling(self, message, handler_name: str):
+        """Context manager around a handler call on `message`."""
+        if not self.enabled:
+            return _no_op
+        return self._handling(message, handler_name)
+
+    @contextmanager
+    def _handling(self, message, handler_name: str):
+        message_type = type(message).__name__
+        start = time.perf_counter()
+        emitted_at = getattr(message, "emitted_at", None)
+        if emitted_at is not None:
+            self._sample(message_type, "queue_ms", (start - emitted_at) * 1000)
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._sample(message_type, "handler_ms", (end - start) * 1000)
+            self._event({"name": message_type, "cat": handler_name, "ph": "X", "ts": self._us(start),
+                         "dur": (end - start) * 1e6})
+
+    def responded(self, request, response):
+        if not self.enabled or getattr(request, "emitted_at", None) is None:
+            return
+        self._sample(type(request).__name__, "response_ms", (time.perf_counter() - request.emitted_at) * 1000)
+
+    def count(self, message, what: str):
+        """Counts an event such as "dropped", "coalesced", "expired" or "timeout" for the message's type."""
+        if not self.enabled:
+            return
+        message_type = type(message).__name__
+        with self._lock:
+            self._counts[(message_type, what)] += 1
+        self._event({"name": f"{message_type} {what}", "cat": what, "ph": "i", "s": "g",
+                     "ts": self._us(time.perf_counter())})
+
+    def summary(self) -> dict:
+        with self._lock:
+            samples = {key: list(values) for key, values in self._samples.items()}
+            counts = dict(self._counts)
+
+        summary: dict[str, dict] = defaultdict(dict)
+        for (message_type, metric), values in samples.items():
+            p50, p95, p99 = np.percentile(values, (50, 95, 99))
+            summary[message_type][metric] = {"count": len(values), "p50": round(float(p50), 3),
+                                             "p95": round(float(p95), 3), "p99": round(float(p99), 3),
+                                             "max": round(max(values), 3)}
+        for (message_type, what), count in counts.items():
+            summary[message_type][what] = count
+        return dict(summary)
+
+    def dump_json(self, path: Path | str):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def export_chrome_trace(self, path: Path | str):
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+        pid = os.getpid()
+        metadata = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                    for tid, name in thread_names.items()]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": metadata + [dict(event, pid=pid) for event in events],
+                       "displayTimeUnit": "ms"}, f)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._events.clear()
+
+    def _sample(self, message_type: str, metric: str, value_ms: float):
+        with self._lock:
+            self._samples[(message_type, metric)].append(value_ms)
+
+    def _event(self, event: dict):
+        tid = threading.get_native_id()
+        event["tid"] = tid
+        with self._lock:
+            if tid not in self._thread_names:
+                self._thread_names[tid] = threading.current_thread().name
+            self._events.append(event)
+
+    def _us(self, timestamp: float) -> float:
+        return (timestamp - self._origin) * 1e6
+
+
+bus_instrumentation = SignalBusInstrumentation()
+
+
+def enable_from_env(signals) -> bool:
+    """Enables `bus_instrumentation` if SIGNAL_BUS_TRACE names an output directory, dumping to it at exit."""
+    trace_dir = os.getenv(TRACE_ENV)
+    if not trace_dir:
+        return False
+
+    os.makedirs(trace_dir, exist_ok=True)
+    bus_instrumentation.enable(signals)
+    atexit.register(dump)
+    return True
+
+
+def dump(trace_dir: Path | str | None = None) -> Path | None:
+    """Writes signal_bus_stats.json and signal_bus_trace.json to `trace_dir` (SIGNAL_BUS_TRACE by default)."""
+    trace_dir = trace_dir or os.getenv(TRACE_ENV)
+    if not bus_instrumentation.enabled or not trace_dir:
+        return None
+
+    bus_instrumentation.dump_json(os.path.join(trace_dir, "signal_bus_stats.json"))
+    bus_instrumentation.export_chrome_trace(os.path.join(trace_dir, "signal_bus_trace.json"))
+    print(f"Signal bus instrumentation written to {trace_dir}")
+    return Path(trace_dir)
@@ -3,6 +3,7 @@ from PySide6.QtGui import QPixmap, QImage
 
 # from core.modules.catalog.ContourDetectionSettings import ContourDetectionSettings
 from core.qt_communication.base import MessageBase
+from core.qt_communication.frame_latency import FrameTiming
 
 
 # class DoNothingRequest(MessageBase):
@@ -31,9 +32,14 @@ from core.qt_communication.base import MessageBase
 
 
 class RemoveBackgroundRequest(MessageBase):
-    def __init__(self,  picture: QImage, source=None, destination=None):
+    def __init__(self,  picture: QImage, use_cache: bool = True, temporal: bool = False, roi: bool = False,
+                 frame_timing: FrameTiming | None = None, source=None, destination=None):
         super().__init__()
         self.picture = picture
+        self.use_cache = use_cache
+        self.temporal = temporal
+        self.roi = roi
+        self.frame_timing = frame_timing
         self.source = source
         self.destination = destination
 
@@ -57,6 +63,13 @@ class RemoveBackgroundRequest(MessageBase):
 #         self.destination = destination
 
 
+class ProcessingStatsRequest(MessageBase):
+    def __init__(self, source=None, destination=None):
+        super().__init__()
+        self.source = source
+        self.destination = destination
+
+
 class TestRequest(MessageBase):
     def __init__(self, source=None, destination=None):
         super().__init__()
@@ -82,3 +95,10 @@ class AugmentCoinCatalogRequest(MessageBase):
         self.picture_amount = picture_amount
         self.source = source
         self.destination = destination
+
+
+class CancelCoinCatalogAugmentationRequest(MessageBase):
+    def __init__(self, source=None, destination=None):
+        super().__init__()
+        self.source = source
+        self.destination = destination
@@ -1,12 +1,14 @@
 from PySide6.QtGui import QImage
 
 from core.qt_communication.base import MessageBase
+from core.qt_communication.frame_latency import FrameTiming
 
 
 class ProcessedImageResponse(MessageBase):
-    def __init__(self,  image: QImage, source=None, destination=None):
+    def __init__(self,  image: QImage, frame_timing: FrameTiming | None = None, source=None, destination=None):
         super().__init__()
         self.image = image
+        self.frame_timing = frame_timing
         self.source = source
         self.destination = destination
 
@@ -18,3 +20,34 @@ class AugmentedPictureResponse(MessageBase):
         self.augmented_hue = augmented_hue
         self.source = source
         self.destination = destination
+
+
+class ProcessingStatsResponse(MessageBase):
+    def __init__(self, mask_cache: dict, temporal: dict, roi_tracker: dict, queue: dict, source=None,
+                 destination=None):
+        super().__init__()
+        self.mask_cache = mask_cache
+        self.temporal = temporal
+        self.roi_tracker = roi_tracker
+        self.queue = queue
+        self.source = source
+        self.destination = destination
+
+
+class CatalogAugmentationProgressResponse(MessageBase):
+    def __init__(self, photos_done: int, photos_total: int, variants_done: int, variants_total: int,
+                 variants_per_second: float, elapsed_s: float, errors: int, finished: bool, cancelled: bool,
+                 failed: bool = False, source=None, destination=None):
+        super().__init__()
+        self.photos_done = photos_done
+        self.photos_total = photos_total
+        self.variants_done = variants_done
+        self.variants_total = variants_total
+        self.variants_per_second = variants_per_second
+        self.elapsed_s = elapsed_s
+        self.errors = errors
+        self.finished = finished
+        self.cancelled = cancelled
+        self.failed = failed
+        self.source = source
+        self.destination = destination
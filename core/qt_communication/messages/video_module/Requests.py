@@ -29,3 +29,10 @@ class CameraListRequest(MessageBase):
         super().__init__()
         self.source = source
         self.destination = destination
+
+
+class CaptureStatsRequest(MessageBase):
+    def __init__(self, source=None, destination=None):
+        super().__init__()
+        self.source = source
+        self.destination = destination
@@ -12,14 +12,54 @@ class CameraListResponse(MessageBase):
 
 
 class FrameAvailable(MessageBase):
-    def __init__(self, frame: QImage, source=None, destination=None):
+    """
+    A new BGR frame was published in `slot` of the shared-memory FrameRingBuffer named `ring_name`. `timestamp`
+    is its capture time and `published_at` when it was in the ring, both `time.perf_counter()`.
+    """
+
+    def __init__(self, slot: int, sequence: int, timestamp: float, ring_name: str, published_at: float | None = None,
+                 source=None, destination=None):
         super().__init__()
         self.source = source
         self.destination = destination
-        self.frame = frame
+        self.slot = slot
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.ring_name = ring_name
+        self.published_at = published_at
 
 class FrameNotAvailable(MessageBase):
     def __init__(self, source=None, destination=None):
         super().__init__()
         self.source = source
         self.destination = destination
+
+
+class CameraConnectionState(MessageBase):
+    """
+    The CaptureEngine connection `state` of camera `device_id` changed: "connecting", "connected",
+    "reconnecting" (reopen `attempt` in `retry_in_s` seconds) or "lost" (given up, cameras are enumerated again).
+    """
+
+    def __init__(self, state: str, device_id: int, attempt: int = 0, retry_in_s: float = 0.0, source=None,
+                 destination=None):
+        super().__init__()
+        self.source = source
+        self.destination = destination
+        self.state = state
+        self.device_id = device_id
+        self.attempt = attempt
+        self.retry_in_s = retry_in_s
+
+
+class CaptureStatsResponse(MessageBase):
+    """
+    CaptureEngine.stats(): the effective camera mode, capture and delivered FPS, captured, delivered, dropped
+    and failed frames.
+    """
+
+    def __init__(self, stats: dict, source=None, destination=None):
+        super().__init__()
+        self.source = source
+        self.destination = destination
+        self.stats = stats
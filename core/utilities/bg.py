@@ -1,9 +1,11 @@
+import time
 from typing import List, Tuple, cast
 
 import numpy as np
 import onnxruntime as ort
 from PIL import Image, ImageOps
 from PIL.Image import Image as PILImage
+import cv2
 from cv2 import (
     BORDER_DEFAULT,
     MORPH_ELLIPSE,
@@ -47,8 +49,106 @@ def alpha_matting_cutout(
         img = img.convert("RGB")
 
     img_array = np.asarray(img)
-    mask_array = np.asarray(mask)
+    trimap = _trimap(np.asarray(mask), foreground_threshold, background_threshold, erode_structure_size)
 
+    img_normalized = img_array / 255.0
+    trimap_normalized = trimap / 255.0
+
+    alpha = estimate_alpha_cf(img_normalized, trimap_normalized)
+    foreground = estimate_foreground_ml(img_normalized, alpha)
+    cutout = stack_images(foreground, alpha)
+
+    cutout = np.clip(cutout * 255, 0, 255).astype(np.uint8)
+    cutout = Image.fromarray(cutout)
+
+    return cutout
+
+
+class _MattingTimeout(Exception):
+    pass
+
+
+def alpha_matting_cutout_roi(
+    img: PILImage,
+    mask: PILImage,
+    foreground_threshold: int,
+    background_threshold: int,
+    erode_structure_size: int,
+    margin: int = 16,
+    scale: float = 1.0,
+    time_budget: float | None = None,
+) -> PILImage:
+    """
+    Perform alpha matting only where it is needed, around the unknown band of the trimap.
+
+    Works like `alpha_matting_cutout`, but the closed-form solve and the foreground estimation run on the
+    bounding box of the unknown region plus `margin` pixels. With `scale` < 1 alpha is solved on a downscaled
+    crop and upsampled, while the known pixels keep their full-resolution values. The result is pasted back
+    into a full-size cutout; pixels outside the crop take their alpha from the trimap.
+
+    When the matting takes longer than `time_budget` seconds, it is abandoned and `naive_cutout` is returned
+    instead, so a live preview never stalls on a hard frame. The budget is checked after every solver
+    iteration and before the foreground estimation.
+    """
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+    if img.mode == "RGBA" or img.mode == "CMYK":
+        img = img.convert("RGB")
+
+    img_array = np.asarray(img)
+    trimap = _trimap(np.asarray(mask), foreground_threshold, background_threshold, erode_structure_size)
+
+    cutout = np.empty((img_array.shape[0], img_array.shape[1], 4), dtype=np.uint8)
+    cutout[:, :, :3] = img_array
+    cutout[:, :, 3] = np.where(trimap == 255, 255, 0)
+
+    unknown = (trimap == 128).astype(np.uint8)
+    if not unknown.any():
+        return Image.fromarray(cutout)
+
+    x, y, width, height = cv2.boundingRect(unknown)
+    top, left = max(y - margin, 0), max(x - margin, 0)
+    bottom = min(y + height + margin, trimap.shape[0])
+    right = min(x + width + margin, trimap.shape[1])
+
+    img_roi = img_array[top:bottom, left:right] / 255.0
+    trimap_roi = trimap[top:bottom, left:right] / 255.0
+
+    def check_deadline(*_):
+        if deadline is not None and time.perf_counter() > deadline:
+            raise _MattingTimeout()
+
+    try:
+        if scale < 1.0:
+            size = (max(int((right - left) * scale), 1), max(int((bottom - top) * scale), 1))
+            alpha = estimate_alpha_cf(
+                cv2.resize(img_roi, size, interpolation=cv2.INTER_AREA),
+                cv2.resize(trimap_roi, size, interpolation=cv2.INTER_NEAREST),
+                cg_kwargs={"callback": check_deadline},
+            )
+            alpha = cv2.resize(alpha, (right - left, bottom - top), interpolation=cv2.INTER_LINEAR)
+            # Only the unknown band takes the upsampled values, known pixels stay exact. The band is compared on
+            # the uint8 trimap, 128 / 255 is not exactly 0.5.
+            alpha = np.where(trimap[top:bottom, left:right] == 128, np.clip(alpha, 0, 1), trimap_roi)
+        else:
+            alpha = estimate_alpha_cf(img_roi, trimap_roi, cg_kwargs={"callback": check_deadline})
+
+        check_deadline()
+        foreground = estimate_foreground_ml(img_roi, alpha)
+    except _MattingTimeout:
+        return naive_cutout(img, mask)
+
+    cutout[top:bottom, left:right] = np.clip(stack_images(foreground, alpha) * 255, 0, 255).astype(np.uint8)
+
+    return Image.fromarray(cutout)
+
+
+def _trimap(
+    mask_array: np.ndarray,
+    foreground_threshold: int,
+    background_threshold: int,
+    erode_structure_size: int,
+) -> np.ndarray:
     is_foreground = mask_array > foreground_threshold
     is_background = mask_array < background_threshold
 
@@ -64,18 +164,7 @@ def alpha_matting_cutout(
     trimap = np.full(mask_array.shape, dtype=np.uint8, fill_value=128)
     trimap[is_foreground] = 255
     trimap[is_background] = 0
-
-    img_normalized = img_array / 255.0
-    trimap_normalized = trimap / 255.0
-
-    alpha = estimate_alpha_cf(img_normalized, trimap_normalized)
-    foreground = estimate_foreground_ml(img_normalized, alpha)
-    cutout = stack_images(foreground, alpha)
-
-    cutout = np.clip(cutout * 255, 0, 255).astype(np.uint8)
-    cutout = Image.fromarray(cutout)
-
-    return cutout
+    return trimap
 
 
 def naive_cutout(img: PILImage, mask: PILImage) -> PILImage:
@@ -109,20 +198,98 @@ def putalpha_cutout(img: PILImage, mask: PILImage) -> PILImage:
     return img
 
 
-def get_concat_v_multi(imgs: List[PILImage]) -> PILImage:
+def naive_cutout_array(img: np.ndarray, mask: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Array counterpart of `naive_cutout`.
+
+    Every channel of `img` is scaled by the mask and the mask becomes the alpha channel, like compositing
+    over a transparent background. The result is written into `out` when it is an RGBA buffer of the right
+    size, so callers processing a stream of frames can reuse one buffer.
+
+    Args:
+        img (np.ndarray): The (height, width, 3 or 4) uint8 image.
+        mask (np.ndarray): The (height, width) uint8 mask.
+        out (np.ndarray | None): Optional (height, width, 4) uint8 buffer for the result.
+
+    Returns:
+        np.ndarray: The RGBA cutout.
+    """
+    out = _rgba_buffer(img, out)
+    out[:, :, :3] = img[:, :, :3]
+    out[:, :, 3] = img[:, :, 3] if img.shape[2] == 4 else 255
+    cv2.multiply(out, cv2.merge((mask, mask, mask, mask)), dst=out, scale=1 / 255)
+    return out
+
+
+def putalpha_cutout_array(img: np.ndarray, mask: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Array counterpart of `putalpha_cutout`: keeps the colors of `img` and uses the mask as alpha channel.
+
+    Args:
+        img (np.ndarray): The (height, width, 3 or 4) uint8 image.
+        mask (np.ndarray): The (height, width) uint8 mask.
+        out (np.ndarray | None): Optional (height, width, 4) uint8 buffer for the result.
+
+    Returns:
+        np.ndarray: The RGBA cutout.
+    """
+    out = _rgba_buffer(img, out)
+    out[:, :, :3] = img[:, :, :3]
+    out[:, :, 3] = mask
+    return out
+
+
+def _rgba_buffer(img: np.ndarray, out: np.ndarray | None) -> np.ndarray:
+    shape = (img.shape[0], img.shape[1], 4)
+    if out is None or out.shape != shape or out.dtype != np.uint8 or not out.flags.c_contiguous:
+        out = np.empty(shape, dtype=np.uint8)
+    return out
+
+
+def get_concat_v_multi(imgs: List[PILImage | np.ndarray]) -> PILImage | np.ndarray:
     """
     Concatenate multiple images vertically.
 
+    The output size is computed up front and every image is copied into one RGBA buffer exactly once. Like
+    `get_concat_v`, the result is as wide as the first image; wider images are cropped and narrower ones
+    leave a transparent border. A single image is returned as is, and `imgs` is left untouched.
+
     Args:
-        imgs (List[PILImage]): The list of images to be concatenated.
+        imgs (List[PILImage | np.ndarray]): The list of images to be concatenated, PIL images or
+            (height, width[, 1, 3 or 4]) uint8 arrays.
 
     Returns:
-        PILImage: The concatenated image.
+        PILImage | np.ndarray: The concatenated RGBA image, an array if all inputs are arrays.
     """
-    pivot = imgs.pop(0)
-    for im in imgs:
-        pivot = get_concat_v(pivot, im)
-    return pivot
+    if len(imgs) == 1:
+        return imgs[0]
+
+    arrays = [_concat_source(im) for im in imgs]
+    width = arrays[0].shape[1]
+    dst = np.zeros((sum(array.shape[0] for array in arrays), width, 4), dtype=np.uint8)
+
+    top = 0
+    for array in arrays:
+        height, copy_width = array.shape[0], min(array.shape[1], width)
+        region = dst[top:top + height, :copy_width]
+        if array.ndim == 2 or array.shape[2] == 1:
+            region[:, :, :3] = array.reshape(height, -1, 1)[:, :copy_width]
+        else:
+            region[:, :, :array.shape[2]] = array[:, :copy_width]
+        if array.ndim == 2 or array.shape[2] != 4:
+            region[:, :, 3] = 255
+        top += height
+
+    if all(isinstance(im, np.ndarray) for im in imgs):
+        return dst
+    return Image.fromarray(dst, mode="RGBA")
+
+
+def _concat_source(im: PILImage | np.ndarray) -> np.ndarray:
+    if isinstance(im, np.ndarray):
+        return im
+    # Gray, RGB and RGBA are copied as they are, anything else is converted the way paste() would.
+    return np.asarray(im if im.mode in ("L", "RGB", "RGBA") else im.convert("RGBA"))
 
 
 def get_concat_v(img1: PILImage, img2: PILImage) -> PILImage:
@@ -0,0 +1,129 @@
+import itertools
+import os
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+_ring_ids = itertools.count()
+
+_ALIGNMENT = 64
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class FrameRingBuffer:
+    """
+    Fixed-size frame slots in shared memory, written by one producer and read zero-copy by any number of
+    consumers, in this or other processes.
+
+    The producer fills the oldest slot and publishes it with a new sequence number (starting at 1) and a
+    timestamp; consumers only receive the slot index (see FrameAvailable) and attach by `name`. A slot is
+    reused after `slots` newer frames, so a reader that holds on to a view must check `is_current(slot,
+    sequence)` after using it; the sequence of a slot being rewritten is 0.
+    """
+
+    def __init__(self, name: str | None = None, slots: int = 4, frame_shape: tuple | None = None):
+        """
+        Creates a ring of `slots` slots large enough for `frame_shape` (height, width[, channels]) uint8
+        frames when `frame_shape` is given, otherwise attaches to the existing ring `name`.
+        """
+        self.owner = frame_shape is not None
+        if self.owner:
+            self.slots = slots
+            self.slot_bytes = int(np.prod(frame_shape))
+            name = name or f"ring{os.getpid()}_{next(_ring_ids)}"
+            self.shm = SharedMemory(name=name, create=True, size=self._layout(slots, self.slot_bytes))
+            self._header(slots)
+            self._slots_meta[:] = (slots, self.slot_bytes)
+            self._latest[0] = -1
+        else:
+            self.shm = SharedMemory(name=name)
+            self.slots, self.slot_bytes = (int(value) for value in np.ndarray((2,), np.int64, self.shm.buf))
+            self._header(self.slots)
+
+        self._next_sequence = 1
+        self._next_slot = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def fits(self, frame_shape: tuple) -> bool:
+        return int(np.prod(frame_shape)) <= self.slot_bytes
+
+    def acquire(self, frame_shape: tuple) -> tuple[int, np.ndarray]:
+        """
+        Producer side: marks the next slot as being written and returns it with a writable view of
+        `frame_shape`, e.g. as the `dst` of an OpenCV conversion. Publish it with `commit`.
+        """
+        if not self.fits(frame_shape):
+            raise ValueError(f"Frame of shape {frame_shape} does not fit into slots of {self.slot_bytes} bytes")
+
+        slot = self._next_slot
+        self._sequences[slot] = 0
+        return slot, self._view(slot, frame_shape)
+
+    def commit(self, slot: int, frame_shape: tuple, timestamp: float | None = None) -> int:
+        """Publishes the slot filled after `acquire` and returns its sequence number."""
+        sequence = self._next_sequence
+        self._shapes[slot] = tuple(frame_shape) + (1,) * (3 - len(frame_shape))
+        self._timestamps[slot] = time.perf_counter() if timestamp is None else timestamp
+        self._sequences[slot] = sequence
+        self._latest[0] = slot
+
+        self._next_sequence += 1
+        self._next_slot = (slot + 1) % self.slots
+        return sequence
+
+    def write(self, frame: np.ndarray, timestamp: float | None = None) -> tuple[int, int]:
+        """Copies `frame` into the next slot and returns (slot, sequence)."""
+        slot, view = self.acquire(frame.shape)
+        np.copyto(view, frame)
+        return slot, self.commit(slot, frame.shape, timestamp)
+
+    def read(self, slot: int) -> tuple[np.ndarray, int, float]:
+        """Returns a read-only view of the frame in `slot`, its sequence number and its timestamp."""
+        sequence = int(self._sequences[slot])
+        height, width, channels = (int(value) for value in self._shapes[slot])
+        view = self._view(slot, (height, width, channels) if channels > 1 else (height, width))
+        view.flags.writeable = False
+        return view, sequence, float(self._timestamps[slot])
+
+    def latest(self) -> int:
+        """The slot of the newest frame, -1 before the first one."""
+        return int(self._latest[0])
+
+    def is_current(self, slot: int, sequence: int) -> bool:
+        """True while the frame `sequence` read from `slot` has not been overwritten."""
+        return sequence != 0 and int(self._sequences[slot]) == sequence
+
+    def close(self):
+        # The header views keep the buffer exported, they are dropped before the block is closed.
+        del self._slots_meta, self._latest, self._sequences, self._timestamps, self._shapes
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    @staticmethod
+    def _layout(slots: int, slot_bytes: int) -> int:
+        return FrameRingBuffer._data_offset(slots) + slots * _aligned(slot_bytes)
+
+    @staticmethod
+    def _data_offset(slots: int) -> int:
+        return _aligned(16 + 8 + slots * (8 + 8 + 3 * 4))
+
+    def _header(self, slots: int):
+        # Slot count and size, the latest slot, then per slot its sequence number, timestamp and frame shape.
+        buf = self.shm.buf
+        self._slots_meta = np.ndarray((2,), np.int64, buf, offset=0)
+        self._latest = np.ndarray((1,), np.int64, buf, offset=16)
+        self._sequences = np.ndarray((slots,), np.uint64, buf, offset=24)
+        self._timestamps = np.ndarray((slots,), np.float64, buf, offset=24 + slots * 8)
+        self._shapes = np.ndarray((slots, 3), np.uint32, buf, offset=24 + slots * 16)
+
+    def _view(self, slot: int, frame_shape: tuple) -> np.ndarray:
+        offset = self._data_offset(self.slots) + slot * _aligned(self.slot_bytes)
+        return np.ndarray(frame_shape, np.uint8, self.shm.buf, offset=offset)
@@ -2,26 +2,86 @@ import ctypes
 import json
 import os
 import sys
+import threading
+from functools import partial
 from pathlib import Path
-from typing import Optional, Any, Union, Tuple, cast
+from typing import Optional, Any, Union, Tuple, List, Callable, cast
 
 import cv2
 import imgaug as ia
 import imgaug.augmenters as iaa
 import numpy as np
-import onnxruntime as ort
 import tensorflow as tf
 from PIL import Image
 from PIL.Image import Image as PILImage
-from PySide6.QtGui import QImage
+from PySide6.QtGui import QImage, QPixmap
 from PySide6.QtWidgets import QTabWidget
 
 from core.utilities.bg import get_concat_v_multi, apply_background_color, naive_cutout, putalpha_cutout, \
-    alpha_matting_cutout, post_process
+    alpha_matting_cutout, alpha_matting_cutout_roi, post_process, naive_cutout_array, putalpha_cutout_array
+from core.utilities.mask_cache import MaskCache
+from core.utilities.roi_tracker import RoiMaskTracker
+from core.utilities.temporal_mask import TemporalMaskReuse
+from core.utilities.u2net.session.config import SessionConfig
+from core.utilities.u2net.session.registry import selected_model
 from core.utilities.u2net.session.u2net import U2netSession
 
+_u2net_session: U2netSession | None = None
+_u2net_session_lock = threading.Lock()
+
+mask_cache = MaskCache()
+
+
+def get_u2net_session() -> U2netSession:
+    """
+    Returns the process-wide u2net session, creating it on first use.
+
+    Loading the ONNX model is expensive, so it is deferred until background removal is actually requested
+    instead of being paid by every importer of this module. The model is picked with the U2NET_MODEL environment
+    variable, see registry.MODELS.
+    """
+    global _u2net_session
+    if _u2net_session is None:
+        with _u2net_session_lock:
+            if _u2net_session is None:
+                _u2net_session = U2netSession(selected_model(), SessionConfig.from_env(), None, (), ())
+    return _u2net_session
+
+
+def predict_mask_arrays(data: np.ndarray, use_cache: bool = True, temporal: Optional[TemporalMaskReuse] = None,
+                        roi_tracker: Optional[RoiMaskTracker] = None, *args, **kwargs) -> List[np.ndarray]:
+    """
+    Returns the u2net masks for an image, from `mask_cache` when the same pixels were already processed.
+
+    With `temporal` or `roi_tracker`, the image is treated as the next frame of a live stream: `temporal` reuses
+    the previous masks while the stream does not change significantly, `roi_tracker` segments only the area
+    around the coin found in the previous frames.
+    """
+    def predict(frame: np.ndarray) -> List[np.ndarray]:
+        if roi_tracker is not None:
+            return roi_tracker.masks(frame, lambda roi: get_u2net_session().predict_array(roi, *args, **kwargs))
+        return get_u2net_session().predict_array(frame, *args, **kwargs)
+
+    if temporal is not None:
+        return temporal.masks(data, predict)
+    if roi_tracker is not None:
+        return predict(data)
+
+    if not use_cache:
+        return get_u2net_session().predict_array(data, *args, **kwargs)
+
+    key = mask_cache.key(data, selected_model())
+    masks = mask_cache.get(key)
+    if masks is None:
+        masks = get_u2net_session().predict_array(data, *args, **kwargs)
+        mask_cache.put(key, masks)
+    return masks
+
+
+def warmup():
+    """Creates the u2net session and runs one dummy inference, so the first real request does not pay for it."""
+    get_u2net_session().predict_array(np.zeros((320, 320, 3), dtype=np.uint8))
 
-u2net = U2netSession("u2net", ort.SessionOptions(), None, (), ())
 
 def apply_rgb_mask(image_tensor, mask_tensor):
     """
@@ -66,7 +126,7 @@ def parse_directory_into_dictionary(dir_path: Path):
 
         pop_keys = []
         for directory in out_dict:
-            if "augmented" in directory:
+            if "augmented" in directory or directory.startswith("."):
                 pop_keys.append(directory)
         [out_dict.pop(key) for key in pop_keys]
 
@@ -84,6 +144,12 @@ def parse_directory_into_dictionary(dir_path: Path):
         return None
 
 
+def read_image(path: Path | str, flags: int = cv2.IMREAD_COLOR) -> np.ndarray | None:
+    """Decodes the picture at `path`, None if it cannot be decoded."""
+    # imdecode instead of imread, which cannot open non-ASCII paths on Windows.
+    return cv2.imdecode(np.fromfile(path, dtype=np.uint8), flags)
+
+
 def remove(
     data: Union[bytes, PILImage, np.ndarray],
     alpha_matting: bool = False,
@@ -111,19 +177,147 @@ def remove(
         post_process_mask (bool, optional): Flag indicating whether to post-process the masks. Defaults to False.
         bgcolor (Optional[Tuple[int, int, int, int]], optional): Background color for the cutout image. Defaults to None.
         *args (Optional[Any]): Additional positional arguments.
-        **kwargs (Optional[Any]): Additional keyword arguments.
+        **kwargs (Optional[Any]): Additional keyword arguments. `putalpha` keeps the original colors under the mask,
+            `use_cache=False` bypasses `mask_cache` (for live frames that never repeat) and `out` is an optional
+            (height, width, 4) uint8 buffer the cutout is written into. `temporal` is a TemporalMaskReuse that
+            lets consecutive live frames share masks while the scene is static and `roi_tracker` a RoiMaskTracker that
+            segments live frames on a crop around the coin. `alpha_matting_roi=True` solves the matting
+            only around the mask edge, optionally at `alpha_matting_scale` and within `alpha_matting_time_budget`
+            seconds (see `alpha_matting_cutout_roi`).
 
     Returns:
         Union[bytes, PILImage, np.ndarray]: The cutout image with the background removed.
     """
-    img = cast(PILImage, Image.fromarray(data))
-
     putalpha = kwargs.pop("putalpha", False)
+    use_cache = kwargs.pop("use_cache", True)
+    out = kwargs.pop("out", None)
+    temporal = kwargs.pop("temporal", None)
+    roi_tracker = kwargs.pop("roi_tracker", None)
+    matting = _matting_from_kwargs(kwargs)
 
     # Fix image orientation
     # img = fix_image_orientation(img)
 
-    masks = u2net.predict(img, *args, **kwargs)
+    masks = predict_mask_arrays(data, use_cache, temporal, roi_tracker, *args, **kwargs)
+
+    return _cutout(data, masks, alpha_matting, alpha_matting_foreground_threshold,
+                   alpha_matting_background_threshold, alpha_matting_erode_size,
+                   only_mask, post_process_mask, bgcolor, putalpha, out, matting)
+
+
+def remove_batch(
+    data: List[np.ndarray],
+    batch_size: int = 8,
+    alpha_matting: bool = False,
+    alpha_matting_foreground_threshold: int = 240,
+    alpha_matting_background_threshold: int = 10,
+    alpha_matting_erode_size: int = 10,
+    only_mask: bool = False,
+    post_process_mask: bool = False,
+    bgcolor: Optional[Tuple[int, int, int, int]] = None,
+    *args: Optional[Any],
+    **kwargs: Optional[Any]
+) -> List[np.ndarray]:
+    """
+    Remove the background from several input images at once.
+
+    Works like `remove`, but runs u2net on stacked batches of up to `batch_size` images, which amortizes the
+    per-call ONNX Runtime overhead when bulk-processing a catalog. Results are returned in input order.
+
+    Parameters:
+        data (List[np.ndarray]): The input images.
+        batch_size (int, optional): Maximum number of images per inference call. Defaults to 8.
+        The remaining parameters are the same as for `remove`.
+
+    Returns:
+        List[np.ndarray]: The cutout images with the background removed.
+    """
+    putalpha = kwargs.pop("putalpha", False)
+    matting = _matting_from_kwargs(kwargs)
+
+    keys = [mask_cache.key(image, selected_model()) for image in data]
+    masks_per_image = [mask_cache.get(key) for key in keys]
+
+    missing = [idx for idx, masks in enumerate(masks_per_image) if masks is None]
+    if missing:
+        predicted = get_u2net_session().predict_batch_array([data[idx] for idx in missing], batch_size,
+                                                            *args, **kwargs)
+        for idx, masks in zip(missing, predicted):
+            mask_cache.put(keys[idx], masks)
+            masks_per_image[idx] = masks
+
+    return [
+        _cutout(image, masks, alpha_matting, alpha_matting_foreground_threshold,
+                alpha_matting_background_threshold, alpha_matting_erode_size,
+                only_mask, post_process_mask, bgcolor, putalpha, matting=matting)
+        for image, masks in zip(data, masks_per_image)
+    ]
+
+
+def _cutout(
+    data: np.ndarray,
+    masks: List[np.ndarray],
+    alpha_matting: bool,
+    alpha_matting_foreground_threshold: int,
+    alpha_matting_background_threshold: int,
+    alpha_matting_erode_size: int,
+    only_mask: bool,
+    post_process_mask: bool,
+    bgcolor: Optional[Tuple[int, int, int, int]],
+    putalpha: bool,
+    out: Optional[np.ndarray] = None,
+    matting: Callable[..., PILImage] = alpha_matting_cutout
+) -> np.ndarray:
+    # Plain cutouts stay in NumPy and write into `out`, several masks are stacked vertically in it; alpha
+    # matting and background colors go through the PIL pipeline.
+    if masks and data.ndim == 3 and not alpha_matting and bgcolor is None:
+        if post_process_mask:
+            masks = [post_process(mask) for mask in masks]
+        if only_mask:
+            return get_concat_v_multi(masks)
+
+        cutout_array = putalpha_cutout_array if putalpha else naive_cutout_array
+        if len(masks) == 1:
+            return cutout_array(data, masks[0], out)
+
+        height, width = data.shape[:2]
+        shape = (height * len(masks), width, 4)
+        if out is None or out.shape != shape or out.dtype != np.uint8 or not out.flags.c_contiguous:
+            out = np.empty(shape, dtype=np.uint8)
+        for idx, mask in enumerate(masks):
+            cutout_array(data, mask, out[idx * height:(idx + 1) * height])
+        return out
+
+    return _cutout_from_masks(cast(PILImage, Image.fromarray(data)),
+                              [Image.fromarray(mask, mode="L") for mask in masks],
+                              alpha_matting, alpha_matting_foreground_threshold,
+                              alpha_matting_background_threshold, alpha_matting_erode_size,
+                              only_mask, post_process_mask, bgcolor, putalpha, matting)
+
+
+def _matting_from_kwargs(kwargs: dict) -> Callable[..., PILImage]:
+    """Pops the ROI matting options from `remove` kwargs and returns the matting function to use."""
+    roi = kwargs.pop("alpha_matting_roi", False)
+    scale = kwargs.pop("alpha_matting_scale", 1.0)
+    time_budget = kwargs.pop("alpha_matting_time_budget", None)
+    if not roi:
+        return alpha_matting_cutout
+    return partial(alpha_matting_cutout_roi, scale=scale, time_budget=time_budget)
+
+
+def _cutout_from_masks(
+    img: PILImage,
+    masks: List[PILImage],
+    alpha_matting: bool,
+    alpha_matting_foreground_threshold: int,
+    alpha_matting_background_threshold: int,
+    alpha_matting_erode_size: int,
+    only_mask: bool,
+    post_process_mask: bool,
+    bgcolor: Optional[Tuple[int, int, int, int]],
+    putalpha: bool,
+    matting: Callable[..., PILImage] = alpha_matting_cutout
+) -> np.ndarray:
     cutouts = []
 
     for mask in masks:
@@ -135,7 +329,7 @@ def remove(
 
         elif alpha_matting:
             try:
-                cutout = alpha_matting_cutout(
+                cutout = matting(
                     img,
                     mask,
                     alpha_matting_foreground_threshold,
@@ -165,8 +359,10 @@ def remove(
 
     return np.asarray(cutout)
 
-def remove_background_rembg(img):
-    img = remove(img)
+def remove_background_rembg(img, use_cache: bool = True, out: Optional[np.ndarray] = None,
+                            temporal: Optional[TemporalMaskReuse] = None,
+                            roi_tracker: Optional[RoiMaskTracker] = None):
+    img = remove(img, use_cache=use_cache, out=out, temporal=temporal, roi_tracker=roi_tracker)
     # return cv2.cvtColor(img, cv2.COLOR_BGRA2RGBA)
     return img
 
@@ -216,10 +412,59 @@ def qimage_to_cv2(qimage):
         arr = np.frombuffer(ptr, dtype=np.uint8).reshape((height, width, channels))
         return cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)  # Convert RGB to OpenCV's BGR format
 
+    # Camera frames (see bgr_to_qimage) are already in OpenCV's order, a read-only view is returned
+    elif format == QImage.Format_BGR888:
+        return qimage_view(qimage, writable=False)
+
     else:
         raise ValueError(f"Unsupported QImage format: {format}")
 
 
+def qimage_view(qimage: QImage, writable: bool = True) -> np.ndarray:
+    """
+    Returns a (height, width, 3) view of the pixels of a 24-bit QImage (RGB888 or BGR888), without copying.
+
+    Scanlines of a QImage are padded to 4 bytes, so the view is not contiguous when width * 3 is not a
+    multiple of 4. The view is only valid while `qimage` exists and is not modified through Qt.
+    """
+    # constBits() does not detach the image, bits() does if its data is shared with another QImage.
+    buffer = qimage.bits() if writable else qimage.constBits()
+    return np.ndarray((qimage.height(), qimage.width(), 3), dtype=np.uint8, buffer=buffer,
+                      strides=(qimage.bytesPerLine(), 3, 1))
+
+
+def bgr_to_qimage(frame: np.ndarray) -> QImage:
+    """
+    Copies an OpenCV BGR frame into a new QImage in Format_BGR888.
+
+    Qt reads BGR888 as it is, so this is a plain copy without a colour conversion, and the QImage owns its
+    memory: it stays valid after `frame` is gone or reused, unlike an image wrapping the array.
+    """
+    height, width = frame.shape[:2]
+    qimage = QImage(width, height, QImage.Format_BGR888)
+    np.copyto(qimage_view(qimage), frame)
+    return qimage
+
+
+def qimage_to_pixmap(qimage: QImage) -> QPixmap:
+    """
+    Converts a QImage for display.
+
+    BGR888 images are converted by OpenCV into Format_RGB32, the native format of the raster paint engine, which
+    QPixmap then shares without another copy; Qt's own BGR888 conversion takes about three times as long.
+    """
+    if qimage.format() != QImage.Format_BGR888:
+        return QPixmap.fromImage(qimage)
+
+    height, width = qimage.height(), qimage.width()
+    display = QImage(width, height, QImage.Format_RGB32)
+    # RGB32 pixels are 0xffRRGGBB words, B, G, R, 255 in memory on little-endian machines.
+    cv2.cvtColor(qimage_view(qimage, writable=False), cv2.COLOR_BGR2BGRA,
+                 dst=np.ndarray((height, width, 4), dtype=np.uint8, buffer=display.bits(),
+                                strides=(display.bytesPerLine(), 4, 1)))
+    return QPixmap.fromImage(display)
+
+
 def crop_vertices_mask_from_image(image: QImage, vertices) -> QImage:
     ndarray = qimage_to_cv2(image)
     points = np.array([[point.x(), point.y()] for point in vertices], dtype=np.int32)
@@ -293,7 +538,8 @@ def imgaug_transformation(image: np.ndarray,
                           rotation_range: tuple[float, float] = (-45, 45),
                           gaussian_noise_range: tuple[float, float] = (0, 0.1 * 255),
                           salt_and_pepper_noise_range: tuple[float, float] = (0.01, 0.05),
-                          poisson_noise_range: tuple[float, float] = (0, 8)):
+                          poisson_noise_range: tuple[float, float] = (0, 8),
+                          blur_range: tuple[float, float] | None = None):
     # Ensure the images are contiguous arrays (important for memory layout)
     # contiguous_image_list = [np.ascontiguousarray(full_image.copy()) for full_image in full_image_list]
     # contiguous_hue_list = [np.ascontiguousarray(hue_image.copy()) for hue_image in hue_image_list]
@@ -320,13 +566,16 @@ def imgaug_transformation(image: np.ndarray,
         random_order=False  # Ensure the same order of augmentations
     )
 
-    seq_noise = iaa.Sequential([
+    noise_augmenters = [
         iaa.OneOf([
             iaa.AdditiveGaussianNoise(scale=gaussian_noise_range),  # Gaussian noise with random intensity
             iaa.SaltAndPepper(p=salt_and_pepper_noise_range),  # Salt and pepper noise with random proportion
             iaa.AdditivePoissonNoise(lam=poisson_noise_range),  # Poisson noise with random lambda
         ])
-    ])
+    ]
+    if blur_range is not None:
+        noise_augmenters.insert(0, iaa.GaussianBlur(sigma=blur_range))  # Defocus blur with random sigma
+    seq_noise = iaa.Sequential(noise_augmenters)
 
     # Apply deterministic transformations with the same random state
     seq_common_det = seq_common.to_deterministic()
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+class MaskCache:
+    """
+    Content-addressed cache for segmentation masks.
+
+    Masks are keyed by a hash of the input pixel buffer plus the identity of the model that produced them, so the
+    same picture processed twice only runs inference once. The in-memory tier is an LRU bounded by `max_bytes`;
+    the optional disk tier keeps every mask as a single-channel PNG (`<key>_<index>.png`) in `disk_dir`.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, disk_dir: Path | str | None = None):
+        self.max_bytes = max_bytes
+        self.disk_dir: Path | None = None
+        self._entries: OrderedDict[str, list[np.ndarray]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.set_disk_dir(disk_dir)
+
+    @staticmethod
+    def key(image: np.ndarray, model_id: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{model_id}|{image.shape}|{image.dtype}".encode())
+        digest.update(np.ascontiguousarray(image).data)
+        return digest.hexdigest()
+
+    def set_disk_dir(self, disk_dir: Path | str | None):
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        if self.disk_dir is not None:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def get(self, key: str) -> list[np.ndarray] | None:
+        with self._lock:
+            masks = self._entries.get(key)
+            if masks is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return masks
+
+        masks = self._load_from_disk(key)
+        with self._lock:
+            if masks is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._insert(key, masks)
+        return masks
+
+    def put(self, key: str, masks: list[np.ndarray]):
+        masks = [np.ascontiguousarray(mask, dtype=np.uint8) for mask in masks]
+        with self._lock:
+            self._insert(key, masks)
+        self._save_to_disk(key, masks)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def _insert(self, key: str, masks: list[np.ndarray]):
+        if key in self._entries:
+            self._size -= sum(mask.nbytes for mask in self._entries.pop(key))
+
+        self._entries[key] = masks
+        self._size += sum(mask.nbytes for mask in masks)
+
+        # Never evict the entry just inserted, even if it alone exceeds the budget.
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= sum(mask.nbytes for mask in evicted)
+            self.evictions += 1
+
+    def _load_from_disk(self, key: str) -> list[np.ndarray] | None:
+        if self.disk_dir is None:
+            return None
+
+        masks = []
+        while True:
+            mask_path = self.disk_dir / f"{key}_{len(masks)}.png"
+            if not mask_path.is_file():
+                break
+            mask = cv2.imread(str(mask_path), cv2.IMREAD_GRAYSCALE)
+            if mask is None:
+                return None
+            masks.append(mask)
+        return masks or None
+
+    def _save_to_disk(self, key: str, masks: list[np.ndarray]):
+        if self.disk_dir is None:
+            return
+
+        # Mask 0 is renamed into place last, so a reader never sees a partially written entry.
+        for index in reversed(range(len(masks))):
+            tmp_path = self.disk_dir / f"{key}_{index}.tmp.png"
+            if cv2.imwrite(str(tmp_path), masks[index]):
+                os.replace(tmp_path, self.disk_dir / f"{key}_{index}.png")
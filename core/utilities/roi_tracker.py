@@ -0,0 +1,120 @@
+from typing import Callable, List, Tuple
+
+import cv2
+import numpy as np
+
+
+class RoiMaskTracker:
+    """
+    Runs segmentation on a padded crop around the coin instead of the whole frame.
+
+    The model squashes its input to 320x320, so a coin covering a small part of a large frame ends up with a
+    blurry edge. Once a full-frame pass has located the coin, the following frames are segmented on the
+    bounding box of the previous mask grown by `padding` (relative to the box size, at least `min_padding`
+    pixels), and the crop mask is pasted back into a full-frame mask.
+
+    Tracking is considered lost, and the frame is segmented in full again, when the crop mask is empty, when
+    the foreground touches the crop border (the coin moved out of it), when the box grows beyond
+    `max_roi_fraction` of the frame, or every `redetect_interval` frames to pick up new objects.
+    """
+
+    def __init__(self,
+                 padding: float = 0.35,
+                 min_padding: int = 32,
+                 max_roi_fraction: float = 0.5,
+                 redetect_interval: int = 60,
+                 threshold: int = 127):
+        self.padding = padding
+        self.min_padding = min_padding
+        self.max_roi_fraction = max_roi_fraction
+        self.redetect_interval = redetect_interval
+        self.threshold = threshold
+
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.lost = 0
+
+        self._box: Tuple[int, int, int, int] | None = None
+        self._frame_shape: Tuple[int, int] | None = None
+        self._frames_since_full = 0
+
+    def masks(self, frame: np.ndarray, predict: Callable[[np.ndarray], List[np.ndarray]]) -> List[np.ndarray]:
+        """Returns full-frame masks for `frame`, calling `predict` on the tracked crop whenever possible."""
+        if frame.shape[:2] != self._frame_shape:
+            self.reset()
+            self._frame_shape = frame.shape[:2]
+
+        roi = self._roi() if self._frames_since_full < self.redetect_interval else None
+        if roi is not None:
+            masks = self._predict_roi(frame, roi, predict)
+            if masks is not None:
+                self.roi_frames += 1
+                self._frames_since_full += 1
+                return masks
+            self.lost += 1
+
+        masks = predict(frame)
+        self.full_frames += 1
+        self._frames_since_full = 0
+        self._box = self._bounding_box(masks[0])
+        return masks
+
+    def reset(self):
+        self._box = None
+        self._frame_shape = None
+        self._frames_since_full = 0
+
+    def stats(self) -> dict:
+        return {
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "lost": self.lost,
+            "box": self._box,
+        }
+
+    def _roi(self) -> Tuple[int, int, int, int] | None:
+        if self._box is None:
+            return None
+
+        height, width = self._frame_shape
+        x, y, box_width, box_height = self._box
+        pad_x = max(int(box_width * self.padding), self.min_padding)
+        pad_y = max(int(box_height * self.padding), self.min_padding)
+        left, top = max(x - pad_x, 0), max(y - pad_y, 0)
+        right, bottom = min(x + box_width + pad_x, width), min(y + box_height + pad_y, height)
+
+        if (right - left) * (bottom - top) > self.max_roi_fraction * width * height:
+            return None
+        return left, top, right, bottom
+
+    def _predict_roi(self, frame: np.ndarray, roi: Tuple[int, int, int, int],
+                     predict: Callable[[np.ndarray], List[np.ndarray]]) -> List[np.ndarray] | None:
+        height, width = frame.shape[:2]
+        left, top, right, bottom = roi
+
+        roi_masks = predict(frame[top:bottom, left:right])
+        box = self._bounding_box(roi_masks[0])
+        if box is None:
+            return None
+
+        # Foreground on a crop edge that is not also a frame edge means the coin left the crop.
+        roi_x, roi_y, roi_width, roi_height = box
+        if ((roi_x == 0 and left > 0) or (roi_y == 0 and top > 0)
+                or (roi_x + roi_width == right - left and right < width)
+                or (roi_y + roi_height == bottom - top and bottom < height)):
+            return None
+
+        self._box = (roi_x + left, roi_y + top, roi_width, roi_height)
+
+        masks = []
+        for roi_mask in roi_masks:
+            mask = np.zeros((height, width), dtype=np.uint8)
+            mask[top:bottom, left:right] = roi_mask
+            masks.append(mask)
+        return masks
+
+    def _bounding_box(self, mask: np.ndarray) -> Tuple[int, int, int, int] | None:
+        foreground = (mask > self.threshold).astype(np.uint8)
+        if not foreground.any():
+            return None
+        return cv2.boundingRect(foreground)
@@ -0,0 +1,110 @@
+import time
+from collections import deque
+from typing import Callable, List
+
+import cv2
+import numpy as np
+
+
+class TemporalMaskReuse:
+    """
+    Reuses the last segmentation masks while consecutive frames of a live stream barely change.
+
+    Every frame is reduced to a small grayscale thumbnail and compared with the thumbnail of the last frame
+    that went through inference. While the mean absolute difference stays below `threshold` (in 0..255 gray
+    levels) the previous masks are returned, optionally shifted by the global translation between the two
+    thumbnails (`warp`). Inference runs again on a significant change, when the frame size changes or after
+    `max_reuse_age` reused frames in a row.
+    """
+
+    def __init__(self,
+                 threshold: float = 4.0,
+                 max_reuse_age: int = 15,
+                 warp: bool = False,
+                 thumbnail_width: int = 64,
+                 stats_window_s: float = 5.0):
+        self.threshold = threshold
+        self.max_reuse_age = max_reuse_age
+        self.warp = warp
+        self.thumbnail_width = thumbnail_width
+        self.stats_window_s = stats_window_s
+
+        self.last_score = 0.0
+        self.frames = 0
+        self.inferences = 0
+
+        self._reference: np.ndarray | None = None
+        self._masks: List[np.ndarray] | None = None
+        self._reuse_age = 0
+        self._inference_times: deque[float] = deque()
+        self._frame_times: deque[float] = deque()
+
+    def masks(self, frame: np.ndarray, predict: Callable[[np.ndarray], List[np.ndarray]]) -> List[np.ndarray]:
+        """Returns the masks for `frame`, calling `predict(frame)` only when the previous ones cannot be reused."""
+        now = time.perf_counter()
+        self.frames += 1
+        self._record(self._frame_times, now)
+
+        thumbnail = self._thumbnail(frame)
+        reusable = (self._masks is not None
+                    and self._reference.shape == thumbnail.shape
+                    and self._masks[0].shape == frame.shape[:2]
+                    and self._reuse_age < self.max_reuse_age)
+
+        if reusable:
+            self.last_score = float(cv2.absdiff(thumbnail, self._reference).mean())
+            if self.last_score < self.threshold:
+                self._reuse_age += 1
+                return self._warped(thumbnail) if self.warp else self._masks
+
+        self._masks = predict(frame)
+        self._reference = thumbnail
+        self._reuse_age = 0
+        self.inferences += 1
+        self._record(self._inference_times, now)
+        return self._masks
+
+    def reset(self):
+        self._reference = None
+        self._masks = None
+        self._reuse_age = 0
+
+    def stats(self) -> dict:
+        """Reuse ratio since start, plus delivered and effective inference FPS over the last `stats_window_s`."""
+        return {
+            "frames": self.frames,
+            "inferences": self.inferences,
+            "reuse_ratio": 1 - self.inferences / self.frames if self.frames else 0.0,
+            "last_score": self.last_score,
+            "frame_fps": self._rate(self._frame_times),
+            "inference_fps": self._rate(self._inference_times),
+        }
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        height, width = frame.shape[:2]
+        size = (self.thumbnail_width, max(int(height * self.thumbnail_width / width), 1))
+        thumbnail = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        if thumbnail.ndim == 3:
+            thumbnail = cv2.cvtColor(thumbnail, cv2.COLOR_RGBA2GRAY if thumbnail.shape[2] == 4 else cv2.COLOR_RGB2GRAY)
+        return thumbnail
+
+    def _warped(self, thumbnail: np.ndarray) -> List[np.ndarray]:
+        (dx, dy), _ = cv2.phaseCorrelate(self._reference.astype(np.float32), thumbnail.astype(np.float32))
+        height, width = self._masks[0].shape
+        scale = width / thumbnail.shape[1]
+        shift = np.float32([[1, 0, dx * scale], [0, 1, dy * scale]])
+        return [cv2.warpAffine(mask, shift, (width, height), flags=cv2.INTER_LINEAR) for mask in self._masks]
+
+    def _record(self, timestamps: deque, now: float):
+        timestamps.append(now)
+        while timestamps and now - timestamps[0] > self.stats_window_s:
+            timestamps.popleft()
+
+    def _rate(self, timestamps: deque) -> float:
+        now = time.perf_counter()
+        while timestamps and now - timestamps[0] > self.stats_window_s:
+            timestamps.popleft()
+        if len(timestamps) < 2:
+            return 0.0
+        span = timestamps[-1] - timestamps[0]
+        return (len(timestamps) - 1) / span if span > 0 else 0.0
@@ -0,0 +1,107 @@
+"""
+INT8 quantization of the u2net model.
+
+Dynamic quantization stores the weights as INT8 and quantizes activations on the fly. Static quantization also
+fixes the activation ranges up front, from calibration images drawn from the coin catalog, and writes a QDQ model.
+
+The registry runs this on demand the first time a quantized model is selected; it can also be run by hand
+(from the repository root):
+    python -m core.utilities.u2net.quantize --method static --calibration-size 64
+"""
+import argparse
+import glob
+import os
+import random
+from typing import List
+
+import cv2
+import numpy as np
+from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic,
+                                      quantize_static)
+
+catalog_dir = "coin_catalog"
+calibration_size = 32
+
+
+def catalog_calibration_images(catalog_path: str = catalog_dir, count: int = calibration_size, seed: int = 0) -> List[np.ndarray]:
+    """Returns up to `count` RGB pictures sampled from the uncropped coin photos of the catalog."""
+    paths = sorted(glob.glob(os.path.join(catalog_path, "*", "*", "*", "uncropped", "*.png")))
+    random.Random(seed).shuffle(paths)
+
+    images = []
+    for path in paths[:count]:
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is not None:
+            images.append(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    return images
+
+
+class CatalogCalibrationReader(CalibrationDataReader):
+    """Feeds catalog pictures, preprocessed exactly like at inference time, to the static quantizer."""
+
+    def __init__(self, model_name: str, images: List[np.ndarray]):
+        # Imported here, the session package imports this module lazily through the registry.
+        from core.utilities.u2net.session.config import SessionConfig
+        from core.utilities.u2net.session.u2net import U2netSession
+
+        session = U2netSession(model_name, SessionConfig(cache_optimized_model=False))
+
+        # normalize() reuses its output buffer, so every tensor is copied.
+        self._inputs = iter([
+            {name: tensor.copy() for name, tensor in
+             session.normalize(image, (0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320)).items()}
+            for image in images
+        ])
+
+    def get_next(self):
+        return next(self._inputs, None)
+
+
+def quantize_model(model_name: str, output_path: str, method: str = "dynamic",
+                   catalog_path: str = catalog_dir, calibration_count: int = calibration_size):
+    """
+    Writes an INT8 version of the registered float model `model_name` to `output_path`.
+
+    Parameters:
+        model_name (str): The registry name of the float model.
+        output_path (str): Where the quantized model is written.
+        method (str): "dynamic" or "static".
+        catalog_path (str): The coin catalog the static calibration images are drawn from.
+        calibration_count (int): The number of calibration images.
+    """
+    from core.utilities.u2net.session.registry import model_path
+
+    source_path = model_path(model_name)
+    print(f"Quantizing {source_path} ({method}) to {output_path}")
+    tmp_path = f"{output_path}.tmp"
+
+    if method == "dynamic":
+        quantize_dynamic(source_path, tmp_path, weight_type=QuantType.QUInt8)
+    elif method == "static":
+        images = catalog_calibration_images(catalog_path, calibration_count)
+        if not images:
+            raise FileNotFoundError(f"No calibration images found in {catalog_path}, static quantization needs "
+                                    f"uncropped pictures in the coin catalog")
+        quantize_static(source_path, tmp_path, CatalogCalibrationReader(model_name, images),
+                        quant_format=QuantFormat.QDQ,
+                        activation_type=QuantType.QUInt8,
+                        weight_type=QuantType.QInt8,
+                        per_channel=True)
+    else:
+        raise ValueError(f"Unknown quantization method '{method}', expected 'dynamic' or 'static'")
+
+    os.replace(tmp_path, output_path)
+
+
+if __name__ == "__main__":
+    from core.utilities.u2net.session.registry import MODELS, model_dir
+
+    parser = argparse.ArgumentParser(description="Quantize the u2net model to INT8.")
+    parser.add_argument("--method", choices=["dynamic", "static"], default="dynamic")
+    parser.add_argument("--catalog", default=catalog_dir)
+    parser.add_argument("--calibration-size", type=int, default=calibration_size)
+    args = parser.parse_args()
+
+    spec = MODELS[f"u2net_int8_{args.method}"]
+    quantize_model(spec.base, os.path.join(model_dir(), spec.filename), args.method,
+                   args.catalog, args.calibration_size)
@@ -1,11 +1,13 @@
 import os
 from typing import Dict, List, Tuple
 
+import cv2
 import numpy as np
 import onnxruntime as ort
-from PIL import Image
 from PIL.Image import Image as PILImage
 
+from .config import SessionConfig
+
 
 class BaseSession:
     """This is a base class for managing a session with a machine learning model."""
@@ -13,13 +15,24 @@ class BaseSession:
     def __init__(
         self,
         model_name: str,
-        sess_opts: ort.SessionOptions,
+        sess_opts: ort.SessionOptions | SessionConfig | None,
         providers=None,
         *args,
         **kwargs
     ):
-        """Initialize an instance of the BaseSession class."""
+        """
+        Initialize an instance of the BaseSession class.
+
+        `sess_opts` may be ready-made ONNX Runtime options, or a SessionConfig (read from the environment when None).
+        With a SessionConfig the optimized graph is serialized next to the model on the first start and loaded
+        directly on later starts, skipping the graph optimization, and single images run through IO binding
+        unless the config disables it (see `run`).
+        """
         self.model_name = model_name
+        self._normalize_buffer: np.ndarray | None = None
+        self._binding: ort.IOBinding | None = None
+        self._bound_input: np.ndarray | None = None
+        self._output_buffer: np.ndarray | None = None
 
         self.providers = []
 
@@ -31,38 +44,104 @@ class BaseSession:
         else:
             self.providers.extend(_providers)
 
+        self.model_path = str(self.__class__.download_models(*args, model_name=model_name, **kwargs))
+
+        load_path = self.model_path
+        self.io_binding = False
+        if not isinstance(sess_opts, ort.SessionOptions):
+            config = sess_opts or SessionConfig.from_env()
+            self.io_binding = config.io_binding
+            sess_opts, load_path = self._session_options_from_config(config)
+
         self.inner_session = ort.InferenceSession(
-            str(self.__class__.download_models(*args, **kwargs)),
+            load_path,
             providers=self.providers,
             sess_options=sess_opts,
         )
+        self.input_name = self.inner_session.get_inputs()[0].name
+        self.output_names = [output.name for output in self.inner_session.get_outputs()]
+
+    def _session_options_from_config(self, config: SessionConfig) -> Tuple[ort.SessionOptions, str]:
+        sess_opts = config.session_options()
+        if not config.cache_optimized_model or config.graph_optimization == "disable":
+            return sess_opts, self.model_path
+
+        optimized_path = config.optimized_model_path(self.model_path)
+        if os.path.isfile(optimized_path) and os.path.getmtime(optimized_path) >= os.path.getmtime(self.model_path):
+            # The cached graph is already optimized, running the optimizers again would only cost startup time.
+            sess_opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+            return sess_opts, optimized_path
+
+        if os.access(os.path.dirname(optimized_path) or ".", os.W_OK):
+            sess_opts.optimized_model_filepath = optimized_path
+        return sess_opts, self.model_path
 
     def normalize(
         self,
-        img: PILImage,
+        img: PILImage | np.ndarray,
         mean: Tuple[float, float, float],
         std: Tuple[float, float, float],
         size: Tuple[int, int],
         *args,
+        interpolation: int = cv2.INTER_AREA,
         **kwargs
     ) -> Dict[str, np.ndarray]:
-        im = img.convert("RGB").resize(size, Image.Resampling.LANCZOS)
-
-        im_ary = np.array(im)
-        im_ary = im_ary / np.max(im_ary)
-
-        tmpImg = np.zeros((im_ary.shape[0], im_ary.shape[1], 3))
-        tmpImg[:, :, 0] = (im_ary[:, :, 0] - mean[0]) / std[0]
-        tmpImg[:, :, 1] = (im_ary[:, :, 1] - mean[1]) / std[1]
-        tmpImg[:, :, 2] = (im_ary[:, :, 2] - mean[2]) / std[2]
-
-        tmpImg = tmpImg.transpose((2, 0, 1))
-
-        return {
-            self.inner_session.get_inputs()[0]
-            .name: np.expand_dims(tmpImg, 0)
-            .astype(np.float32)
-        }
+        """
+        Resizes the image and normalizes it into the model's NCHW float32 input tensor.
+
+        `interpolation` is an OpenCV flag; the default INTER_AREA is the anti-aliased downscale closest
+        to the PIL LANCZOS resize used previously. The returned tensor is a buffer owned by the session
+        and is overwritten by the next call, copy it if it has to outlive that.
+        """
+        if isinstance(img, np.ndarray):
+            im_ary = img[:, :, :3] if img.ndim == 3 else cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
+        else:
+            im_ary = np.asarray(img if img.mode == "RGB" else img.convert("RGB"))
+        im_ary = cv2.resize(im_ary, size, interpolation=interpolation)
+
+        peak = float(im_ary.max()) or 1.0
+        scale = (1.0 / (peak * np.asarray(std, dtype=np.float32))).reshape(3, 1, 1)
+        offset = (np.asarray(mean, dtype=np.float32) / np.asarray(std, dtype=np.float32)).reshape(3, 1, 1)
+
+        tmpImg = self._input_buffer(size)
+        np.multiply(im_ary.transpose((2, 0, 1)), scale, out=tmpImg[0], casting="unsafe")
+        np.subtract(tmpImg[0], offset, out=tmpImg[0])
+
+        return {self.input_name: tmpImg}
+
+    def run(self, input_feed: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Runs the model and returns its first output, the only one the masks are built from.
+
+        When the input is the session's own normalize buffer and IO binding is enabled, the buffer is bound
+        once and the output is written into a preallocated array, so repeated single-image inference does
+        not allocate any tensors. That output array is overwritten by the next call, copy it if it has to
+        outlive that.
+        """
+        tensor = input_feed[self.input_name]
+        if not self.io_binding or tensor is not self._normalize_buffer:
+            return self.inner_session.run(self.output_names[:1], input_feed)[0]
+
+        if self._binding is None or self._bound_input is not tensor:
+            self._bind(tensor)
+        self.inner_session.run_with_iobinding(self._binding)
+        return self._output_buffer
+
+    def _bind(self, tensor: np.ndarray):
+        # One regular run gives the concrete output shape, which may be symbolic in the model.
+        self._output_buffer = np.empty_like(self.inner_session.run(self.output_names[:1], {self.input_name: tensor})[0])
+
+        self._binding = self.inner_session.io_binding()
+        self._binding.bind_input(self.input_name, "cpu", 0, np.float32, list(tensor.shape), tensor.ctypes.data)
+        self._binding.bind_output(self.output_names[0], "cpu", 0, np.float32, list(self._output_buffer.shape),
+                                  self._output_buffer.ctypes.data)
+        self._bound_input = tensor
+
+    def _input_buffer(self, size: Tuple[int, int]) -> np.ndarray:
+        width, height = size
+        if self._normalize_buffer is None or self._normalize_buffer.shape[2:] != (height, width):
+            self._normalize_buffer = np.empty((1, 3, height, width), dtype=np.float32)
+        return self._normalize_buffer
 
     def predict(self, img: PILImage, *args, **kwargs) -> List[PILImage]:
         raise NotImplementedError
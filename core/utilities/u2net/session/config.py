@@ -0,0 +1,78 @@
+import os
+
+import onnxruntime as ort
+
+EXECUTION_MODES = {
+    "sequential": ort.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": ort.ExecutionMode.ORT_PARALLEL,
+}
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+class SessionConfig:
+    """
+    ONNX Runtime settings for a model session.
+
+    Use `from_env()` to read them from the environment:
+        U2NET_INTRA_OP_THREADS                threads used inside one operator (0 lets ONNX Runtime decide)
+        U2NET_INTER_OP_THREADS                threads used across operators in parallel mode (0 lets ONNX Runtime decide)
+        U2NET_EXECUTION_MODE                  "sequential" or "parallel"
+        U2NET_GRAPH_OPTIMIZATION              "disable", "basic", "extended" or "all"
+        U2NET_OPTIMIZED_MODEL_CACHE_DISABLED  if set, the optimized graph is neither saved nor reused
+        U2NET_IO_BINDING_DISABLED             if set, single images run without the preallocated IO binding
+    """
+
+    def __init__(self,
+                 intra_op_threads: int = 0,
+                 inter_op_threads: int = 0,
+                 execution_mode: str = "sequential",
+                 graph_optimization: str = "all",
+                 cache_optimized_model: bool = True,
+                 io_binding: bool = True):
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode '{execution_mode}', expected one of {list(EXECUTION_MODES)}")
+        if graph_optimization not in GRAPH_OPTIMIZATION_LEVELS:
+            raise ValueError(f"Unknown graph optimization level '{graph_optimization}', "
+                             f"expected one of {list(GRAPH_OPTIMIZATION_LEVELS)}")
+
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.execution_mode = execution_mode
+        self.graph_optimization = graph_optimization
+        self.cache_optimized_model = cache_optimized_model
+        self.io_binding = io_binding
+
+    @classmethod
+    def from_env(cls) -> "SessionConfig":
+        return cls(
+            intra_op_threads=int(os.getenv("U2NET_INTRA_OP_THREADS", 0)),
+            inter_op_threads=int(os.getenv("U2NET_INTER_OP_THREADS", 0)),
+            execution_mode=os.getenv("U2NET_EXECUTION_MODE", "sequential").lower(),
+            graph_optimization=os.getenv("U2NET_GRAPH_OPTIMIZATION", "all").lower(),
+            cache_optimized_model=os.getenv("U2NET_OPTIMIZED_MODEL_CACHE_DISABLED", None) is None,
+            io_binding=os.getenv("U2NET_IO_BINDING_DISABLED", None) is None,
+        )
+
+    def session_options(self) -> ort.SessionOptions:
+        sess_opts = ort.SessionOptions()
+        sess_opts.intra_op_num_threads = self.intra_op_threads
+        sess_opts.inter_op_num_threads = self.inter_op_threads
+        sess_opts.execution_mode = EXECUTION_MODES[self.execution_mode]
+        sess_opts.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[self.graph_optimization]
+        return sess_opts
+
+    def optimized_model_path(self, model_path: str) -> str:
+        """Returns where the graph optimized at this config's level is cached, next to the source model."""
+        stem, _ = os.path.splitext(model_path)
+        return f"{stem}.{self.graph_optimization}.opt.onnx"
+
+    def __repr__(self):
+        return (f"SessionConfig(intra_op_threads={self.intra_op_threads}, inter_op_threads={self.inter_op_threads}, "
+                f"execution_mode='{self.execution_mode}', graph_optimization='{self.graph_optimization}', "
+                f"cache_optimized_model={self.cache_optimized_model}, io_binding={self.io_binding})")
@@ -0,0 +1,59 @@
+import os
+import sys
+
+U2NET_MODEL_ENV = "U2NET_MODEL"
+
+
+class ModelSpec:
+    """
+    Describes one segmentation model of the u2net family.
+
+    Downloadable models have a `url` and must be placed in the model directory by hand (see the
+    "download <file>" notes there). Quantized models are derived from `base` on first use.
+    """
+
+    def __init__(self, filename: str, url: str | None = None, base: str | None = None, quantization: str | None = None):
+        self.filename = filename
+        self.url = url
+        self.base = base
+        self.quantization = quantization
+
+
+MODELS = {
+    "u2net": ModelSpec("u2net.onnx", url="https://huggingface.co/tomjackson2023/rembg/blob/main/u2net.onnx"),
+    "u2netp": ModelSpec("u2netp.onnx", url="https://github.com/danielgatis/rembg/releases/download/v0.0.0/u2netp.onnx"),
+    "u2net_int8_dynamic": ModelSpec("u2net_int8_dynamic.onnx", base="u2net", quantization="dynamic"),
+    "u2net_int8_static": ModelSpec("u2net_int8_static.onnx", base="u2net", quantization="static"),
+}
+
+
+def selected_model() -> str:
+    """Returns the model chosen with the U2NET_MODEL environment variable, u2net by default."""
+    model_name = os.getenv(U2NET_MODEL_ENV, "u2net")
+    if model_name not in MODELS:
+        raise ValueError(f"Unknown {U2NET_MODEL_ENV} '{model_name}', expected one of {list(MODELS)}")
+    return model_name
+
+
+def model_dir() -> str:
+    if hasattr(sys, '_MEIPASS'):  # Running as PyInstaller executable
+        base_path = sys._MEIPASS
+    else:  # Running in development
+        base_path = os.getcwd()
+    return os.path.join(base_path, 'core', 'utilities', 'u2net')
+
+
+def model_path(model_name: str) -> str:
+    """Returns the path of a registered model, quantizing it from its base model first if needed."""
+    spec = MODELS[model_name]
+    path = os.path.join(model_dir(), spec.filename)
+    if os.path.isfile(path):
+        return path
+
+    if spec.quantization is None:
+        raise FileNotFoundError(f"Model file {path} not found, download it from {spec.url}")
+
+    # Imported here, quantization pulls in the onnx package which the app does not need otherwise.
+    from core.utilities.u2net.quantize import quantize_model
+    quantize_model(spec.base, path, spec.quantization)
+    return path
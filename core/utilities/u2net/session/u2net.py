@@ -1,7 +1,6 @@
-import os
-import sys
-from typing import List
+from typing import List, Tuple
 
+import cv2
 import numpy as np
 import pooch
 from PIL import Image
@@ -10,6 +9,7 @@ from PIL.Image import Image as PILImage
 import __main__
 
 from .base import BaseSession
+from .registry import model_path
 
 
 class U2netSession(BaseSession):
@@ -29,62 +29,97 @@ class U2netSession(BaseSession):
         Returns:
             List[PILImage]: The list of output masks.
         """
-        ort_outs = self.inner_session.run(
-            None,
+        return [Image.fromarray(mask, mode="L") for mask in self.predict_array(img, *args, **kwargs)]
+
+    def predict_array(self, img: PILImage | np.ndarray, *args, interpolation: int = cv2.INTER_LINEAR,
+                      **kwargs) -> List[np.ndarray]:
+        """
+        Predicts the output masks for the input image as uint8 arrays, without any PIL round trip.
+
+        Parameters:
+            img (PILImage | np.ndarray): The input image, an RGB(A) array is used as is.
+            interpolation (int): OpenCV interpolation flag used to upsample the mask to the image size.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            List[np.ndarray]: The list of (height, width) uint8 output masks.
+        """
+        pred = self.run(
             self.normalize(
                 img, (0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320)
             ),
         )
 
-        pred = ort_outs[0][:, 0, :, :]
+        return [self._postprocess_mask(pred[0, 0, :, :], _image_size(img), interpolation)]
+
+    def predict_batch(self, images: List[PILImage], batch_size: int = 8, *args, **kwargs) -> List[List[PILImage]]:
+        """
+        Predicts the output masks for several input images, running the inner session once per batch.
 
-        ma = np.max(pred)
-        mi = np.min(pred)
+        Models exported with a fixed batch dimension of 1 are run image by image.
 
-        pred = (pred - mi) / (ma - mi)
-        pred = np.squeeze(pred)
+        Parameters:
+            images (List[PILImage]): The input images.
+            batch_size (int): The maximum number of images stacked into one input tensor.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
 
-        mask = Image.fromarray((pred * 255).astype("uint8"), mode="L")
-        mask = mask.resize(img.size, Image.Resampling.LANCZOS)
+        Returns:
+            List[List[PILImage]]: The list of output masks for every input image, in input order.
+        """
+        return [
+            [Image.fromarray(mask, mode="L") for mask in masks]
+            for masks in self.predict_batch_array(images, batch_size, *args, **kwargs)
+        ]
 
-        return [mask]
+    def predict_batch_array(self, images: List[PILImage | np.ndarray], batch_size: int = 8, *args,
+                            interpolation: int = cv2.INTER_LINEAR, **kwargs) -> List[List[np.ndarray]]:
+        """
+        Array counterpart of `predict_batch`, returning (height, width) uint8 masks for every input image.
+        """
+        model_batch = self.inner_session.get_inputs()[0].shape[0]
+        if isinstance(model_batch, int):
+            batch_size = min(batch_size, model_batch)
+        batch_size = max(1, batch_size)
+
+        masks = []
+        for start in range(0, len(images), batch_size):
+            chunk = images[start:start + batch_size]
+            batch = np.empty((len(chunk), 3, 320, 320), dtype=np.float32)
+            for idx, img in enumerate(chunk):
+                # normalize() reuses one buffer, so each image is copied into the batch right away.
+                batch[idx] = self.normalize(
+                    img, (0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320)
+                )[self.input_name][0]
+
+            pred = self.run({self.input_name: batch})
+
+            for idx, img in enumerate(chunk):
+                masks.append([self._postprocess_mask(pred[idx, 0, :, :], _image_size(img), interpolation)])
+
+        return masks
+
+    @staticmethod
+    def _postprocess_mask(pred: np.ndarray, size: Tuple[int, int], interpolation: int) -> np.ndarray:
+        # Stretch the prediction to the full 0..255 range, then upsample it to the image size.
+        mask = cv2.normalize(pred, None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
+        return cv2.resize(mask, size, interpolation=interpolation)
 
     @classmethod
-    def download_models(cls, *args, **kwargs):
+    def download_models(cls, *args, model_name: str = "u2net", **kwargs):
         """
-        Downloads the U2net model file from a specific URL and saves it.
+        Resolves the file of a registered u2net-family model (see registry.MODELS).
 
         Parameters:
+            model_name (str): The registry name of the model, e.g. "u2net", "u2netp" or "u2net_int8_dynamic".
             *args: Additional positional arguments.
             **kwargs: Additional keyword arguments.
 
         Returns:
-            str: The path to the downloaded model file.
+            str: The path to the model file.
         """
-        # fname = f"{cls.name(*args, **kwargs)}.py"
-
-        if hasattr(sys, '_MEIPASS'):  # Running as PyInstaller executable
-            base_path = sys._MEIPASS
-        else:  # Running in development
-            # base_path = os.path.dirname(os.path.abspath(__main__.__file__))
-            base_path = os.getcwd()
-
-            # Construct the full path to the ONNX model
-        fname = os.path.join(base_path, 'core', 'utilities', 'u2net', 'u2net.onnx')
-
-        # pooch.retrieve(
-        #     "https://github.com/danielgatis/rembg/releases/download/v0.0.0/u2net.onnx",
-        #     (
-        #         None
-        #         if cls.checksum_disabled(*args, **kwargs)
-        #         else "md5:60024c5c889badc19c04ad937298a77b"
-        #     ),
-        #     fname=fname,
-        #     path=cls.u2net_home(*args, **kwargs),
-        #     progressbar=True,
-        # )
-
-        return os.path.join(cls.u2net_home(*args, **kwargs), fname)
+        return model_path(model_name)
 
     @classmethod
     def name(cls, *args, **kwargs):
@@ -99,3 +134,9 @@ class U2netSession(BaseSession):
             str: The name of the session.
         """
         return "u2net"
+
+
+def _image_size(img: PILImage | np.ndarray) -> Tuple[int, int]:
+    if isinstance(img, np.ndarray):
+        return img.shape[1], img.shape[0]
+    return img.size
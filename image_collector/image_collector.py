@@ -1,5 +1,9 @@
+from multiprocessing import freeze_support
+
 from core.ImageCollectorApp import ImageCollectorApp
 
 
 if __name__ == "__main__":
+    # The optional background removal process pool spawns workers from the frozen executable too.
+    freeze_support()
     app = ImageCollectorApp()